@@ -7,7 +7,7 @@ This module implements the web admin model registry for ax-s.
 :copyright: (c) 2019 by Elliott Maguire
 """
 
-from app.models import Profile
+from app.models import Email, Profile
 
 from django.contrib import admin
 from django.contrib.auth.models import User
@@ -26,4 +26,4 @@ class UserAdmin(BaseUserAdmin):
 
 admin.site.unregister(User)
 admin.site.register(User, UserAdmin)
-
+admin.site.register(Email)
@@ -0,0 +1,35 @@
+# Generated by Django 2.2.28 on 2026-10-18 19:39
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Email',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=256, verbose_name='Subject')),
+                ('from_email', models.CharField(max_length=254, verbose_name='From')),
+                ('to', models.CharField(max_length=254, verbose_name='To')),
+                ('text', models.TextField(verbose_name='Text')),
+                ('html', models.TextField(blank=True, default='', verbose_name='HTML')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('sending', 'Sending'), ('failed', 'Failed')], default='queued', max_length=16, verbose_name='Status')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Attempts')),
+                ('send_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Send At')),
+                ('locked_until', models.DateTimeField(blank=True, null=True, verbose_name='Locked Until')),
+                ('error', models.TextField(blank=True, null=True, verbose_name='Last Error')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Created')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='email',
+            index=models.Index(fields=['status', 'send_at'], name='email_status_idx'),
+        ),
+    ]
@@ -11,6 +11,7 @@ from api.models import API, Endpoint
 
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 
 class Profile(models.Model):
@@ -18,3 +19,27 @@ class Profile(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     token = models.CharField('Access Token', max_length=256)
 
+
+class Email(models.Model):
+    """ Outbox email model, sent by the background sender. """
+    subject = models.CharField('Subject', max_length=256)
+    from_email = models.CharField('From', max_length=254)
+    to = models.CharField('To', max_length=254)
+    text = models.TextField('Text')
+    html = models.TextField('HTML', blank=True, default='')
+
+    STATUSES = (('queued', 'Queued'), ('sending', 'Sending'), ('failed', 'Failed'))
+    status = models.CharField('Status', max_length=16, choices=STATUSES, default='queued')
+    attempts = models.PositiveSmallIntegerField('Attempts', default=0)
+
+    send_at = models.DateTimeField('Send At', default=timezone.now)
+    locked_until = models.DateTimeField('Locked Until', blank=True, null=True)
+
+    error = models.TextField('Last Error', blank=True, null=True)
+    created = models.DateTimeField('Created', auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'send_at'], name='email_status_idx')]
+
+    def __str__(self):
+        return f'{self.subject} to {self.to} ({self.status})'
@@ -7,5 +7,86 @@ This module implements the web tests for ax-s.
 :copyright: (c) 2019 by Elliott Maguire
 """
 
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from app import outbox
+from app.models import Email
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class OutboxTestCase(TestCase):
+    def test_send(self):
+        outbox.queue('test', 'test@test.test', 'test', html='<p>test</p>')
+
+        self.assertEqual(outbox.drain(once=True), 1)
+        self.assertEqual(Email.objects.count(), 0)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['test@test.test'])
+        self.assertEqual(
+            mail.outbox[0].alternatives, [('<p>test</p>', 'text/html')])
+
+    @override_settings(OUTBOX_RETRY_BACKOFF=60)
+    def test_retries(self):
+        outbox.queue('test', 'test@test.test', 'test')
+
+        with mock.patch.object(
+                outbox.EmailMultiAlternatives, 'send',
+                side_effect=OSError('down')):
+            self.assertEqual(outbox.drain(once=True), 0)
+
+        email = Email.objects.get()
+        self.assertEqual((email.status, email.attempts), ('queued', 1))
+        self.assertEqual(email.error, 'down')
+        self.assertIsNone(email.locked_until)
+        self.assertGreater(
+            email.send_at, timezone.now() + timedelta(seconds=50))
+
+        # not due until its backoff runs out
+        self.assertEqual(outbox.drain(once=True), 0)
+
+        Email.objects.update(send_at=timezone.now())
+        self.assertEqual(outbox.drain(once=True), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=2)
+    def test_failure(self):
+        outbox.queue('test', 'test@test.test', 'test')
+
+        with mock.patch.object(
+                outbox.EmailMultiAlternatives, 'send',
+                side_effect=OSError('down')):
+            for _ in range(2):
+                Email.objects.update(send_at=timezone.now())
+                outbox.drain(once=True)
+
+        email = Email.objects.get()
+        self.assertEqual((email.status, email.attempts), ('failed', 2))
+
+        # a failed email is never sent
+        self.assertEqual(outbox.drain(once=True), 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=2)
+    def test_abandons_stuck_emails(self):
+        outbox.queue('test', 'test@test.test', 'test')
+
+        # its sender dies mid-send on every attempt
+        for _ in range(2):
+            self.assertEqual(len(outbox.claim()), 1)
+            Email.objects.update(locked_until=timezone.now())
+
+        self.assertEqual(outbox.claim(), [])
+
+        email = Email.objects.get()
+        self.assertEqual((email.status, email.attempts), ('failed', 2))
+        self.assertIsNone(email.locked_until)
+        self.assertEqual(email.error, 'Abandoned after 2 attempts.')
+        self.assertEqual(outbox.drain(once=True), 0)
+        self.assertEqual(len(mail.outbox), 0)
@@ -10,6 +10,7 @@ This module implements the web views for ax-s.
 import json
 import uuid
 
+from app import outbox
 from app.utils import update
 from app.models import Profile
 from api.models import API, Endpoint
@@ -23,7 +24,6 @@ from django.contrib.auth import authenticate
 from django.contrib.auth import login as auth_login
 from django.contrib.auth import logout as auth_logout
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives
 from django.core.exceptions import ObjectDoesNotExist, MultipleObjectsReturned
 
 
@@ -94,17 +94,11 @@ def signup(request, error=None):
 
         profile = Profile.objects.create(user=user, token=uuid.uuid4().hex)
 
-        text = (
-            open('app/templates/registration/email.txt', 'r').read()
-            .format(name=user.username, token=profile.token))
-        html = (
-            open('app/templates/registration/email.html', 'r').read()
-            .format(name=user.username, token=profile.token))
-
-        subject, from_email, to = 'new ax-s token', settings.DEFAULT_FROM_EMAIL, user.email
-        msg = EmailMultiAlternatives(subject, text, from_email, [to])
-        msg.attach_alternative(html, "text/html")
-        msg.send()
+        context = {'name': user.username, 'token': profile.token}
+        outbox.queue(
+            'new ax-s token', user.email,
+            outbox.render('email.txt', **context),
+            html=outbox.render('email.html', **context))
 
         user = authenticate(username=view('username'), password=view('password'))
         auth_login(request, user)
@@ -117,3 +117,10 @@ EMAIL_HOST_PASSWORD = ""
 DEFAULT_FROM_EMAIL = "admin@ax-s.io"
 DEFAULT_TO_EMAIL = "admin@ax-s.io"
 
+# emails wait in the outbox until `manage.py send_email` sends them
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 50))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 5))
+OUTBOX_RETRY_BACKOFF = int(os.getenv("OUTBOX_RETRY_BACKOFF", 60))
+OUTBOX_VISIBILITY_TIMEOUT = int(os.getenv("OUTBOX_VISIBILITY_TIMEOUT", 300))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", 5))
+
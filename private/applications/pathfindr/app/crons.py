@@ -11,6 +11,8 @@ import re
 
 from django_cron import CronJobBase, Schedule
 
+from satellites import metrics
+
 from app.models import Account, Contact
 from app.utils import (
     SalesforceClient,
@@ -25,6 +27,7 @@ class Sync(CronJobBase):
     schedule = Schedule(run_every_mins=RUN_EVERY_MINS)
     code = 'app.crons.Sync'
 
+    @metrics.instrumented
     def do(self):
         print('Syncing database...')
 
@@ -41,10 +44,12 @@ class Sync(CronJobBase):
                 sf_client.create_contact(account, contact)
                 contact.status = 'done'
                 contact.save()
+                metrics.count('contacts')
             
             sf_client.complete_account(account)
             account.status = 'done'
             account.save()
+            metrics.count('accounts')
         
 
 class Flush(CronJobBase):
@@ -54,6 +59,7 @@ class Flush(CronJobBase):
     schedule = Schedule(run_every_mins=RUN_EVERY_MINS)
     code = 'app.crons.Flush'
 
+    @metrics.instrumented
     def do(self):
         print('Flushing database...')
 
@@ -67,6 +73,7 @@ class RefreshAccounts(CronJobBase):
     schedule = Schedule(run_every_mins=RUN_EVERY_MINS)
     code = 'app.crons.RefreshAccounts'
 
+    @metrics.instrumented
     def do(self):
         print('Refreshing accounts...')
 
@@ -86,6 +93,7 @@ class RefreshAccounts(CronJobBase):
                 account['status'] = obj.status
 
             Account.objects.filter(pk=obj.pk).update(**account)
+            metrics.count('accounts')
 
 
 class RefreshContacts(CronJobBase):
@@ -95,6 +103,7 @@ class RefreshContacts(CronJobBase):
     schedule = Schedule(run_every_mins=RUN_EVERY_MINS)
     code = 'app.crons.RefreshContacts'
 
+    @metrics.instrumented
     def do(self):
         print('Refreshing contacts...')
 
@@ -126,4 +135,5 @@ class RefreshContacts(CronJobBase):
                     contact['status'] = obj.status
                 
                 Contact.objects.filter(pk=obj.pk).update(**contact)
+                metrics.count('contacts')
 
@@ -14,9 +14,11 @@ import json
 from app.models import Account, Contact
 
 import requests
-from ergal.profile import Profile
+from django.core.exceptions import ImproperlyConfigured
 from simple_salesforce import Salesforce
 from simple_salesforce.exceptions import SalesforceError
+from satellites.discoverorg import DiscoverOrgSession
+from satellites.outbound import get_provider
 
 
 class SalesforceClient:
@@ -31,7 +33,8 @@ class SalesforceClient:
             username=os.environ['SF_USERNAME'],
             password=os.environ['SF_PASSWORD'],
             security_token=os.environ['SF_TOKEN'],
-            organizationId=os.environ['SF_ORG_ID'])
+            organizationId=os.environ['SF_ORG_ID'],
+            session=get_provider('salesforce').as_session())
 
     def get_accounts(self):
         """ Collect accounts/tasks from Salesforce.
@@ -160,18 +163,20 @@ class SalesforceClient:
 class LushaClient:
     def __init__(self):
         """ Initialize Lusha API client.
-        
-        Though it uses ERGAL for most request processing,
-        this class has blocks to parse out the desired data from
-        returned records.
 
-        This initialization assumes that the API profile for Lusha
-        has already been created and is stored in a local ergal.db
-        sqlite database file.
+        Requests go through the shared Lusha provider, which
+        rate limits and retries them. The API key is sourced
+        from the LUSHA_TOKEN environment variable; without it,
+        ImproperlyConfigured is raised.
 
         """
-        self.profile = Profile('Lusha API',
-            base='https://api.lusha.co')
+        self.token = os.getenv('LUSHA_TOKEN')
+        if not self.token:
+            raise ImproperlyConfigured(
+                'LUSHA_TOKEN must be set to a Lusha API key to use '
+                'the Lusha client.')
+
+        self.session = get_provider('lusha')
         
     def enrich(self, contact):
         """ Enrich a contact record.
@@ -188,28 +193,30 @@ class LushaClient:
         if len(name) > 2:
             name.pop(1)
 
-        response = self.profile.call('Enrich Person', 
+        response = self.session.get(
+            'https://api.lusha.co/person',
+            headers={
+                'api_key': self.token},
             params={
                 'firstName': name[0],
                 'lastName': name[1],
                 'company': contact.account.name,
                 'property': 'phoneNumbers'})
 
-        if 'errors' in response:
+        if response.status_code != 200:
+            return
+
+        data = response.json()
+        if 'errors' in data:
             return
         
-        Record.objects.create(
-            source='Lusha',
-            content=response,
-            context='LushaClient: enrich')
-        
-        if 'phoneNumbers' in response['data']:
-            numbers = response['data']['phoneNumbers']
+        if 'phoneNumbers' in data:
+            numbers = data['phoneNumbers']
         else:
             return
         
-        if not 'emailAddresses' in response['data']:
-            emails = response['data']['emailAddresses']
+        if 'emailAddresses' in data:
+            emails = data['emailAddresses']
         else:
             emails = None
 
@@ -230,30 +237,15 @@ class DiscoverOrgClient:
     def __init__(self):
         """ Initialize the DiscoverOrg API client.
 
-        Also integrates pretty directly with ERGAL, but has some
-        utility code to parse responses of different types.
+        Requests go through the shared DiscoverOrg session,
+        with some utility code to parse responses of
+        different types.
         
         """
-        self.profile = Profile('DiscoverOrg API',
-            base='https://papi.discoverydb.com/papi/v1')
-        
-        session_key = self._get_session_key()
-        self.profile.set_auth('key-header', 
-            key=session_key,
-            name='X-AUTH-TOKEN')
-    
-    def _get_session_key(self):
-        """ Get a session key. """
-        auth_url = 'https://papi.discoverydb.com/papi/login'
-        auth_data = {
-            'username': os.environ['DO_USERNAME'],
-            'password': os.environ['DO_PASSWORD'],
-            'partnerKey': os.environ['DO_KEY']}
-
-        response = requests.post(auth_url, data=json.dumps(auth_data))
-        session_key = response.headers['X-AUTH-TOKEN']
-
-        return session_key
+        self.session = DiscoverOrgSession(
+            os.environ['DO_USERNAME'],
+            os.environ['DO_PASSWORD'],
+            os.environ['DO_KEY'])
     
     def search(self, account):
         """ Search for contacts.
@@ -270,18 +262,20 @@ class DiscoverOrgClient:
             list:contacts -- a list of contact dicts.
         
         """
-        response = self.profile.call('Person Search',
+        response = self.session.post('/v1/search/persons',
             headers={
-                'X-AUTH-TOKEN': str(self._get_session_key()),
                 'Accept': 'application/json',
                 'Content-Type': 'application/json'},
             data=json.dumps({
                 'companyCriteria': {
-                    'websiteUrls': [account.domain]}}))
+                    'websiteUrls': [account.domain]}}),
+            cached=True)
 
-        if len(response['content']) > 0:
-            results = response['content']
-        else:
+        if response.status_code != 200:
+            return
+
+        results = response.json().get('content')
+        if not results:
             return
         
         classes = ['A', 'B', 'C']
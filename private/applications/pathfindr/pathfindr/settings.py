@@ -106,10 +106,46 @@ import dj_database_url
 db_from_env = dj_database_url.config(conn_max_age=500)
 DATABASES['default'].update(db_from_env)
 
+
+# Cache
+# shared by every process, so cron runs reuse the DiscoverOrg session token;
+# the table is created with `manage.py createcachetable`
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'cache',
+    }
+}
+
 DJANGO_CRON_DELETE_LOGS_OLDER_THAN = 1
 CRON_CLASSES = [
     'app.crons.Sync',
     'app.crons.Flush',
     'app.crons.RefreshAccounts',
     'app.crons.RefreshContacts',
-]
\ No newline at end of file
+]
+
+# Provider credentials, read from the environment by app.utils:
+# SF_USERNAME, SF_PASSWORD, SF_TOKEN and SF_ORG_ID for Salesforce;
+# DO_USERNAME, DO_PASSWORD and DO_KEY for DiscoverOrg; LUSHA_TOKEN, the
+# Lusha API key, for LushaClient
+
+SATELLITES_DISCOVERORG_TOKEN_TTL = int(
+    os.getenv('SATELLITES_DISCOVERORG_TOKEN_TTL', 3600))
+SATELLITES_DISCOVERORG_TOKEN_REFRESH = int(
+    os.getenv('SATELLITES_DISCOVERORG_TOKEN_REFRESH', 300))
+
+SATELLITES_METRICS_KEY = os.getenv('SATELLITES_METRICS_KEY', '')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {'raw': {'format': '%(message)s'}},
+    'handlers': {
+        'metrics': {'class': 'logging.StreamHandler', 'formatter': 'raw'}},
+    'loggers': {
+        'satellites.metrics': {
+            'handlers': ['metrics'],
+            'level': 'INFO',
+            'propagate': False}}}
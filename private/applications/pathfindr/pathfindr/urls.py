@@ -11,8 +11,11 @@ from django.urls import path, include
 from django.conf.urls.static import static
 from django.conf import settings
 
+from satellites.metrics import metrics
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics, name='metrics'),
     path('', include(auth_urls)),
     path('', include("app.urls")),
 ] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
@@ -7,7 +7,7 @@ This module implements the admin model registrations.
 :copyright: (c) 2019 by Elliott Maguire
 """
 
-from api.models import Account, Contact
+from api.models import Account, Contact, OrgNode
 
 from django.contrib import admin
 
@@ -20,6 +20,11 @@ class ContactAdmin(admin.ModelAdmin):
     search_fields = ['name', 'sfid', 'doid', 'status']
 
 
+class OrgNodeAdmin(admin.ModelAdmin):
+    search_fields = ['name', 'title', 'doid', 'account__name']
+
+
 admin.site.register(Account, AccountAdmin)
 admin.site.register(Contact, ContactAdmin)
+admin.site.register(OrgNode, OrgNodeAdmin)
 
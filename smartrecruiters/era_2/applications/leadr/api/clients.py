@@ -13,9 +13,11 @@ import json
 
 from api.models import Account, Contact
 
-import requests
 import simple_salesforce
 
+from satellites.discoverorg import DiscoverOrgSession
+from satellites.outbound import get_provider
+
 
 class SalesforceClient:
     """ Client for the Salesforce API.
@@ -23,7 +25,8 @@ class SalesforceClient:
     :param creds: a dictionary of Salesforce credentials
     """
     def __init__(self, **creds):
-        self.api = simple_salesforce.Salesforce(**creds)
+        self.api = simple_salesforce.Salesforce(
+            session=get_provider('salesforce').as_session(), **creds)
 
     def get_accounts(self):
         """ Collects enrichment requests from Salesforce.
@@ -151,6 +154,7 @@ class LushaClient:
     """
     def __init__(self, token):
         self.token = token
+        self.session = get_provider('lusha')
 
     def enrich(self, contact):
         """ Enriches a contact object.
@@ -165,7 +169,7 @@ class LushaClient:
         elif len(name) > 3:
             name = [name[0], name[1]]
 
-        response = requests.get(
+        response = self.session.get(
             'https://api.lusha.co/person',
             headers={
                 'api_key': self.token},
@@ -204,31 +208,7 @@ class DiscoverOrgClient:
     :param key: a DiscoverOrg API partner key
     """
     def __init__(self, username, password, key):
-        self.base = 'https://papi.discoverydb.com/papi'
-
-        self.username = username
-        self.password = password
-        self.key = key
-
-        self.session = self._get_session()
-
-    def _get_session(self):
-        """ Gets a session key.
-
-        :return session: a session key
-        """
-        url = ''.join([self.base, '/login'])
-        headers = {
-            'Content-Type': 'application/json'}
-        data = {
-            'username': self.username,
-            'password': self.password,
-            'partnerKey': self.key}
-
-        response = requests.post(url, headers=headers, data=json.dumps(data))
-        session = response.headers['X-AUTH-TOKEN']
-
-        return session
+        self.session = DiscoverOrgSession(username, password, key)
 
     def get_contacts(self, account):
         """ Searches for contacts under an account.
@@ -236,16 +216,15 @@ class DiscoverOrgClient:
         :param account: an Account object
         :return contacts: a list of dictionaries of contact data
         """
-        response = requests.post(
-            url=''.join([self.base, '/v1/search/persons']),
+        response = self.session.post(
+            '/v1/search/persons',
             headers={
-                'X-PARTNER-KEY': self.key,
-                'X-AUTH-TOKEN': self.session,
                 'Accept': 'application/json',
                 'Content-Type': 'application/json'},
             data=json.dumps({
                 'companyCriteria': {
-                    'websiteUrls': [account.domain]}}))
+                    'websiteUrls': [account.domain]}}),
+            cached=True)
 
         data = json.loads(response.text)
 
@@ -285,16 +264,12 @@ class DiscoverOrgClient:
         :return hierarchy: a dictionary representing org hierarchy
         """
         if not account.doid:
-            return 'Unavailable'
+            return {'message': 'Unavailable'}
 
-        response = requests.get(
-            url=''.join([self.base, f"/v1/companies/{account.doid}/orgchart/7"]),
-            headers={
-                'X-PARTNER-KEY': self.key,
-                'X-AUTH-TOKEN': self.session})
+        response = self.session.get(
+            f"/v1/companies/{account.doid}/orgchart/7", cached=True)
 
         data = json.loads(response.text)
-        hierarchy = data['nodes'] or 'Unknown'
 
-        return hierarchy
+        return data
 
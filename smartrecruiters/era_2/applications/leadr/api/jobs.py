@@ -11,11 +11,16 @@ import os
 import re
 
 from api import utils
-from api.models import Account, Contact
+from api.models import Account, Contact, OrgNode
 from api.clients import SalesforceClient, LushaClient, DiscoverOrgClient
 
 from django_cron import CronJobBase, Schedule
 
+from satellites import metrics
+from satellites.hierarchy import sync_hierarchy
+from satellites.titles import qualify_contacts
+from satellites.upsert import upsert
+
 
 class Sync(CronJobBase):
     """ Uploads queued records into Salesforce. """
@@ -24,6 +29,7 @@ class Sync(CronJobBase):
     schedule = Schedule(run_every_mins=RUN_EVERY_MINS)
     code = 'api.jobs.Sync'
 
+    @metrics.instrumented
     def do(self):
         print('Uploading data...')
 
@@ -36,8 +42,10 @@ class Sync(CronJobBase):
                     utils.enrich_contact(contact)
 
                 utils.complete_contact(contact)
+                metrics.count('contacts')
 
             utils.complete_account(account)
+            metrics.count('accounts')
 
 
 class GetAccounts(CronJobBase):
@@ -47,6 +55,7 @@ class GetAccounts(CronJobBase):
     schedule = Schedule(run_every_mins=RUN_EVERY_MINS)
     code = 'api.jobs.GetAccounts'
 
+    @metrics.instrumented
     def do(self):
         print('Collecting accounts...')
 
@@ -56,15 +65,16 @@ class GetAccounts(CronJobBase):
             security_token=os.environ['SF_TOKEN'],
             organizationId=os.environ['SF_ORG_ID'])
 
-        for account in sf.get_accounts():
-            if not account['name'] or not account['domain']:
-                continue
+        accounts = [
+            account for account in sf.get_accounts()
+            if account['name'] and account['domain']]
 
-            obj, created = Account.objects.get_or_create(
-                sfid=account['sfid'])
-            account['status'] = 'enrich' if created else obj.status
+        # new accounts start out as 'enrich', existing ones keep their status
+        for account in accounts:
+            account['status'] = 'enrich'
 
-            Account.objects.filter(pk=obj.pk).update(**account)
+        upsert(Account, accounts, keys=('sfid',), preserve=('status',))
+        metrics.count('accounts', len(accounts))
 
 
 class GetContacts(CronJobBase):
@@ -74,6 +84,7 @@ class GetContacts(CronJobBase):
     schedule = Schedule(run_every_mins=RUN_EVERY_MINS)
     code = 'api.jobs.GetContacts'
 
+    @metrics.instrumented
     def do(self):
         print('Collecting contacts...')
 
@@ -89,17 +100,25 @@ class GetContacts(CronJobBase):
             key=os.environ['DO_KEY'])
 
         for account in Account.objects.all():
-            sf_contacts = sf.get_contacts(account) or []
-            do_contacts = dg.get_contacts(account) or []
+            with metrics.stage('salesforce'):
+                sf_contacts = sf.get_contacts(account) or []
+            with metrics.stage('discoverorg'):
+                do_contacts = dg.get_contacts(account) or []
             contacts = sf_contacts + do_contacts
 
             for contact in contacts:
-                obj, created = Contact.objects.get_or_create(
-                    account=account,
-                    name=contact['name'])
-                contact['status'] = contact['status'] if created else obj.status
+                contact['account'] = account
+
+            with metrics.stage('store'):
+                upsert(
+                    Contact, contacts, keys=('account', 'name'),
+                    preserve=('status',))
+            metrics.count('contacts', len(contacts))
 
-                Contact.objects.filter(pk=obj.pk).update(**contact)
+        stats = dg.session.responses.stats
+        print(
+            f"DiscoverOrg cache: {stats['hits']} hits, "
+            f"{stats['misses']} misses, {stats['ratio']:.0%} hit ratio")
 
 
 class QualifyContacts(CronJobBase):
@@ -109,12 +128,17 @@ class QualifyContacts(CronJobBase):
     schedule = Schedule(run_every_mins=RUN_EVERY_MINS)
     code = 'api.jobs.QualifyContacts'
 
+    @metrics.instrumented
     def do(self):
         print('Qualifying contacts...')
 
-        contacts = Contact.objects.all()
-        for contact in contacts:
-            utils.qualify_title(contact)
+        contacts = Contact.objects.exclude(title=None).exclude(
+            title='').only('id', 'title', 'rating', 'priority')
+
+        changed = qualify_contacts(contacts.iterator())
+        Contact.objects.bulk_update(
+            changed, ['rating', 'priority'], batch_size=500)
+        metrics.count('contacts_changed', len(changed))
 
 
 class GetHierarchies(CronJobBase):
@@ -124,6 +148,7 @@ class GetHierarchies(CronJobBase):
     schedule = Schedule(run_every_mins=RUN_EVERY_MINS)
     code = 'api.jobs.GetHierarchy'
 
+    @metrics.instrumented
     def do(self):
         print('Collecting hierarchies...')
 
@@ -132,10 +157,10 @@ class GetHierarchies(CronJobBase):
             password=os.environ['DO_PASSWORD'],
             key=os.environ['DO_KEY'])
 
-        for account in Account.objects.all():
-            if not account.hierarchy:
-                hierarchy = do.get_hierarchy(account)
-
-            account.hierarchy = hierarchy
-            account.save()
+        for account in Account.objects.exclude(doid=None).exclude(doid=''):
+            counts = sync_hierarchy(OrgNode, account, do.get_hierarchy(account))
+            metrics.count('accounts')
+            print(
+                f"{account.name}: {counts['created']} created, "
+                f"{counts['updated']} updated, {counts['deleted']} deleted")
 
@@ -53,3 +53,21 @@ class Contact(models.Model):
     def __str__(self):
         return self.name
 
+
+class OrgNode(models.Model):
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='org_nodes')
+
+    doid = models.CharField('DiscoverOrg ID', max_length=256)
+    parent = models.CharField('Reports To', max_length=256, null=True, blank=True)
+
+    path = models.CharField('Path', max_length=2048, db_index=True)
+    depth = models.PositiveSmallIntegerField('Depth', default=0)
+
+    name = models.CharField('Name', max_length=128, blank=True, default='')
+    title = models.CharField('Title', max_length=128, blank=True, default='')
+
+    class Meta:
+        unique_together = [('account', 'doid')]
+
+    def __str__(self):
+        return self.name
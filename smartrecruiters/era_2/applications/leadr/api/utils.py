@@ -12,6 +12,8 @@ import os
 from api.models import Account, Contact
 from api.clients import SalesforceClient, DiscoverOrgClient, LushaClient
 
+from satellites.titles import qualify_contacts
+
 
 def enrich_contact(contact):
     """ Enriches a contact's data. """
@@ -26,35 +28,8 @@ def enrich_contact(contact):
 
 def qualify_title(contact):
     """ Qualifies the contact's title. """
-    if not contact.title:
-        return
-
-    ratings = [1, 2, 3]
-    titles = [
-        ['SENIOR VICE PRESIDENT', 'SVP', 'VICE PRESIDENT', 'VP',
-        'PRESIDENT', 'CHIEF', 'DIRECTOR', 'HEAD', 'LEAD'],
-        ['SENIOR MANAGER', 'MANAGER',
-        'COORDINATOR', 'BUSINESS PARTNER'],
-        ['ANALYST', 'GENERALIST',
-        'ASSISTANT', 'SPECIALIST']]
-    priorities = [1, 2, 3, 4, 5]
-    functions = [
-        'TALENT', 'RECRUIT', 'HIRING', 'HUMAN RESOURCES', 'HR']
-
-    # title qualifier algorithm
-    for group in titles:
-        for title in group:
-            if title in contact.title.upper():
-                contact.rating = ratings[titles.index(group)]
-                break
-
-    # function qualifier algorithm
-    for function in functions:
-        if function in contact.title.upper():
-            contact.priority = priorities[functions.index(function)]
-            break
-
-    contact.save()
+    if qualify_contacts([contact]):
+        contact.save()
 
 
 def complete_account(account):
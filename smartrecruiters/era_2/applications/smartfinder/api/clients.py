@@ -14,9 +14,11 @@ import json
 
 from api.models import Account, Contact, ErrorLog
 
-import requests
 import simple_salesforce
 
+from satellites.discoverorg import DiscoverOrgSession
+from satellites.outbound import get_provider
+
 
 class SalesforceClient:
     """ Client for the Salesforce API. """
@@ -26,7 +28,8 @@ class SalesforceClient:
             username=os.environ['SF_USERNAME'],
             password=os.environ['SF_PASSWORD'],
             security_token=os.environ['SF_TOKEN'],
-            organizationId=os.environ['SF_ORG_ID'])
+            organizationId=os.environ['SF_ORG_ID'],
+            session=get_provider('salesforce').as_session())
 
     def get_accounts(self):
         """ Collects enrichment requests from Salesforce.
@@ -156,6 +159,7 @@ class LushaClient:
 
     def __init__(self):
         self.token = os.environ['LUSHA_TOKEN']
+        self.session = get_provider('lusha')
 
     def enrich(self, contact):
         """ Enriches a contact object.
@@ -170,7 +174,7 @@ class LushaClient:
         elif len(name) > 3:
             name = [name[0], name[1]]
 
-        response = requests.get(
+        response = self.session.get(
             'https://api.lusha.co/person',
             headers={
                 'api_key': self.token},
@@ -205,31 +209,10 @@ class DiscoverOrgClient:
     """ Implements a DiscoverOrg API client. """
 
     def __init__(self):
-        self.base = 'https://papi.discoverydb.com/papi'
-
-        self.username = os.environ['DO_USERNAME']
-        self.password = os.environ['DO_PASSWORD']
-        self.key = os.environ['DO_KEY']
-
-        self.session = self._get_session()
-
-    def _get_session(self):
-        """ Gets a session key.
-
-        :return session: a session key
-        """
-        url = ''.join([self.base, '/login'])
-        headers = {
-            'Content-Type': 'application/json'}
-        data = {
-            'username': self.username,
-            'password': self.password,
-            'partnerKey': self.key}
-
-        response = requests.post(url, headers=headers, data=json.dumps(data))
-        session = response.headers['X-AUTH-TOKEN']
-
-        return session
+        self.session = DiscoverOrgSession(
+            os.environ['DO_USERNAME'],
+            os.environ['DO_PASSWORD'],
+            os.environ['DO_KEY'])
 
     def get_contacts(self, account):
         """ Searches for contacts under an account.
@@ -237,16 +220,15 @@ class DiscoverOrgClient:
         :param account: an Account object
         :return contacts: a list of dictionaries of contact data
         """
-        response = requests.post(
-            url=''.join([self.base, '/v1/search/persons']),
+        response = self.session.post(
+            '/v1/search/persons',
             headers={
-                'X-PARTNER-KEY': self.key,
-                'X-AUTH-TOKEN': self.session,
                 'Accept': 'application/json',
                 'Content-Type': 'application/json'},
             data=json.dumps({
                 'companyCriteria': {
-                    'websiteUrls': [account.domain]}}))
+                    'websiteUrls': [account.domain]}}),
+            cached=True)
 
         data = json.loads(response.text)
 
@@ -288,12 +270,8 @@ class DiscoverOrgClient:
         if not account.doid:
             return {'message': 'Unavailable'}
 
-        response = requests.get(
-            url=''.join(
-                [self.base, f"/v1/companies/{account.doid}/orgchart/7"]),
-            headers={
-                'X-PARTNER-KEY': self.key,
-                'X-AUTH-TOKEN': self.session})
+        response = self.session.get(
+            f"/v1/companies/{account.doid}/orgchart/7", cached=True)
 
         data = json.loads(response.text)
 
@@ -13,6 +13,10 @@ from api.clients import SalesforceClient, LushaClient, DiscoverOrgClient
 
 from django_cron import CronJobBase, Schedule
 
+from satellites import metrics
+from satellites.titles import qualify_contacts
+from satellites.upsert import upsert
+
 
 class Sync(CronJobBase):
     """ Uploads queued records into Salesforce. """
@@ -21,6 +25,7 @@ class Sync(CronJobBase):
     schedule = Schedule(run_every_mins=RUN_EVERY_MINS)
     code = 'api.jobs.Sync'
 
+    @metrics.instrumented
     def do(self):
         print('api.jobs: RECORD SYNC STARTED')
 
@@ -36,7 +41,9 @@ class Sync(CronJobBase):
                     utils.complete_contact(contact)
                 elif contact.ctype == 'old' and contact.cleaned:
                     utils.complete_contact(contact)
+                metrics.count('contacts')
 
+            metrics.count('accounts')
             if account.cleaned and account.enriched:
                 utils.complete_account(account)
 
@@ -48,20 +55,22 @@ class GetAccounts(CronJobBase):
     schedule = Schedule(run_every_mins=RUN_EVERY_MINS)
     code = 'api.jobs.GetAccounts'
 
+    @metrics.instrumented
     def do(self):
         print('api.jobs: ACCOUNT COLLECTION STARTED')
 
         sf = SalesforceClient()
 
-        for account in sf.get_accounts():
-            if not account['name'] or not account['domain']:
-                continue
+        accounts = [
+            account for account in sf.get_accounts()
+            if account['name'] and account['domain']]
 
-            obj, created = Account.objects.get_or_create(
-                sfid=account['sfid'])
-            account['status'] = 'enrich' if created else obj.status
+        # new accounts start out as 'enrich', existing ones keep their status
+        for account in accounts:
+            account['status'] = 'enrich'
 
-            Account.objects.filter(pk=obj.pk).update(**account)
+        upsert(Account, accounts, keys=('sfid',), preserve=('status',))
+        metrics.count('accounts', len(accounts))
 
 
 class GetContacts(CronJobBase):
@@ -71,6 +80,7 @@ class GetContacts(CronJobBase):
     schedule = Schedule(run_every_mins=RUN_EVERY_MINS)
     code = 'api.jobs.GetContacts'
 
+    @metrics.instrumented
     def do(self):
         print('api.jobs: CONTACT COLLECTION STARTED')
 
@@ -79,18 +89,25 @@ class GetContacts(CronJobBase):
         dg = DiscoverOrgClient()
 
         for account in Account.objects.all():
-            sf_contacts = sf.get_contacts(account) or []
-            do_contacts = dg.get_contacts(account) or []
+            with metrics.stage('salesforce'):
+                sf_contacts = sf.get_contacts(account) or []
+            with metrics.stage('discoverorg'):
+                do_contacts = dg.get_contacts(account) or []
             contacts = sf_contacts + do_contacts
 
             for contact in contacts:
-                obj, created = Contact.objects.get_or_create(
-                    account=account,
-                    name=contact['name'])
-                contact['status'] = contact['status'] if created else obj.status
-                contact['ctype'] = contact['ctype'] if created else obj.ctype
+                contact['account'] = account
+
+            with metrics.stage('store'):
+                upsert(
+                    Contact, contacts, keys=('account', 'name'),
+                    preserve=('status', 'ctype'))
+            metrics.count('contacts', len(contacts))
 
-                Contact.objects.filter(pk=obj.pk).update(**contact)
+        stats = dg.session.responses.stats
+        print(
+            f"DiscoverOrg cache: {stats['hits']} hits, "
+            f"{stats['misses']} misses, {stats['ratio']:.0%} hit ratio")
 
 
 class QualifyContacts(CronJobBase):
@@ -100,9 +117,14 @@ class QualifyContacts(CronJobBase):
     schedule = Schedule(run_every_mins=RUN_EVERY_MINS)
     code = 'api.jobs.QualifyContacts'
 
+    @metrics.instrumented
     def do(self):
         print('api.jobs: CONTACT QUALIFICATION STARTED')
 
-        contacts = Contact.objects.all()
-        for contact in contacts:
-            utils.qualify_title(contact)
+        contacts = Contact.objects.exclude(title=None).exclude(
+            title='').only('id', 'title', 'rating', 'priority')
+
+        changed = qualify_contacts(contacts.iterator())
+        Contact.objects.bulk_update(
+            changed, ['rating', 'priority'], batch_size=500)
+        metrics.count('contacts_changed', len(changed))
@@ -95,6 +95,25 @@ db_from_env = dj_database_url.config(conn_max_age=500)
 DATABASES['default'].update(db_from_env)
 
 
+# Cache
+# shared by every process, so cron runs reuse the DiscoverOrg session token;
+# the table is created with `manage.py createcachetable`
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'cache',
+    },
+    # DiscoverOrg responses, culled once MAX_ENTRIES is reached
+    'discoverorg': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'discoverorg_cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('DO_CACHE_MAX_ENTRIES', 10000))},
+    }
+}
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -157,3 +176,30 @@ CRON_CLASSES = [
     'api.jobs.GetContacts',
     'api.jobs.QualifyContacts',
 ]
+
+SATELLITES_DISCOVERORG_TOKEN_TTL = int(
+    os.getenv('SATELLITES_DISCOVERORG_TOKEN_TTL', 3600))
+SATELLITES_DISCOVERORG_TOKEN_REFRESH = int(
+    os.getenv('SATELLITES_DISCOVERORG_TOKEN_REFRESH', 300))
+SATELLITES_DISCOVERORG_RESPONSE_CACHE = 'discoverorg'
+SATELLITES_DISCOVERORG_RESPONSE_TTL = int(
+    os.getenv('SATELLITES_DISCOVERORG_RESPONSE_TTL', 604800))
+SATELLITES_DISCOVERORG_CACHE_BYPASS = (
+    os.getenv('SATELLITES_DISCOVERORG_CACHE_BYPASS', '') == '1')
+
+
+# Job metrics, logged as JSON lines and served at /metrics
+
+SATELLITES_METRICS_KEY = os.getenv('SATELLITES_METRICS_KEY', '')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {'raw': {'format': '%(message)s'}},
+    'handlers': {
+        'metrics': {'class': 'logging.StreamHandler', 'formatter': 'raw'}},
+    'loggers': {
+        'satellites.metrics': {
+            'handlers': ['metrics'],
+            'level': 'INFO',
+            'propagate': False}}}
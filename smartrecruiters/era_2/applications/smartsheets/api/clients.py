@@ -10,44 +10,20 @@ import sys
 import time
 import json
 
-import requests
+from satellites.discoverorg import DiscoverOrgSession
 
 
 class DiscoverOrgClient:
     """ Implements a DiscoverOrg API client. """
     def __init__(self):
-        self.base = 'https://papi.discoverydb.com/papi'
-
-        self.username = os.environ['DO_USERNAME']
-        self.password = os.environ['DO_PASSWORD']
-        self.key = os.environ['DO_KEY']
-
-        self.token = self._get_token()
-
-
-    def _get_token(self):
-        """ Gets a session key.
-        :return session: a session key
-        """
-        url = ''.join([self.base, '/login'])
-        headers = {
-            'Content-Type': 'application/json'}
-        data = {
-            'username': self.username,
-            'password': self.password,
-            'partnerKey': self.key}
-
-        response = requests.post(url, headers=headers, data=json.dumps(data))
-        token = response.headers['X-AUTH-TOKEN']
-
-        return token
+        self.session = DiscoverOrgSession(
+            os.environ['DO_USERNAME'],
+            os.environ['DO_PASSWORD'],
+            os.environ['DO_KEY'])
 
     def enrich(self, contact):
         """ Enriches a contact records. """
-        url = ''.join([self.base, '/v1/search/persons'])
         headers = {
-            'X-PARTNER-KEY': self.key,
-            'X-AUTH-TOKEN': self.token,
             'Accept': 'application/json',
             'Content-Type': 'application/json'}
         data = json.dumps({
@@ -58,7 +34,8 @@ class DiscoverOrgClient:
                 'queryString': f"{contact['Company']}",
                 'queryStringApplication': ['NAME']}})
 
-        response = requests.post(url, headers=headers, data=data)
+        response = self.session.post(
+            '/v1/search/persons', headers=headers, data=data)
         if response.status_code != 200:
             return response.text
 
@@ -15,6 +15,8 @@ from api.utils import get_session, get_status
 
 from django_cron import CronJobBase, Schedule
 
+from satellites import metrics
+
 
 class Sync(CronJobBase):
     """ Syncs project meta from sources. """
@@ -23,6 +25,7 @@ class Sync(CronJobBase):
     schedule = Schedule(run_every_mins=RUN_EVERY_MINS)
     code = 'api.jobs.Sync'
 
+    @metrics.instrumented
     def do(self):
         print('Syncing projects...')
 
@@ -35,6 +38,7 @@ class Sync(CronJobBase):
             project.progress = progress
 
             project.save()
+            metrics.count('projects')
 
 
 class Enrich(CronJobBase):
@@ -44,6 +48,7 @@ class Enrich(CronJobBase):
     schedule = Schedule(run_every_mins=RUN_EVERY_MINS)
     code = 'api.jobs.Enrich'
 
+    @metrics.instrumented
     def do(self):
         print('Enriching projects...')
 
@@ -59,6 +64,7 @@ class Enrich(CronJobBase):
                     contact = do.enrich(contact)
                     if type(contact) is str:
                         continue
+                    metrics.count('contacts')
                 else:
                     continue
 
@@ -66,7 +72,8 @@ class Enrich(CronJobBase):
                     row = contacts.index(contact) + 2
                     col = worksheet.find(k).col
 
-                    worksheet.update_cell(row, col, v)
+                    with metrics.call('sheets'):
+                        worksheet.update_cell(row, col, v)
 
                     time.sleep(1)
 
@@ -98,6 +98,18 @@ db_from_env = dj_database_url.config(conn_max_age=500)
 DATABASES['default'].update(db_from_env)
 
 
+# Cache
+# shared by every process, so cron runs reuse the DiscoverOrg session token;
+# the table is created with `manage.py createcachetable`
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'cache',
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/2.1/ref/settings/#auth-password-validators
 
@@ -159,3 +171,25 @@ CRON_CLASSES = [
     'api.jobs.Sync',
     'api.jobs.Enrich'
 ]
+
+SATELLITES_DISCOVERORG_TOKEN_TTL = int(
+    os.getenv('SATELLITES_DISCOVERORG_TOKEN_TTL', 3600))
+SATELLITES_DISCOVERORG_TOKEN_REFRESH = int(
+    os.getenv('SATELLITES_DISCOVERORG_TOKEN_REFRESH', 300))
+
+
+# Job metrics, logged as JSON lines and served at /metrics
+
+SATELLITES_METRICS_KEY = os.getenv('SATELLITES_METRICS_KEY', '')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {'raw': {'format': '%(message)s'}},
+    'handlers': {
+        'metrics': {'class': 'logging.StreamHandler', 'formatter': 'raw'}},
+    'loggers': {
+        'satellites.metrics': {
+            'handlers': ['metrics'],
+            'level': 'INFO',
+            'propagate': False}}}
@@ -11,9 +11,12 @@ from django.conf.urls.static import static
 from django.conf import settings
 from django.contrib.auth import urls as auth_urls
 
+from satellites.metrics import metrics
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics, name='metrics'),
     path('', include(auth_urls)),
     path('', include('app.urls', namespace='app')),
     path('api', include('api.urls', namespace='api'))
@@ -0,0 +1,155 @@
+"""
+satellites.aio
+~~~~~~~~~~~~~~
+
+This module implements asyncio counterparts of the satellite clients.
+
+The clients share their method bodies with the synchronous ones; only the
+session underneath is swapped for a non-blocking one, so every method
+returns an awaitable resolving to a regular `requests.Response`.
+"""
+
+import json
+import asyncio
+
+from . import e, s, spy
+
+import aiohttp
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+class AsyncSession:
+    """ A non-blocking HTTP session with bounded concurrency.
+
+    At most `limit` requests are in flight at once; the rest wait on a
+    semaphore, so fan-out callers can gather freely.
+
+    :param limit: the maximum number of concurrent requests
+    :param timeout: the total timeout per request, in seconds
+    """
+    def __init__(self, limit=10, timeout=30):
+        self.limit = limit
+        self.timeout = timeout
+
+        self._session = None
+        self._semaphore = None
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.limit),
+                timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self._semaphore = asyncio.Semaphore(self.limit)
+
+        return self._session
+
+    async def request(self, method, url, headers=None, params=None, data=None):
+        """ Sends a request.
+
+        :return response: a requests.Response
+        """
+        session = self._get_session()
+        if params:
+            params = {k: v for k, v in params.items() if v is not None}
+
+        async with self._semaphore:
+            async with session.request(
+                    method, url, headers=headers, params=params,
+                    data=data) as r:
+                content = await r.read()
+
+        response = requests.Response()
+        response.status_code = r.status
+        response.reason = r.reason
+        response.headers = CaseInsensitiveDict(r.headers)
+        response.url = str(r.url)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = content
+
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    async def iter_records(self, url, headers=None, params=None,
+                           page_size=500):
+        """ Iterates asynchronously over every record of a list endpoint.
+
+        :return records: an async iterator of record dictionaries
+        """
+        params = dict(params or {})
+        params['limit'] = page_size
+        params['format'] = 'ndjson'
+
+        while True:
+            response = await self.get(url, headers=headers, params=params)
+            response.raise_for_status()
+
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
+
+            cursor = response.headers.get('X-Next-Cursor')
+            if not cursor:
+                return
+
+            params['cursor'] = cursor
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+
+class _AsyncClient:
+    """ Mixin that closes the client's session, if it created it. """
+    async def close(self):
+        if self._owns_session:
+            await self.session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+class Enrichment(_AsyncClient, e.Enrichment):
+    def __init__(self, token, session=None):
+        super().__init__(token, session=session or AsyncSession())
+        self._owns_session = session is None
+
+
+class Security(_AsyncClient, s.Security):
+    def __init__(self, session=None):
+        super().__init__(session=session or AsyncSession())
+        self._owns_session = session is None
+
+
+class Spy(_AsyncClient, spy.Spy):
+    def __init__(self, token, session=None):
+        super().__init__(token, session=session or AsyncSession())
+        self._owns_session = session is None
+
+
+async def gather(aws, limit=10):
+    """ Runs awaitables concurrently, at most `limit` at a time.
+
+    :param aws: an iterable of awaitables
+    :param limit: the maximum number running at once
+    :return results: a list of results, in order
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(aw):
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(run(aw) for aw in aws))
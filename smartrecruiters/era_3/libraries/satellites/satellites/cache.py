@@ -0,0 +1,110 @@
+"""
+satellites.cache
+~~~~~~~~~~~~~~~~
+
+This module implements an in-process cache of token verification results.
+"""
+
+import time
+import threading
+
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class TokenCache:
+    """ A size-bounded, thread-safe LRU cache of authorization results.
+
+    Tokens that satellite-s accepted are kept for `ttl` seconds, tokens it
+    rejected for `negative_ttl` seconds. Once `size` entries are held, the
+    least recently used entry is evicted.
+
+    :param size: the maximum number of cached tokens
+    :param ttl: seconds to keep an authorized token
+    :param negative_ttl: seconds to keep a rejected token
+    """
+    def __init__(self, size=1024, ttl=300, negative_ttl=30):
+        self.size = size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, token):
+        """ Gets the cached result for a token.
+
+        :param token: an access token
+        :return authorized: True or False, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+
+            authorized, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[token]
+                return None
+
+            self._entries.move_to_end(token)
+
+            return authorized
+
+    def set(self, token, authorized):
+        """ Caches the result for a token.
+
+        :param token: an access token
+        :param authorized: whether satellite-s accepted the token
+        """
+        ttl = self.ttl if authorized else self.negative_ttl
+        if ttl <= 0 or self.size <= 0:
+            return
+
+        with self._lock:
+            self._entries[token] = (authorized, time.monotonic() + ttl)
+            self._entries.move_to_end(token)
+
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tokens=None):
+        """ Drops tokens from the cache.
+
+        :param tokens: a list of access tokens, or None to drop everything
+        """
+        with self._lock:
+            if tokens is None:
+                self._entries.clear()
+                return
+
+            for token in tokens:
+                self._entries.pop(token, None)
+
+
+_tokens = None
+_tokens_lock = threading.Lock()
+
+
+def get_token_cache():
+    """ Gets the process-wide token cache, configured from settings.
+
+    :return cache: a TokenCache
+    """
+    global _tokens
+
+    if _tokens is None:
+        with _tokens_lock:
+            if _tokens is None:
+                _tokens = TokenCache(
+                    size=getattr(
+                        settings, 'SATELLITES_TOKEN_CACHE_SIZE', 1024),
+                    ttl=getattr(settings, 'SATELLITES_TOKEN_CACHE_TTL', 300),
+                    negative_ttl=getattr(
+                        settings, 'SATELLITES_TOKEN_CACHE_NEGATIVE_TTL', 30))
+
+    return _tokens
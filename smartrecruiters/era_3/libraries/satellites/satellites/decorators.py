@@ -5,7 +5,9 @@ satellites.decorators
 This module implements standard decorators for the Satellites.
 """
 
+from . import tokens
 from .s import Security
+from .cache import get_token_cache
 
 from django.http import HttpResponse, HttpResponseForbidden
 
@@ -32,15 +34,42 @@ def cors_enabled(func):
     return decorator
 
 
+def _authorize_signed(token):
+    try:
+        tokens.authorize(token)
+    except tokens.TokenError:
+        return False
+
+    return True
+
+
 def auth_required(func):
+    """ Rejects requests without a valid access token.
+
+    Signed tokens are verified in-process when SATELLITES_TOKEN_KEYS and
+    SATELLITES_HOOK_KEY are set; other tokens are checked with satellite-s
+    and cached.
+    """
     def decorator(request, *args, **kwargs):
         token = (
             request.headers['Authorization'].split()[1]
             if 'Authorization' in request.headers
             else '')
 
-        security = Security()
-        if not security.authorize(token):
+        if tokens.is_signed(token) and tokens.verifies_locally():
+            authorized = _authorize_signed(token)
+        else:
+            cache = get_token_cache()
+            authorized = cache.get(token)
+            if authorized is None:
+                response = Security().authorize(token)
+                authorized = response.ok
+
+                # only definitive answers are cached, not satellite-s errors
+                if response.status_code in (200, 403):
+                    cache.set(token, authorized)
+
+        if not authorized:
             print(f"Authorization failed, invalid token: {token}.")
             return HttpResponseForbidden()
         else:
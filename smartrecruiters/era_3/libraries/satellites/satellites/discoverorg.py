@@ -0,0 +1,272 @@
+"""
+satellites.discoverorg
+~~~~~~~~~~~~~~~~~~~~~~
+
+This module implements a DiscoverOrg session shared across clients and runs.
+"""
+
+import json
+import time
+import hashlib
+import threading
+
+import requests
+
+from django.conf import settings
+from django.core.cache import caches
+
+from satellites.outbound import get_provider
+
+BASE = 'https://papi.discoverydb.com/papi'
+
+
+class ResponseCache:
+    """ Caches successful DiscoverOrg responses by request content.
+
+    Entries are keyed by a hash of the method, path, query and body, so the
+    same search for the same domain or company is only paid for once per
+    `ttl`. They live in a Django cache, whose `MAX_ENTRIES` option bounds
+    the size; hits and misses are counted per process.
+
+    :param ttl: seconds to keep a response
+    :param cache: a Django cache, or None for the configured one
+    """
+    def __init__(self, ttl=None, cache=None):
+        self.ttl = ttl or getattr(
+            settings, 'SATELLITES_DISCOVERORG_RESPONSE_TTL', 604800)
+
+        self.hits = 0
+        self.misses = 0
+
+        self._cache = cache
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        """ Gets the cache responses are kept in. """
+        if self._cache is None:
+            self._cache = caches[getattr(
+                settings, 'SATELLITES_DISCOVERORG_RESPONSE_CACHE', 'default')]
+
+        return self._cache
+
+    def key(self, method, path, params=None, data=None):
+        """ Gets the cache key for a request.
+
+        :return key: a cache key
+        """
+        if isinstance(data, str):
+            try:
+                data = json.loads(data)
+            except ValueError:
+                pass
+
+        content = json.dumps(
+            [method.upper(), path, params, data],
+            sort_keys=True,
+            default=str)
+        digest = hashlib.sha256(content.encode()).hexdigest()
+
+        return f'satellites:discoverorg:response:{digest}'
+
+    def get(self, key):
+        """ Gets a cached response.
+
+        :param key: a cache key
+        :return response: a requests.Response, or None on a miss
+        """
+        entry = self.cache.get(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+
+        response = requests.Response()
+        response.status_code, headers, response._content = entry
+        response.headers.update(headers)
+
+        return response
+
+    def set(self, key, response):
+        """ Caches a response, if it succeeded.
+
+        :param key: a cache key
+        :param response: a requests.Response
+        """
+        if response.status_code != 200:
+            return
+
+        self.cache.set(
+            key,
+            (response.status_code, dict(response.headers), response.content),
+            timeout=self.ttl)
+
+    @property
+    def stats(self):
+        """ Gets the hit and miss counts.
+
+        :return stats: a dictionary of hits, misses and the hit ratio
+        """
+        total = self.hits + self.misses
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'ratio': self.hits / total if total else 0}
+
+
+class DiscoverOrgSession:
+    """ Keeps a DiscoverOrg session token and sends requests with it.
+
+    The token is stored in a Django cache, so every client and every run
+    sharing that cache reuses it instead of logging in again. It's renewed
+    `refresh` seconds before its `lifetime` runs out, and once more when a
+    request comes back with a 401.
+
+    :param username: a DiscoverOrg username
+    :param password: a DiscoverOrg password
+    :param key: a DiscoverOrg API partner key
+    :param base: the API base URL
+    :param lifetime: seconds a token is trusted for after login
+    :param refresh: seconds before expiry to log in again
+    :param cache: a Django cache, or None for the configured one
+    :param session: a Provider, or None for the shared `discoverorg` one
+    :param responses: a ResponseCache for cached requests, or None for one
+        using the configured cache
+    :param bypass: whether cached requests skip the response cache lookup;
+        their responses are still stored
+    """
+    def __init__(self, username, password, key, base=BASE, lifetime=None,
+                 refresh=None, cache=None, session=None, responses=None,
+                 bypass=None):
+        self.username = username
+        self.password = password
+        self.key = key
+        self.base = base
+
+        self.lifetime = lifetime or getattr(
+            settings, 'SATELLITES_DISCOVERORG_TOKEN_TTL', 3600)
+        self.refresh = refresh if refresh is not None else getattr(
+            settings, 'SATELLITES_DISCOVERORG_TOKEN_REFRESH', 300)
+
+        self._cache = cache
+        self.session = session or get_provider('discoverorg')
+
+        self.responses = responses or ResponseCache()
+        self.bypass = bypass if bypass is not None else getattr(
+            settings, 'SATELLITES_DISCOVERORG_CACHE_BYPASS', False)
+
+        digest = hashlib.sha256(
+            f'{base} {username} {key}'.encode()).hexdigest()
+        self.cache_key = f'satellites:discoverorg:token:{digest}'
+
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        """ Gets the cache tokens are kept in. """
+        if self._cache is None:
+            self._cache = caches[getattr(
+                settings, 'SATELLITES_DISCOVERORG_CACHE', 'default')]
+
+        return self._cache
+
+    def _cached(self):
+        """ Gets the cached token, unless it's due for a refresh. """
+        entry = self.cache.get(self.cache_key)
+        if entry and entry['expires'] - self.refresh > time.time():
+            return entry['token']
+
+        return None
+
+    @property
+    def token(self):
+        """ Gets a live session token, logging in if there isn't one. """
+        token = self._cached()
+        if token:
+            return token
+
+        with self._lock:
+            return self._cached() or self.login()
+
+    def login(self):
+        """ Logs in and caches the new session token.
+
+        :return token: a session token
+        """
+        response = self.session.post(
+            ''.join([self.base, '/login']),
+            headers={'Content-Type': 'application/json'},
+            data=json.dumps({
+                'username': self.username,
+                'password': self.password,
+                'partnerKey': self.key}))
+        response.raise_for_status()
+
+        token = response.headers['X-AUTH-TOKEN']
+        self.cache.set(
+            self.cache_key,
+            {'token': token, 'expires': time.time() + self.lifetime},
+            timeout=self.lifetime)
+
+        return token
+
+    def invalidate(self, token):
+        """ Drops a token from the cache, unless it was already replaced.
+
+        :param token: a session token that was rejected
+        """
+        entry = self.cache.get(self.cache_key)
+        if entry and entry['token'] == token:
+            self.cache.delete(self.cache_key)
+
+    def request(self, method, path, headers=None, cached=False, **kwargs):
+        """ Sends an authenticated request, logging in again on a 401.
+
+        :param method: an HTTP method
+        :param path: a path under the API base URL
+        :param headers: a dictionary of extra request headers
+        :param cached: whether to answer from, and store in, the response
+            cache; only for requests that don't change anything
+        :return response: a requests.Response
+        """
+        if cached:
+            key = self.responses.key(
+                method, path, kwargs.get('params'), kwargs.get('data'))
+            if not self.bypass:
+                response = self.responses.get(key)
+                if response is not None:
+                    return response
+
+            # searches are POSTs, but safe to repeat
+            kwargs['idempotent'] = True
+
+        for attempt in range(2):
+            token = self.token
+
+            response = self.session.request(
+                method,
+                ''.join([self.base, path]),
+                headers={
+                    **(headers or {}),
+                    'X-PARTNER-KEY': self.key,
+                    'X-AUTH-TOKEN': token},
+                **kwargs)
+
+            if response.status_code != 401:
+                break
+
+            self.invalidate(token)
+
+        if cached:
+            self.responses.set(key, response)
+
+        return response
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
@@ -0,0 +1,138 @@
+"""
+satellites.domains
+~~~~~~~~~~~~~~~~~~
+
+This module implements domain normalization and email domain matching.
+"""
+
+import re
+import pkgutil
+import functools
+
+_scheme = re.compile(r'^[a-z][a-z0-9+.-]*://')
+_path = re.compile(r'[/?#\s]')
+
+
+def _idna(rule):
+    try:
+        return '.'.join(
+            label if label == '*' else label.encode('idna').decode('ascii')
+            for label in rule.split('.'))
+    except UnicodeError:
+        return rule
+
+
+@functools.lru_cache(maxsize=None)
+def get_rules():
+    """ Gets the public suffix rules, read once per process.
+
+    They're the ICANN section of the Public Suffix List, vendored as
+    `public_suffix_list.dat`; update it from
+    https://publicsuffix.org/list/public_suffix_list.dat now and then.
+
+    :return rules: a (suffixes, wildcards, exceptions) tuple of frozensets;
+        a wildcard `*.ck` is kept as `ck`, and an exception `!www.ck` as
+        `www.ck`
+    """
+    data = pkgutil.get_data('satellites', 'public_suffix_list.dat')
+
+    suffixes, wildcards, exceptions = set(), set(), set()
+    for line in data.decode('utf-8').splitlines():
+        rule = line.strip()
+        if not rule or rule.startswith('//'):
+            continue
+
+        if rule.startswith('!'):
+            exceptions.add(_idna(rule[1:]))
+        elif rule.startswith('*.'):
+            wildcards.add(_idna(rule[2:]))
+        else:
+            suffixes.add(_idna(rule))
+
+    return frozenset(suffixes), frozenset(wildcards), frozenset(exceptions)
+
+
+def normalize(value):
+    """ Normalizes a URL, host name or email address to a host name.
+
+    The scheme, credentials or mailbox, port, path, a leading `www.` and a
+    trailing dot are dropped, and the host is lowercased and IDNA-encoded.
+
+    :param value: a URL, host name or email address
+    :return host: a host name, or an empty string
+    """
+    if not isinstance(value, str):
+        return ''
+
+    value = _scheme.sub('', value.strip().lower()).lstrip('/')
+    host = _path.split(value, 1)[0]
+    host = host.rpartition('@')[2].partition(':')[0].strip('.')
+
+    if host.startswith('www.'):
+        host = host[4:]
+
+    try:
+        host = host.encode('idna').decode('ascii')
+    except UnicodeError:
+        pass
+
+    return host
+
+
+@functools.lru_cache(maxsize=4096)
+def registrable_domain(host):
+    """ Gets the registrable domain of a host, one label below its suffix.
+
+    Suffixes come from the Public Suffix List. A host under a top-level
+    domain the list doesn't know is its own registrable domain, so it only
+    matches exactly.
+
+    :param host: a normalized host name
+    :return domain: the registrable domain, or an empty string when the
+        host is itself a public suffix or isn't a domain
+    """
+    labels = host.split('.')
+    if len(labels) < 2 or not all(labels):
+        return ''
+    if all(label.isdigit() for label in labels):
+        return host
+
+    suffixes, wildcards, exceptions = get_rules()
+
+    # the longest matching rule wins, so check from the left
+    for i in range(len(labels)):
+        suffix = '.'.join(labels[i:])
+        if suffix in exceptions:
+            # the exception's parent is the suffix
+            return suffix
+        if suffix in suffixes or '.'.join(labels[i + 1:]) in wildcards:
+            return '.'.join(labels[i - 1:]) if i else ''
+
+    return host
+
+
+class DomainMatcher:
+    """ Matches email addresses against an account's domain.
+
+    The account domain is parsed once; each address then costs a split and
+    a cached suffix lookup. Addresses match when they share the account's
+    registrable domain, so subdomains match either way around.
+
+    :param domain: an account's website URL or domain
+    """
+    def __init__(self, domain):
+        self.domain = registrable_domain(normalize(domain))
+
+    def __contains__(self, email):
+        return self.matches(email)
+
+    def matches(self, email):
+        """ Checks whether an email address belongs to the domain.
+
+        :param email: an email address
+        :return matches: True or False
+        """
+        if not self.domain or not isinstance(email, str) or '@' not in email:
+            return False
+
+        return registrable_domain(normalize(email)) == self.domain
@@ -5,30 +5,41 @@ satellites.e
 This module implements the client for satellite-e (enrichment).
 """
 
-import requests
+import json
+
+from .session import get_session
 
 
 class Enrichment:
-    def __init__(self, token):
+    def __init__(self, token, session=None):
         self.base = 'https://e.satellites.smartian.space'
         self.token = token
+        self.session = session or get_session()
 
     def get_accounts(self, params=None):
         """ Gets a list of active accounts. """
         url = ''.join([self.base, f"/accounts"])
         headers = {'Authorization': f"Basic {self.token}"}
 
-        response = requests.get(
+        response = self.session.get(
             url, headers=headers, params=params)
 
         return response
 
+    def iter_accounts(self, params=None, page_size=500):
+        """ Iterates over every matching account, page by page. """
+        url = ''.join([self.base, f"/accounts"])
+        headers = {'Authorization': f"Basic {self.token}"}
+
+        return self.session.iter_records(
+            url, headers=headers, params=params, page_size=page_size)
+
     def create_account(self, data):
         """ Creates an account. """
         url = ''.join([self.base, f"/accounts/create"])
         headers = {'Authorization': f"Basic {self.token}"}
 
-        response = requests.post(url, headers=headers, data=data)
+        response = self.session.post(url, headers=headers, data=data)
 
         return response
 
@@ -37,7 +48,7 @@ class Enrichment:
         url = ''.join([self.base, f"/accounts/{id}/update"])
         headers = {'Authorization': f"Basic {self.token}"}
 
-        response = requests.post(url, headers=headers, data=data)
+        response = self.session.post(url, headers=headers, data=data)
 
         return response
 
@@ -46,7 +57,7 @@ class Enrichment:
         url = ''.join([self.base, f"/accounts/{id}/remove"])
         headers = {'Authorization': f"Basic {self.token}"}
 
-        response = requests.delete(url, headers=headers)
+        response = self.session.delete(url, headers=headers)
 
         return response
 
@@ -55,16 +66,24 @@ class Enrichment:
         url = ''.join([self.base, f"/contacts"])
         headers = {'Authorization': f"Basic {self.token}"}
 
-        response = requests.get(url, headers=headers, params=params)
+        response = self.session.get(url, headers=headers, params=params)
 
         return response
 
+    def iter_contacts(self, params=None, page_size=500):
+        """ Iterates over every matching contact, page by page. """
+        url = ''.join([self.base, f"/contacts"])
+        headers = {'Authorization': f"Basic {self.token}"}
+
+        return self.session.iter_records(
+            url, headers=headers, params=params, page_size=page_size)
+
     def create_contact(self, data):
         """ Creates a new contact. """
         url = ''.join([self.base, f"/contacts/create"])
         headers = {'Authorization': f"Basic {self.token}"}
 
-        response = requests.post(url, headers=headers, data=data)
+        response = self.session.post(url, headers=headers, data=data)
 
         return response
 
@@ -73,7 +92,7 @@ class Enrichment:
         url = ''.join([self.base, f"/contacts/{id}/update"])
         headers = {'Authorization': f"Basic {self.token}"}
 
-        response = requests.post(url, headers=headers, data=data)
+        response = self.session.post(url, headers=headers, data=data)
 
         return response
 
@@ -82,6 +101,45 @@ class Enrichment:
         url = ''.join([self.base, f"/contacts/{id}/delete"])
         headers = {'Authorization': f"Basic {self.token}"}
 
-        response = requests.delete(url, headers=headers)
+        response = self.session.delete(url, headers=headers)
+
+        return response
+
+    def bulk_create_contacts(self, data):
+        """ Creates contacts in one batch.
+
+        :param data: a list of dictionaries of contact data, each with a `pid`
+        """
+        url = ''.join([self.base, f"/contacts/bulk/create"])
+        headers = {'Authorization': f"Basic {self.token}"}
+
+        response = self.session.post(
+            url, headers=headers, data=json.dumps(data, default=str))
+
+        return response
+
+    def bulk_update_contacts(self, data):
+        """ Updates contacts in one batch.
+
+        :param data: a list of dictionaries of contact data, each with an `id`
+        """
+        url = ''.join([self.base, f"/contacts/bulk/update"])
+        headers = {'Authorization': f"Basic {self.token}"}
+
+        response = self.session.post(
+            url, headers=headers, data=json.dumps(data, default=str))
+
+        return response
+
+    def bulk_delete_contacts(self, ids):
+        """ Deletes contacts in one batch.
+
+        :param ids: a list of contact IDs
+        """
+        url = ''.join([self.base, f"/contacts/bulk/delete"])
+        headers = {'Authorization': f"Basic {self.token}"}
+
+        response = self.session.delete(
+            url, headers=headers, data=json.dumps(ids, default=str))
 
         return response
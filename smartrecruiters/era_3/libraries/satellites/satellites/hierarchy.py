@@ -0,0 +1,142 @@
+"""
+satellites.hierarchy
+~~~~~~~~~~~~~~~~~~~~
+
+This module implements org hierarchies stored as materialized-path graphs.
+
+A hierarchy model holds one row per org chart node, with these fields:
+
+- `account`: the account the node belongs to
+- `doid`: the node's DiscoverOrg ID
+- `parent`: the DiscoverOrg ID of the node it reports to, or None
+- `path`: the IDs from the root down to the node, as `/root/.../doid/`
+- `depth`: the number of nodes above it
+- `name` and `title`
+
+Subtrees are then a prefix match on an indexed `path`, and the reports-to
+chain is the IDs already in the path.
+"""
+
+from django.db import transaction
+
+from satellites.upsert import upsert
+
+
+def parse_orgchart(data):
+    """ Flattens a DiscoverOrg org chart into node dictionaries.
+
+    Nodes may list their parent through `parentId` or nest their reports
+    under `children`; person details may sit on the node or under `person`.
+
+    :param data: a decoded org chart response
+    :return nodes: a list of dictionaries of doid, parent, name and title
+    """
+    nodes = []
+
+    def visit(node, parent):
+        person = node.get('person') or node
+        doid = node.get('id') or person.get('id')
+        if doid is None:
+            return
+
+        nodes.append({
+            'doid': str(doid),
+            'parent': (
+                str(node['parentId'])
+                if node.get('parentId') is not None
+                else parent),
+            'name': person.get('fullName') or '',
+            'title': person.get('title') or ''})
+
+        for child in node.get('children') or []:
+            visit(child, str(doid))
+
+    for node in (data or {}).get('nodes') or []:
+        visit(node, None)
+
+    return nodes
+
+
+def build_paths(nodes):
+    """ Sets the path and depth of each node.
+
+    Nodes whose parent is missing, or that sit on a cycle, become roots.
+
+    :param nodes: a list of node dictionaries, changed in place
+    :return nodes: the same list
+    """
+    by_doid = {node['doid']: node for node in nodes}
+    paths = {}
+
+    def path(doid, seen):
+        if doid in paths:
+            return paths[doid]
+
+        node = by_doid[doid]
+        parent = node['parent']
+        if parent not in by_doid or parent in seen:
+            node['parent'] = None
+            paths[doid] = f'/{doid}/'
+        else:
+            seen.add(doid)
+            paths[doid] = f'{path(parent, seen)}{doid}/'
+
+        return paths[doid]
+
+    for node in nodes:
+        node['path'] = path(node['doid'], set())
+        node['depth'] = node['path'].count('/') - 2
+
+    return nodes
+
+
+def sync_hierarchy(model, account, data):
+    """ Syncs an account's hierarchy model rows with an org chart.
+
+    Only nodes that were added, moved or renamed are written, and nodes no
+    longer on the chart are removed. A chart without nodes, which is how
+    DiscoverOrg answers errors, leaves the stored hierarchy alone.
+
+    :param model: a hierarchy model class
+    :param account: an Account object
+    :param data: a decoded org chart response
+    :return counts: a dictionary of created, updated, unchanged and
+        deleted counts
+    """
+    nodes = build_paths(parse_orgchart(data))
+    if not nodes:
+        return {'created': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+
+    for node in nodes:
+        node['account'] = account
+
+    with transaction.atomic():
+        counts = upsert(model, nodes, keys=('account', 'doid'))
+        counts['deleted'], _ = model.objects.filter(account=account).exclude(
+            doid__in=[node['doid'] for node in nodes]).delete()
+
+    return counts
+
+
+def subtree(node):
+    """ Gets a node and everyone under it.
+
+    :param node: a hierarchy model object
+    :return nodes: a QuerySet, ordered root first
+    """
+    return type(node).objects.filter(
+        account_id=node.account_id,
+        path__startswith=node.path).order_by('path')
+
+
+def reports_to(node):
+    """ Gets the chain of nodes a node reports to.
+
+    :param node: a hierarchy model object
+    :return nodes: a QuerySet, ordered from the direct parent up
+    """
+    doids = node.path.strip('/').split('/')[:-1]
+
+    return type(node).objects.filter(
+        account_id=node.account_id,
+        doid__in=doids).order_by('-depth')
@@ -0,0 +1,48 @@
+"""
+satellites.hooks
+~~~~~~~~~~~~~~~~
+
+This module implements endpoints that satellite-s pushes to.
+"""
+
+import hmac
+import json
+
+from .cache import get_token_cache
+
+from django.conf import settings
+from django.http import (
+    HttpResponse, HttpResponseBadRequest, HttpResponseForbidden)
+from django.views.decorators.csrf import csrf_exempt
+
+
+@csrf_exempt
+def invalidate_tokens(request):
+    """ Drops tokens from the local token cache.
+
+    Expects a shared key in the `X-Hook-Key` header and a JSON body of
+    `{"tokens": [...]}`; a body without `tokens` clears the whole cache.
+    """
+    key = getattr(settings, 'SATELLITES_HOOK_KEY', '')
+    if not key or not hmac.compare_digest(
+            request.headers.get('X-Hook-Key', ''), key):
+        return HttpResponseForbidden()
+
+    if request.method != 'POST':
+        return HttpResponseBadRequest()
+
+    try:
+        body = json.loads(request.body or b'{}')
+    except ValueError:
+        return HttpResponseBadRequest()
+
+    if not isinstance(body, dict):
+        return HttpResponseBadRequest()
+
+    get_token_cache().invalidate(body.get('tokens'))
+
+    response = HttpResponse()
+    response.content = b'Tokens invalidated successfully.'
+    response.status_code = 200
+
+    return response
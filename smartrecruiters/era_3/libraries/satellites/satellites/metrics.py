@@ -0,0 +1,396 @@
+"""
+satellites.metrics
+~~~~~~~~~~~~~~~~~~
+
+This module implements run metrics for the recurring jobs.
+
+A run records per-stage timings and query counts, counts of processed
+records, and external API call counts and latencies. When it ends, it's
+logged as one JSON line on the `satellites.metrics` logger and kept in the
+Django cache, where the `metrics` view serves the last run of every job in
+the Prometheus text format. A job split into tasks runs once per task; runs
+that share a batch are merged, so the kept run describes the whole batch.
+"""
+
+import json
+import time
+import logging
+import functools
+import threading
+import contextlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.http import HttpResponse, HttpResponseForbidden
+
+logger = logging.getLogger('satellites.metrics')
+
+# upper bounds of the API latency histogram buckets, in seconds
+BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+CACHE_PREFIX = 'satellites:metrics:'
+
+_active = None
+
+
+def _cache():
+    return caches[getattr(settings, 'SATELLITES_METRICS_CACHE', 'default')]
+
+
+class JobMetrics:
+    """ Collects the metrics of one job run.
+
+    Use it as a context manager around the run; while it's open, it's the
+    run `current()` returns, and every query on the calling thread's
+    connection is counted.
+
+    :param job: the job's name, e.g. its cron code
+    :param batch: the ID shared by the runs of one enqueued batch of tasks
+    """
+    def __init__(self, job, batch=None):
+        self.job = job
+        self.batch = batch
+
+        self.started = None
+        self.duration = None
+        self.status = None
+
+        self.queries = 0
+        self.stages = {}
+        self.records = {}
+        self.calls = {}
+
+        self._lock = threading.Lock()
+        self._wrapper = None
+
+    def __enter__(self):
+        global _active
+
+        self.started = time.time()
+        self._start = time.monotonic()
+
+        self._wrapper = connection.execute_wrapper(self._count_query)
+        self._wrapper.__enter__()
+
+        _active = self
+
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _active
+
+        _active = None
+        self._wrapper.__exit__(exc_type, exc, tb)
+
+        self.duration = time.monotonic() - self._start
+        self.status = 'error' if exc_type else 'ok'
+
+        self.publish()
+
+    def _count_query(self, execute, sql, params, many, context):
+        self.queries += 1
+
+        return execute(sql, params, many, context)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """ Times a stage of the run and counts its queries.
+
+        :param name: the stage's name
+        """
+        start = time.monotonic()
+        queries = self.queries
+        try:
+            yield
+        finally:
+            stage = self.stages.setdefault(
+                name, {'seconds': 0, 'queries': 0})
+            stage['seconds'] += time.monotonic() - start
+            stage['queries'] += self.queries - queries
+
+    def count(self, name, n=1):
+        """ Counts processed records.
+
+        :param name: what was processed, e.g. `contacts`
+        :param n: how many
+        """
+        with self._lock:
+            self.records[name] = self.records.get(name, 0) + n
+
+    def record_call(self, provider, seconds, failed=False):
+        """ Records an external API call.
+
+        :param provider: the API's name, e.g. `salesforce`
+        :param seconds: the call's latency
+        :param failed: whether the call raised or returned an error
+        """
+        with self._lock:
+            calls = self.calls.setdefault(provider, {
+                'count': 0,
+                'errors': 0,
+                'seconds': 0,
+                'buckets': [0] * len(BUCKETS)})
+
+            calls['count'] += 1
+            calls['errors'] += int(failed)
+            calls['seconds'] += seconds
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    calls['buckets'][i] += 1
+
+    @contextlib.contextmanager
+    def call(self, provider):
+        """ Times an external API call made inside the block.
+
+        :param provider: the API's name, e.g. `salesforce`
+        """
+        start = time.monotonic()
+        try:
+            yield
+        except Exception:
+            self.record_call(provider, time.monotonic() - start, True)
+            raise
+        self.record_call(provider, time.monotonic() - start)
+
+    def summary(self):
+        """ Gets the run's metrics.
+
+        :return summary: a JSON-serializable dictionary
+        """
+        return {
+            'job': self.job,
+            'batch': self.batch,
+            'started': self.started,
+            'duration': self.duration,
+            'status': self.status,
+            'queries': self.queries,
+            'stages': self.stages,
+            'records': self.records,
+            'calls': self.calls}
+
+    def publish(self):
+        """ Logs the run and keeps it for the metrics endpoint. """
+        summary = self.summary()
+        logger.info(json.dumps(summary))
+
+        try:
+            cache = _cache()
+            key = f'{CACHE_PREFIX}{self.job}'
+
+            # the job list is shared by every job, so one lock covers it
+            # along with the job's summary
+            with _locked(cache, f'{CACHE_PREFIX}lock'):
+                jobs = set(cache.get(f'{CACHE_PREFIX}jobs') or ())
+                if self.job not in jobs:
+                    jobs.add(self.job)
+                    cache.set(
+                        f'{CACHE_PREFIX}jobs', sorted(jobs), timeout=None)
+
+                last = cache.get(key)
+                if self.batch and last and last.get('batch') == self.batch:
+                    summary = merge(last, summary)
+
+                cache.set(key, summary, timeout=None)
+        except Exception:
+            logger.exception('could not store metrics for %s', self.job)
+
+
+def merge(summary, other):
+    """ Merges the summaries of two runs of one batch.
+
+    :param summary: a run summary
+    :param other: another run summary of the same batch
+    :return summary: a summary of both runs
+    """
+    def add(a, b):
+        if isinstance(a, dict):
+            return {
+                key: add(a[key], b[key]) if key in a and key in b
+                else a.get(key, b.get(key))
+                for key in {**a, **b}}
+        if isinstance(a, list):
+            return [x + y for x, y in zip(a, b)]
+
+        return a + b
+
+    started = min(summary['started'], other['started'])
+    ended = max(
+        summary['started'] + summary['duration'],
+        other['started'] + other['duration'])
+
+    return {
+        'job': summary['job'],
+        'batch': summary['batch'],
+        'started': started,
+        'duration': ended - started,
+        'status': 'ok' if summary['status'] == other['status'] == 'ok'
+        else 'error',
+        'queries': summary['queries'] + other['queries'],
+        'stages': add(summary['stages'], other['stages']),
+        'records': add(summary['records'], other['records']),
+        'calls': add(summary['calls'], other['calls'])}
+
+
+@contextlib.contextmanager
+def _locked(cache, key, timeout=10):
+    """ Holds a cache lock, so workers don't lose each other's merges.
+
+    The lock is taken anyway once the timeout runs out, so a worker that
+    died holding it can't block the rest.
+    """
+    deadline = time.monotonic() + timeout
+    while not cache.add(key, 1, timeout=timeout):
+        if time.monotonic() >= deadline:
+            break
+        time.sleep(0.05)
+
+    try:
+        yield
+    finally:
+        cache.delete(key)
+
+
+def current():
+    """ Gets the open run, if any.
+
+    :return metrics: a JobMetrics, or None
+    """
+    return _active
+
+
+@contextlib.contextmanager
+def stage(name):
+    """ Times a stage of the open run, if any. """
+    if _active is None:
+        yield
+        return
+
+    with _active.stage(name):
+        yield
+
+
+@contextlib.contextmanager
+def call(provider):
+    """ Times an external API call for the open run, if any. """
+    if _active is None:
+        yield
+        return
+
+    with _active.call(provider):
+        yield
+
+
+def count(name, n=1):
+    """ Counts processed records for the open run, if any. """
+    if _active is not None:
+        _active.count(name, n)
+
+
+def record_call(provider, seconds, failed=False):
+    """ Records an external API call for the open run, if any. """
+    if _active is not None:
+        _active.record_call(provider, seconds, failed)
+
+
+def instrumented(method):
+    """ Records a run around a job method, named after the job's code.
+
+    A job's `batch` attribute, set by the task runner, names the batch the
+    run belongs to.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        job = getattr(self, 'code', type(self).__name__)
+        with JobMetrics(job, getattr(self, 'batch', None)):
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def _labels(**labels):
+    return ','.join(
+        '{}="{}"'.format(
+            key, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+        for key, value in labels.items())
+
+
+def render(summaries):
+    """ Renders run summaries in the Prometheus text format.
+
+    :param summaries: a list of run summaries
+    :return text: the exposition text
+    """
+    lines = []
+
+    def metric(name, kind, help, samples):
+        lines.append(f'# HELP {name} {help}')
+        lines.append(f'# TYPE {name} {kind}')
+        for suffix, labels, value in samples:
+            lines.append(f'{name}{suffix}{{{_labels(**labels)}}} {value}')
+
+    metric('satellites_job_last_run_timestamp_seconds', 'gauge',
+           'When the last run of the job started.',
+           [('', {'job': s['job']}, s['started']) for s in summaries])
+    metric('satellites_job_duration_seconds', 'gauge',
+           'How long the last run of the job took.',
+           [('', {'job': s['job']}, s['duration']) for s in summaries])
+    metric('satellites_job_success', 'gauge',
+           'Whether the last run of the job succeeded.',
+           [('', {'job': s['job']}, int(s['status'] == 'ok'))
+            for s in summaries])
+    metric('satellites_job_queries', 'gauge',
+           'Database queries in the last run of the job.',
+           [('', {'job': s['job']}, s['queries']) for s in summaries])
+    metric('satellites_job_stage_seconds', 'gauge',
+           'How long each stage of the last run took.',
+           [('', {'job': s['job'], 'stage': stage}, values['seconds'])
+            for s in summaries for stage, values in s['stages'].items()])
+    metric('satellites_job_stage_queries', 'gauge',
+           'Database queries in each stage of the last run.',
+           [('', {'job': s['job'], 'stage': stage}, values['queries'])
+            for s in summaries for stage, values in s['stages'].items()])
+    metric('satellites_job_records', 'gauge',
+           'Records processed in the last run of the job.',
+           [('', {'job': s['job'], 'kind': kind}, n)
+            for s in summaries for kind, n in s['records'].items()])
+    metric('satellites_job_api_errors', 'gauge',
+           'Failed external API calls in the last run of the job.',
+           [('', {'job': s['job'], 'provider': provider}, calls['errors'])
+            for s in summaries for provider, calls in s['calls'].items()])
+
+    samples = []
+    for s in summaries:
+        for provider, calls in s['calls'].items():
+            labels = {'job': s['job'], 'provider': provider}
+            for bound, n in zip(BUCKETS, calls['buckets']):
+                samples.append(('_bucket', {**labels, 'le': bound}, n))
+            samples.append(('_bucket', {**labels, 'le': '+Inf'}, calls['count']))
+            samples.append(('_sum', labels, calls['seconds']))
+            samples.append(('_count', labels, calls['count']))
+    metric('satellites_job_api_call_seconds', 'histogram',
+           'External API call latencies in the last run of the job.',
+           samples)
+
+    return '\n'.join(lines) + '\n'
+
+
+def metrics(request):
+    """ Serves the last run of every job in the Prometheus text format.
+
+    Requests must carry SATELLITES_METRICS_KEY as a bearer token; while it
+    isn't set, every request is denied.
+    """
+    key = getattr(settings, 'SATELLITES_METRICS_KEY', '')
+    if not key or request.META.get('HTTP_AUTHORIZATION') != f'Bearer {key}':
+        return HttpResponseForbidden()
+
+    cache = _cache()
+    jobs = cache.get(f'{CACHE_PREFIX}jobs') or []
+    summaries = [
+        summary
+        for summary in (cache.get(f'{CACHE_PREFIX}{job}') for job in jobs)
+        if summary]
+
+    return HttpResponse(
+        render(summaries), content_type='text/plain; version=0.0.4')
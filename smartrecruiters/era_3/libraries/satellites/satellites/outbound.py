@@ -0,0 +1,358 @@
+"""
+satellites.outbound
+~~~~~~~~~~~~~~~~~~~
+
+This module implements the outbound HTTP core shared by the provider clients.
+
+Every request to a provider, e.g. Salesforce, DiscoverOrg or Lusha, waits
+for a token from the provider's bucket and is refused while the provider's
+circuit is open. It's retried with jittered backoff on 429s and 5xxs,
+honoring `Retry-After`, and its latency is recorded for the run's metrics.
+Providers are shared per process, so every client and thread calling the
+same provider draws from the same bucket and trips the same circuit.
+"""
+
+import time
+import random
+import threading
+import email.utils
+
+import requests
+
+from django.conf import settings
+
+from satellites import metrics
+from satellites.session import SessionPool
+
+# methods that are safe to send again after a 5xx or a dropped connection;
+# a 429 means the request wasn't processed, so any method is retried then
+IDEMPOTENT = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+
+class CircuitOpen(requests.RequestException):
+    """ Raised instead of calling a provider whose circuit is open. """
+
+
+class TokenBucket:
+    """ Allows `rate` calls per second on average, in bursts of `burst`.
+
+    Callers over the limit reserve the next free token and sleep until it's
+    due, so waiting threads are served in order.
+
+    :param rate: tokens added per second, or 0 for no limit
+    :param burst: the most tokens held at once, or None for `rate`
+    """
+    def __init__(self, rate, burst=None, clock=time.monotonic,
+                 sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst or max(rate, 1)
+
+        self.clock = clock
+        self.sleep = sleep
+
+        self._tokens = self.burst
+        self._updated = clock()
+        self._resume = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """ Takes a token, blocking until one is available.
+
+        :return waited: the seconds spent waiting
+        """
+        with self._lock:
+            now = self.clock()
+            delay = max(self._resume - now, 0)
+
+            if self.rate:
+                self._tokens = min(
+                    self.burst,
+                    self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                self._tokens -= 1
+                if self._tokens < 0:
+                    delay = max(delay, -self._tokens / self.rate)
+
+        if delay > 0:
+            self.sleep(delay)
+
+        return delay
+
+    def pause(self, seconds):
+        """ Holds every caller back for a while, e.g. after a 429.
+
+        :param seconds: how long to hold them back
+        """
+        with self._lock:
+            self._resume = max(self._resume, self.clock() + seconds)
+
+
+class CircuitBreaker:
+    """ Stops calls to a provider after repeated failures.
+
+    After `threshold` failures in a row the circuit opens and calls are
+    refused. Once `cooldown` seconds have passed, one trial call is let
+    through; its success closes the circuit and its failure reopens it.
+
+    :param threshold: consecutive failures that open the circuit
+    :param cooldown: seconds to wait before the trial call
+    """
+    def __init__(self, threshold=5, cooldown=30, clock=time.monotonic):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.clock = clock
+
+        self.failures = 0
+        self.opened = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        """ Gets `closed`, `open` or `half-open`. """
+        if self.opened is None:
+            return 'closed'
+        if self._trial or self.clock() - self.opened >= self.cooldown:
+            return 'half-open'
+
+        return 'open'
+
+    def allow(self):
+        """ Checks whether a call may go through.
+
+        :return allowed: True or False
+        """
+        with self._lock:
+            if self.opened is None:
+                return True
+            if self._trial or self.clock() - self.opened < self.cooldown:
+                return False
+
+            self._trial = True
+
+            return True
+
+    def success(self):
+        """ Records a successful call, closing the circuit. """
+        with self._lock:
+            self.failures = 0
+            self.opened = None
+            self._trial = False
+
+    def failure(self):
+        """ Records a failed call, opening the circuit if it's one too many.
+        """
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.threshold:
+                self.opened = self.clock()
+                self._trial = False
+
+
+def retry_after(response):
+    """ Gets the seconds a response asks to wait before retrying.
+
+    :param response: a requests.Response
+    :return seconds: a number of seconds, or None without a valid header
+    """
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    return max(date.timestamp() - time.time(), 0)
+
+
+class Provider:
+    """ Sends requests to one provider, within its limits.
+
+    It has the request interface of a SessionPool, so clients take either.
+
+    :param name: the provider's name, used for metrics
+    :param rate: the average requests per second allowed, or 0 for no limit
+    :param burst: the requests allowed at once, or None for `rate`
+    :param retries: the retries after a 429, 5xx or dropped connection
+    :param backoff: the base backoff between retries, in seconds
+    :param max_backoff: the longest wait before a retry; a longer
+        `Retry-After` returns the response instead
+    :param threshold: consecutive failures that open the circuit
+    :param cooldown: seconds the circuit stays open
+    :param timeout: a (connect, read) timeout tuple, in seconds
+    :param session: a SessionPool, or None for one without retries of its
+        own
+    """
+    def __init__(self, name, rate=0, burst=None, retries=3, backoff=0.5,
+                 max_backoff=30, threshold=5, cooldown=30,
+                 timeout=(3.05, 30), session=None, sleep=time.sleep):
+        self.name = name
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+
+        self.bucket = TokenBucket(rate, burst, sleep=sleep)
+        self.breaker = CircuitBreaker(threshold, cooldown)
+
+        self.session = session or SessionPool(retries=0, timeout=timeout)
+        self.sleep = sleep
+
+    def delay(self, attempt, response=None):
+        """ Gets the wait before a retry.
+
+        :param attempt: the number of the failed attempt, from 0
+        :param response: the failed attempt's response, if any
+        :return seconds: a number of seconds, or None to stop retrying
+        """
+        jitter = random.uniform(0, self.backoff)
+
+        seconds = retry_after(response) if response is not None else None
+        if seconds is not None:
+            return seconds + jitter if seconds <= self.max_backoff else None
+
+        # full jitter, so clients that failed together don't retry together
+        return random.uniform(
+            0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def request(self, method, url, idempotent=None, send=None, **kwargs):
+        """ Sends a request, retrying it while that's safe and worthwhile.
+
+        :param method: an HTTP method
+        :param url: the request URL
+        :param idempotent: whether the request may be repeated after a 5xx
+            or dropped connection, or None to go by the method
+        :param send: a callable with the signature of `requests.request`,
+            or None for the provider's session
+        :return response: the last requests.Response
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT
+        send = send or self.session.request
+        kwargs.setdefault('timeout', self.timeout)
+
+        for attempt in range(self.retries + 1):
+            if not self.breaker.allow():
+                raise CircuitOpen(f'the {self.name} circuit is open')
+
+            self.bucket.acquire()
+
+            start = time.monotonic()
+            try:
+                response = send(method, url, **kwargs)
+            except Exception as exc:
+                metrics.record_call(self.name, time.monotonic() - start, True)
+                self.breaker.failure()
+
+                dropped = isinstance(
+                    exc, (requests.ConnectionError, requests.Timeout))
+                if not (dropped and idempotent) or attempt == self.retries:
+                    raise
+
+                self.sleep(self.delay(attempt))
+                continue
+
+            status = response.status_code
+            metrics.record_call(
+                self.name, time.monotonic() - start, status >= 400)
+
+            # a 429 still means the provider is up
+            if status >= 500:
+                self.breaker.failure()
+            else:
+                self.breaker.success()
+
+            if status not in RETRY_STATUSES or attempt == self.retries:
+                return response
+            if status != 429 and not idempotent:
+                return response
+
+            delay = self.delay(attempt, response)
+            if delay is None:
+                return response
+
+            if status == 429:
+                # the whole provider is throttled, not just this thread
+                self.bucket.pause(delay)
+            else:
+                self.sleep(delay)
+
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    def as_session(self):
+        """ Gets a requests.Session that sends through the provider.
+
+        For libraries that take a session of their own, like
+        simple_salesforce.
+
+        :return session: a requests.Session
+        """
+        return _ProviderSession(self)
+
+
+class _ProviderSession(requests.Session):
+    def __init__(self, provider):
+        super().__init__()
+
+        adapter = getattr(provider.session, 'adapter', None)
+        if adapter is not None:
+            self.mount('http://', adapter)
+            self.mount('https://', adapter)
+
+        self.provider = provider
+
+    def request(self, method, url, **kwargs):
+        return self.provider.request(
+            method, url, send=super().request, **kwargs)
+
+
+DEFAULTS = {
+    'salesforce': {'rate': 20, 'burst': 40},
+    'discoverorg': {'rate': 2, 'burst': 5},
+    'lusha': {'rate': 1, 'burst': 2},
+}
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def get_provider(name):
+    """ Gets the shared provider of a name.
+
+    Its options are the defaults for the name updated with the name's entry
+    in SATELLITES_PROVIDERS, e.g. `{'discoverorg': {'rate': 1}}`.
+
+    :param name: the provider's name
+    :return provider: a Provider
+    """
+    provider = _providers.get(name)
+    if provider is not None:
+        return provider
+
+    with _providers_lock:
+        if name not in _providers:
+            options = {
+                **DEFAULTS.get(name, {}),
+                **getattr(settings, 'SATELLITES_PROVIDERS', {}).get(name, {})}
+            _providers[name] = Provider(name, **options)
+
+    return _providers[name]
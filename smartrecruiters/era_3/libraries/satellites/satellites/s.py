@@ -5,18 +5,21 @@ satellites.s
 This module implements the client for satellite-s (security).
 """
 
-import requests
+import json
+
+from .session import get_session
 
 
 class Security:
-    def __init__(self):
+    def __init__(self, session=None):
         self.base = 'https://s.satellites.smartian.space'
+        self.session = session or get_session()
 
     def create_user(self, data):
         """ Creates a user. """
         url = ''.join([self.base, f"/create"])
 
-        response = requests.post(url, data=data)
+        response = self.session.post(url, data=data)
 
         return response
 
@@ -27,7 +30,7 @@ class Security:
             'username': username,
             'cid': cid}
 
-        response = requests.get(url, params=params)
+        response = self.session.get(url, params=params)
 
         return response
 
@@ -38,7 +41,7 @@ class Security:
         if username:
             headers['x-username'] = username
 
-        response = requests.get(url, headers=headers)
+        response = self.session.get(url, headers=headers)
 
         return response
 
@@ -49,7 +52,7 @@ class Security:
             'x-username': username,
             'x-password': password}
 
-        response = requests.get(url, headers=headers)
+        response = self.session.get(url, headers=headers)
 
         return response
 
@@ -58,6 +61,33 @@ class Security:
         url = ''.join([self.base, f"/authorize"])
         headers = {'Authorization': f"Basic {token}"}
 
-        response = requests.get(url, headers=headers)
+        response = self.session.get(url, headers=headers)
+
+        return response
+
+    def authorize_many(self, token, tokens):
+        """ Authorizes many tokens in one request.
+
+        The response is `{"authorized": {token: true or false}}`.
+
+        :param token: the caller's own access token
+        :param tokens: a list of access tokens to check
+        """
+        url = ''.join([self.base, f"/authorize/batch"])
+        headers = {
+            'Authorization': f"Basic {token}",
+            'Content-Type': 'application/json'}
+
+        response = self.session.post(
+            url, headers=headers, data=json.dumps({'tokens': list(tokens)}))
+
+        return response
+
+    def revocations(self, key):
+        """ Gets the signed token revocations, by subject. """
+        url = ''.join([self.base, f"/revocations"])
+        headers = {'X-Hook-Key': key}
+
+        response = self.session.get(url, headers=headers)
 
         return response
@@ -0,0 +1,135 @@
+"""
+satellites.session
+~~~~~~~~~~~~~~~~~~
+
+This module implements the pooled HTTP session shared by the clients.
+"""
+
+import json
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class SessionPool:
+    """ A thread-safe, keep-alive HTTP session with retries.
+
+    Every thread gets its own `requests.Session`, but all of them share one
+    adapter, so connections to each host are pooled and reused across
+    threads. Idempotent requests are retried with exponential backoff on
+    connection errors and 502/503/504 responses.
+
+    :param pool_size: the maximum number of kept-alive connections per host
+    :param hosts: the number of hosts to keep connection pools for
+    :param retries: the number of retries for idempotent requests
+    :param backoff: the backoff factor between retries, in seconds
+    :param timeout: a (connect, read) timeout tuple, in seconds
+    """
+    def __init__(self, pool_size=10, hosts=10, retries=3, backoff=0.3,
+                 timeout=(3.05, 30)):
+        self.timeout = timeout
+
+        self.adapter = HTTPAdapter(
+            pool_connections=hosts,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=retries,
+                backoff_factor=backoff,
+                status_forcelist=(502, 503, 504),
+                raise_on_status=False))
+
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        """ Gets the calling thread's session. """
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount('http://', self.adapter)
+            session.mount('https://', self.adapter)
+
+            self._local.session = session
+
+        return session
+
+    def request(self, method, url, **kwargs):
+        """ Sends a request, applying the default timeout. """
+        kwargs.setdefault('timeout', self.timeout)
+
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    def iter_records(self, url, headers=None, params=None, page_size=500):
+        """ Iterates over every record of a list endpoint, page by page.
+
+        Pages are requested as NDJSON and followed through the
+        `X-Next-Cursor` header, so only one page is held at a time.
+
+        :param url: a list endpoint URL
+        :param headers: a dictionary of request headers
+        :param params: a dictionary of filter parameters
+        :param page_size: the number of records per page
+        :return records: an iterator of record dictionaries
+        """
+        params = dict(params or {})
+        params['limit'] = page_size
+        params['format'] = 'ndjson'
+
+        while True:
+            response = self.get(
+                url, headers=headers, params=params, stream=True)
+            response.raise_for_status()
+
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
+
+            cursor = response.headers.get('X-Next-Cursor')
+            if not cursor:
+                return
+
+            params['cursor'] = cursor
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def configure(**kwargs):
+    """ Replaces the default session pool.
+
+    Accepts the same keyword arguments as SessionPool, and only affects
+    clients created afterwards.
+    """
+    global _pool
+
+    with _pool_lock:
+        _pool = SessionPool(**kwargs)
+
+    return _pool
+
+
+def get_session():
+    """ Gets the default session pool.
+
+    :return pool: a SessionPool
+    """
+    global _pool
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SessionPool()
+
+    return _pool
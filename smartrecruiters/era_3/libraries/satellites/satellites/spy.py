@@ -5,29 +5,38 @@ satellites.spy
 This module implements the client for satellite-e (enrichment).
 """
 
-import requests
+from .session import get_session
 
 
 class Spy:
-    def __init__(self, token):
+    def __init__(self, token, session=None):
         self.base = 'https://spy.satellites.smartian.space/api'
         self.token = token
+        self.session = session or get_session()
 
     def get(self, model, params=None):
         """ Gets a list of properties based on parameters. """
         url = ''.join([self.base, f"/{model}"])
         headers = {'Authorization': f"Basic {self.token}"}
 
-        response = requests.get(url, headers=headers, params=params)
+        response = self.session.get(url, headers=headers, params=params)
 
         return response
 
+    def iter(self, model, params=None, page_size=500):
+        """ Iterates over every matching object of a model, page by page. """
+        url = ''.join([self.base, f"/{model}"])
+        headers = {'Authorization': f"Basic {self.token}"}
+
+        return self.session.iter_records(
+            url, headers=headers, params=params, page_size=page_size)
+
     def create(self, parent, model, data):
         """ Creates a new property. """
         url = ''.join([self.base, f"/{parent}/{model}/create"])
         headers = {'Authorization': f"Basic {self.token}"}
 
-        response = requests.post(url, headers=headers, data=data)
+        response = self.session.post(url, headers=headers, data=data)
 
         return response
 
@@ -36,7 +45,7 @@ class Spy:
         url = ''.join([self.base, f"/{model}/{id}/update"])
         headers = {'Authorization': f"Basic {self.token}"}
 
-        response = requests.post(url, headers=headers, data=data)
+        response = self.session.post(url, headers=headers, data=data)
 
         return response
 
@@ -45,6 +54,6 @@ class Spy:
         url = ''.join([self.base, f"/{model}/{id}/delete"])
         headers = {'Authorization': f"Basic {self.token}"}
 
-        response = requests.delete(url, headers=headers)
+        response = self.session.delete(url, headers=headers)
 
         return response
@@ -0,0 +1,112 @@
+"""
+satellites.streaming
+~~~~~~~~~~~~~~~~~~~~
+
+This module implements paginated, streaming list responses for the Satellites.
+"""
+
+import json
+import itertools
+
+from django.core import serializers
+from django.core.exceptions import (
+    FieldDoesNotExist, FieldError, ValidationError)
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+
+CHUNK_SIZE = 500
+
+
+def _serialize(queryset, fields):
+    """ Yields serialized records, one chunk of objects at a time. """
+    objects = queryset.iterator(chunk_size=CHUNK_SIZE)
+    while True:
+        chunk = list(itertools.islice(objects, CHUNK_SIZE))
+        if not chunk:
+            return
+
+        for record in serializers.serialize('python', chunk, fields=fields):
+            yield json.dumps(record, cls=DjangoJSONEncoder)
+
+
+def _ndjson(records):
+    for record in records:
+        yield record + '\n'
+
+
+def _array(records):
+    yield '['
+    for i, record in enumerate(records):
+        yield record if i == 0 else ', ' + record
+    yield ']'
+
+
+def stream_queryset(queryset, params):
+    """ Streams a filtered queryset as a JSON response.
+
+    Besides field lookups, `params` may contain these reserved keys:
+
+    - `fields`: a comma-separated list of fields to project
+    - `limit`: the page size; pages are keyed on the primary key
+    - `cursor`: the `X-Next-Cursor` header of the previous page
+    - `format`: `json` for a JSON array (default) or `ndjson`
+
+    Records keep the shape of Django's JSON serializer.
+
+    :param queryset: a QuerySet
+    :param params: a dictionary of request parameters
+    :return response: a StreamingHttpResponse
+    """
+    params = dict(params)
+    fields = params.pop('fields', None)
+    limit = params.pop('limit', None)
+    cursor = params.pop('cursor', None)
+    output = params.pop('format', 'json')
+
+    if output not in ('json', 'ndjson'):
+        return HttpResponseBadRequest()
+
+    try:
+        if fields:
+            fields = [field for field in fields.split(',') if field]
+            for field in fields:
+                queryset.model._meta.get_field(field)
+            queryset = queryset.only(*fields)
+
+        if params:
+            queryset = queryset.filter(**params)
+
+        next_cursor = None
+        if limit is not None:
+            limit = int(limit)
+            if limit < 1:
+                return HttpResponseBadRequest()
+
+            queryset = queryset.order_by('pk')
+            if cursor:
+                queryset = queryset.filter(pk__gt=cursor)
+
+            edge = list(
+                queryset.values_list('pk', flat=True)[limit - 1:limit + 1])
+            if len(edge) == 2:
+                next_cursor = str(edge[0])
+
+            queryset = queryset[:limit]
+    except (ValueError, ValidationError, FieldError, FieldDoesNotExist):
+        return HttpResponseBadRequest()
+
+    records = _serialize(queryset, fields)
+    if output == 'ndjson':
+        response = StreamingHttpResponse(
+            _ndjson(records), content_type='application/x-ndjson')
+    else:
+        response = StreamingHttpResponse(
+            _array(records), content_type='application/json')
+
+    response.status_code = 200
+    response['Access-Control-Allow-Origin'] = '*'
+    response['Access-Control-Expose-Headers'] = 'X-Next-Cursor'
+    if next_cursor:
+        response['X-Next-Cursor'] = next_cursor
+
+    return response
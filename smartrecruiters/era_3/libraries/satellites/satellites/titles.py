@@ -0,0 +1,96 @@
+"""
+satellites.titles
+~~~~~~~~~~~~~~~~~
+
+This module implements the contact title qualifier shared by the apps.
+"""
+
+import re
+import functools
+
+# rating groups, from most to least senior; a title takes the rating of the
+# least senior group it mentions
+RATINGS = [
+    (1, ['SENIOR VICE PRESIDENT', 'SVP', 'VICE PRESIDENT', 'VP', 'PRESIDENT',
+         'CHIEF', 'DIRECTOR', 'HEAD', 'LEAD']),
+    (2, ['SENIOR MANAGER', 'MANAGER', 'COORDINATOR', 'BUSINESS PARTNER']),
+    (3, ['ANALYST', 'GENERALIST', 'ASSISTANT', 'SPECIALIST']),
+]
+
+# functions in priority order; a title takes the first one it mentions
+PRIORITIES = [
+    (1, 'TALENT'),
+    (2, 'RECRUIT'),
+    (3, 'HIRING'),
+    (4, 'HUMAN RESOURCES'),
+    (5, 'HR'),
+]
+
+_ratings = [
+    (rating, re.compile('|'.join(re.escape(title) for title in titles)))
+    for rating, titles in reversed(RATINGS)]
+
+
+@functools.lru_cache(maxsize=4096)
+def classify(title):
+    """ Classifies a title.
+
+    :param title: a job title
+    :return rating, priority: the rating and priority, each None when the
+        title doesn't mention any of its keywords
+    """
+    title = (title or '').upper()
+
+    rating = next(
+        (rating for rating, pattern in _ratings if pattern.search(title)),
+        None)
+    priority = next(
+        (priority for priority, function in PRIORITIES if function in title),
+        None)
+
+    return rating, priority
+
+
+def classify_many(titles):
+    """ Classifies a list of titles, classifying each distinct title once.
+
+    :param titles: a list of job titles
+    :return results: a list of (rating, priority) tuples, in order
+    """
+    results = {title: classify(title) for title in set(titles)}
+
+    return [results[title] for title in titles]
+
+
+def qualify_contacts(contacts, defaults=None):
+    """ Sets rating and priority on contacts from their titles.
+
+    Contacts without a title are left alone. Values the title doesn't
+    determine are left alone too, unless defaults are given to reset them.
+
+    :param contacts: an iterable of Contact objects
+    :param defaults: the rating and priority for undetermined values, or None
+    :return changed: a list of the contacts whose rating or priority changed
+    """
+    changed = []
+    for contact in contacts:
+        if not contact.title:
+            continue
+
+        rating, priority = classify(contact.title)
+        if defaults:
+            rating = defaults[0] if rating is None else rating
+            priority = defaults[1] if priority is None else priority
+
+        dirty = False
+        if rating is not None and str(contact.rating) != str(rating):
+            contact.rating = str(rating)
+            dirty = True
+        if priority is not None and str(contact.priority) != str(priority):
+            contact.priority = str(priority)
+            dirty = True
+
+        if dirty:
+            changed.append(contact)
+
+    return changed
@@ -0,0 +1,280 @@
+"""
+satellites.tokens
+~~~~~~~~~~~~~~~~~
+
+This module implements signed access tokens that satellites verify locally.
+
+A signed token is `<kid>.<payload>.<signature>`, each part base64url
+encoded. The payload holds the subject (a username) and the issue and
+expiry times. The key ID names an entry of SATELLITES_TOKEN_KEYS, which sets
+the algorithm:
+
+- `HS256`, an HMAC-SHA256 `secret` shared by satellite-s and the satellites;
+- `Ed25519`, where satellite-s holds the `private` key and the satellites
+  only the `public` one. It needs the `cryptography` package.
+
+Keys rotate by adding a new entry, pointing SATELLITES_TOKEN_SIGNING_KEY at
+it, and removing the old entry once its tokens have expired.
+
+Tokens can't be recalled, so satellite-s keeps a denylist of subjects with
+the time their tokens were revoked; satellites poll it, and reject tokens
+issued to a listed subject before that time. Polling needs
+SATELLITES_HOOK_KEY, so without one satellites leave signed tokens to
+satellite-s too.
+"""
+
+import hmac
+import json
+import time
+import base64
+import hashlib
+import logging
+import threading
+
+from django.conf import settings
+
+ALGORITHMS = ('HS256', 'Ed25519')
+
+logger = logging.getLogger('satellites.tokens')
+
+
+class TokenError(Exception):
+    """ Raised for tokens that are malformed, forged, expired or revoked.
+    """
+
+
+def _encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def _keys(keys):
+    return keys if keys is not None else getattr(
+        settings, 'SATELLITES_TOKEN_KEYS', {})
+
+
+def verifies_locally():
+    """ Checks whether signed tokens can be verified without satellite-s.
+
+    That takes the keys, and the hook key the denylist is polled with.
+
+    :return local: True or False
+    """
+    return bool(
+        getattr(settings, 'SATELLITES_TOKEN_KEYS', None)
+        and getattr(settings, 'SATELLITES_HOOK_KEY', None))
+
+
+def is_signed(token):
+    """ Checks whether a token is signed, rather than an opaque one.
+
+    :param token: an access token
+    :return signed: True or False
+    """
+    return isinstance(token, str) and token.count('.') == 2
+
+
+def sign(subject, ttl=None, keys=None, kid=None, now=None):
+    """ Issues a signed token.
+
+    :param subject: the username the token is issued to
+    :param ttl: seconds until the token expires, or None for
+        SATELLITES_TOKEN_TTL
+    :param keys: a dictionary of keys by ID, or None for
+        SATELLITES_TOKEN_KEYS
+    :param kid: the ID of the key to sign with, or None for
+        SATELLITES_TOKEN_SIGNING_KEY
+    :param now: the issue time, or None for the current time
+    :return token: a signed token
+    """
+    keys = _keys(keys)
+    kid = kid or getattr(settings, 'SATELLITES_TOKEN_SIGNING_KEY', '')
+    if not kid or '.' in kid or kid not in keys:
+        raise TokenError(f'unknown signing key {kid!r}')
+
+    ttl = ttl or getattr(settings, 'SATELLITES_TOKEN_TTL', 3600)
+    now = now if now is not None else time.time()
+
+    payload = json.dumps(
+        {'sub': subject, 'iat': now, 'exp': now + ttl},
+        separators=(',', ':')).encode()
+    message = f'{kid}.{_encode(payload)}'
+
+    key = keys[kid]
+    if key['alg'] == 'HS256':
+        signature = hmac.new(
+            key['secret'].encode(), message.encode(), hashlib.sha256).digest()
+    elif key['alg'] == 'Ed25519':
+        from cryptography.hazmat.primitives.asymmetric.ed25519 import (
+            Ed25519PrivateKey)
+
+        private = Ed25519PrivateKey.from_private_bytes(_decode(key['private']))
+        signature = private.sign(message.encode())
+    else:
+        raise TokenError(f"unknown algorithm {key['alg']!r}")
+
+    return f'{message}.{_encode(signature)}'
+
+
+def verify(token, keys=None, now=None):
+    """ Verifies a signed token's signature and expiry.
+
+    :param token: a signed token
+    :param keys: a dictionary of keys by ID, or None for
+        SATELLITES_TOKEN_KEYS
+    :param now: the time to check expiry at, or None for the current time
+    :return payload: a dictionary of sub, iat and exp
+    """
+    if not is_signed(token):
+        raise TokenError('not a signed token')
+
+    kid, payload, signature = token.split('.')
+    key = _keys(keys).get(kid)
+    if key is None:
+        raise TokenError(f'unknown key {kid!r}')
+
+    message = f'{kid}.{payload}'.encode()
+    try:
+        signature = _decode(signature)
+        payload = json.loads(_decode(payload))
+    except ValueError:
+        raise TokenError('malformed token')
+
+    # the key decides the algorithm, never the token
+    if key['alg'] == 'HS256':
+        expected = hmac.new(
+            key['secret'].encode(), message, hashlib.sha256).digest()
+        valid = hmac.compare_digest(signature, expected)
+    elif key['alg'] == 'Ed25519':
+        from cryptography.exceptions import InvalidSignature
+        from cryptography.hazmat.primitives.asymmetric.ed25519 import (
+            Ed25519PublicKey)
+
+        public = Ed25519PublicKey.from_public_bytes(_decode(key['public']))
+        try:
+            public.verify(signature, message)
+            valid = True
+        except InvalidSignature:
+            valid = False
+    else:
+        raise TokenError(f"unknown algorithm {key['alg']!r}")
+
+    if not valid:
+        raise TokenError('invalid signature')
+
+    if not isinstance(payload, dict) or not {'sub', 'iat', 'exp'} <= set(
+            payload):
+        raise TokenError('malformed token')
+
+    now = now if now is not None else time.time()
+    if payload['exp'] <= now:
+        raise TokenError('expired token')
+
+    return payload
+
+
+class Denylist:
+    """ Revocations polled from satellite-s.
+
+    The list maps subjects to the time their tokens were revoked, and is
+    fetched again once it's `interval` seconds old. If a fetch fails, the
+    last list is kept and the fetch is retried `interval` seconds later;
+    until a fetch has succeeded, every token counts as revoked.
+
+    :param fetch: a callable returning a dictionary of revocation times by
+        subject
+    :param interval: seconds between fetches
+    """
+    def __init__(self, fetch, interval=30):
+        self.fetch = fetch
+        self.interval = interval
+
+        self.revocations = {}
+        self.loaded = False
+        self._fetched = None
+        self._lock = threading.Lock()
+
+    def refresh(self, force=False):
+        """ Fetches the revocations, if they're due.
+
+        :param force: whether to fetch even if they're not due
+        """
+        now = time.monotonic()
+        if not force and self._fetched is not None and (
+                now - self._fetched < self.interval):
+            return
+
+        # one thread fetches while the others keep using the last list
+        if not self._lock.acquire(blocking=self._fetched is None):
+            return
+        try:
+            try:
+                self.revocations = dict(self.fetch())
+                self.loaded = True
+            except Exception:
+                logger.exception('token revocations could not be fetched')
+            self._fetched = now
+        finally:
+            self._lock.release()
+
+    def is_revoked(self, payload):
+        """ Checks whether a verified token was revoked.
+
+        :param payload: a verified token's payload
+        :return revoked: True or False
+        """
+        self.refresh()
+        if not self.loaded:
+            return True
+
+        revoked = self.revocations.get(payload['sub'])
+
+        return revoked is not None and payload['iat'] <= revoked
+
+
+def _fetch_revocations():
+    from .s import Security
+
+    response = Security().revocations(
+        getattr(settings, 'SATELLITES_HOOK_KEY', ''))
+    response.raise_for_status()
+
+    return response.json()['revocations']
+
+
+_denylist = None
+_denylist_lock = threading.Lock()
+
+
+def get_denylist():
+    """ Gets the process-wide denylist, polling satellite-s.
+
+    :return denylist: a Denylist
+    """
+    global _denylist
+
+    if _denylist is None:
+        with _denylist_lock:
+            if _denylist is None:
+                _denylist = Denylist(
+                    _fetch_revocations,
+                    interval=getattr(
+                        settings, 'SATELLITES_TOKEN_DENYLIST_INTERVAL', 30))
+
+    return _denylist
+
+
+def authorize(token):
+    """ Checks a signed token locally, without calling satellite-s.
+
+    :param token: a signed token
+    :return payload: the token's payload
+    """
+    payload = verify(token)
+    if get_denylist().is_revoked(payload):
+        raise TokenError('revoked token')
+
+    return payload
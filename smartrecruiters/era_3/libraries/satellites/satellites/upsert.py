@@ -0,0 +1,104 @@
+"""
+satellites.upsert
+~~~~~~~~~~~~~~~~~
+
+This module implements a set-based upsert for syncing records into models.
+"""
+
+from django.db import models, transaction
+
+
+def _field_value(model, name, value):
+    """ Normalizes a value for comparison, using the pk of related objects. """
+    field = model._meta.get_field(name)
+    if field.is_relation and isinstance(value, models.Model):
+        return value.pk
+
+    return value
+
+
+def upsert(model, rows, keys, preserve=(), batch_size=500):
+    """ Creates or updates a model's rows from dictionaries of field data.
+
+    Existing rows are fetched in one query on the natural `keys`, compared in
+    memory, and written back with `bulk_create`/`bulk_update`, so the number
+    of queries depends on the batch count rather than the row count.
+
+    Fields in `preserve` are only set when a row is created; existing rows
+    keep their stored values, as they did with `get_or_create` followed by
+    an update that copied them back. When several dictionaries share a key,
+    they are applied in order, like sequential `get_or_create` calls.
+
+    :param model: a model class
+    :param rows: a list of dictionaries of field data, including the keys
+    :param keys: a tuple of the field names forming the natural key
+    :param preserve: a tuple of field names to keep on existing rows
+    :param batch_size: the number of rows per bulk query
+    :return counts: a dictionary of created, updated and unchanged counts
+    """
+    counts = {'created': 0, 'updated': 0, 'unchanged': 0}
+    if not rows:
+        return counts
+
+    def key(getter):
+        return tuple(
+            _field_value(model, name, getter(name)) for name in keys)
+
+    attnames = {name: model._meta.get_field(name).attname for name in keys}
+
+    lookup = {}
+    for name in keys:
+        values = {_field_value(model, name, row.get(name)) for row in rows}
+        lookup[f"{attnames[name]}__in"] = values
+
+    existing = {}
+    for obj in model.objects.filter(**lookup).order_by('pk'):
+        existing.setdefault(
+            key(lambda name: getattr(obj, attnames[name])), obj)
+
+    created = {}
+    matched = set()
+    changed = {}
+    fields = set()
+    for row in rows:
+        row_key = key(row.get)
+
+        if row_key in created:
+            obj = created[row_key]
+            for name, value in row.items():
+                if name not in preserve:
+                    setattr(obj, name, value)
+            continue
+
+        obj = existing.get(row_key)
+        if obj is None:
+            created[row_key] = model(**row)
+            continue
+
+        matched.add(obj.pk)
+        for name, value in row.items():
+            if name in preserve or name in keys:
+                continue
+
+            field = model._meta.get_field(name)
+            current = getattr(obj, field.attname)
+            if current != _field_value(model, name, value):
+                setattr(obj, name, value)
+                fields.add(name)
+                changed[obj.pk] = obj
+
+    fields.discard(model._meta.pk.name)
+
+    with transaction.atomic():
+        if created:
+            model.objects.bulk_create(
+                created.values(), batch_size=batch_size)
+        if changed and fields:
+            model.objects.bulk_update(
+                changed.values(), fields, batch_size=batch_size)
+
+    counts['created'] = len(created)
+    counts['updated'] = len(changed)
+    counts['unchanged'] = len(matched) - len(changed)
+
+    return counts
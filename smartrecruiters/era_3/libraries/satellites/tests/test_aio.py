@@ -0,0 +1,84 @@
+"""
+tests.test_aio
+~~~~~~~~~~~~~~
+
+This module implements the unit tests for the asyncio clients.
+"""
+
+import asyncio
+
+from satellites import aio
+
+from aiohttp import web
+
+
+def test_enrichment_get_accounts():
+    async def accounts(request):
+        assert request.headers['Authorization'] == 'Basic test'
+        return web.json_response([{'name': request.query['name']}])
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/accounts', accounts)
+
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        try:
+            async with aio.Enrichment('test') as client:
+                client.base = f"http://127.0.0.1:{port}"
+
+                responses = await aio.gather(
+                    (client.get_accounts({'name': f"test{i}"})
+                     for i in range(5)),
+                    limit=2)
+        finally:
+            await runner.cleanup()
+
+        return responses
+
+    responses = asyncio.run(run())
+
+    assert [r.status_code for r in responses] == [200] * 5
+    assert responses[3].json() == [{'name': 'test3'}]
+    assert responses[0].ok
+
+
+def test_security_authorize_many():
+    async def authorize_batch(request):
+        assert request.headers['Authorization'] == 'Basic test'
+        assert request.content_type == 'application/json'
+
+        tokens = (await request.json())['tokens']
+        return web.json_response(
+            {'authorized': {token: token == 'test' for token in tokens}})
+
+    async def run():
+        app = web.Application()
+        app.router.add_post('/authorize/batch', authorize_batch)
+
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        try:
+            async with aio.Security() as client:
+                client.base = f"http://127.0.0.1:{port}"
+
+                response = await client.authorize_many(
+                    'test', ['test', 'wrong'])
+        finally:
+            await runner.cleanup()
+
+        return response
+
+    response = asyncio.run(run())
+
+    assert response.status_code == 200
+    assert response.json() == {
+        'authorized': {'test': True, 'wrong': False}}
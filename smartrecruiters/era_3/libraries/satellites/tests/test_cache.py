@@ -0,0 +1,56 @@
+"""
+tests.test_cache
+~~~~~~~~~~~~~~~~
+
+This module implements the unit tests for the token cache.
+"""
+
+import time
+
+from satellites.cache import TokenCache
+
+
+def test_hit_and_miss():
+    cache = TokenCache()
+    assert cache.get('test') is None
+
+    cache.set('test', True)
+    cache.set('bad', False)
+    assert cache.get('test') is True
+    assert cache.get('bad') is False
+
+
+def test_expiry():
+    cache = TokenCache(ttl=0.01, negative_ttl=0)
+    cache.set('test', True)
+    cache.set('bad', False)
+    assert cache.get('bad') is None
+
+    time.sleep(0.02)
+    assert cache.get('test') is None
+    assert len(cache) == 0
+
+
+def test_eviction():
+    cache = TokenCache(size=2)
+    cache.set('test0', True)
+    cache.set('test1', True)
+    cache.get('test0')
+    cache.set('test2', True)
+
+    assert cache.get('test0') is True
+    assert cache.get('test1') is None
+    assert cache.get('test2') is True
+
+
+def test_invalidate():
+    cache = TokenCache()
+    cache.set('test0', True)
+    cache.set('test1', True)
+
+    cache.invalidate(['test0'])
+    assert cache.get('test0') is None
+    assert cache.get('test1') is True
+
+    cache.invalidate()
+    assert len(cache) == 0
@@ -0,0 +1,147 @@
+"""
+tests.test_discoverorg
+~~~~~~~~~~~~~~~~~~~~~~
+
+This module implements the unit tests for the DiscoverOrg session.
+"""
+
+import requests
+
+from django.core.cache.backends.locmem import LocMemCache
+
+from satellites.discoverorg import DiscoverOrgSession, ResponseCache
+
+
+class FakeSession:
+    """ Answers logins with numbered tokens and rejects stale ones. """
+    def __init__(self, valid=None):
+        self.logins = 0
+        self.valid = valid
+        self.calls = []
+
+    def _response(self, status, headers=None):
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers or {})
+
+        return response
+
+    def post(self, url, **kwargs):
+        self.logins += 1
+
+        return self._response(200, {'X-AUTH-TOKEN': f'token{self.logins}'})
+
+    def request(self, method, url, headers=None, **kwargs):
+        self.calls.append(headers['X-AUTH-TOKEN'])
+        if self.valid and headers['X-AUTH-TOKEN'] != self.valid:
+            return self._response(401)
+
+        response = self._response(200)
+        response._content = f'{len(self.calls)}'.encode()
+
+        return response
+
+
+def make_session(fake, cache, **kwargs):
+    kwargs.setdefault('lifetime', 3600)
+    kwargs.setdefault('refresh', 300)
+    kwargs.setdefault('responses', ResponseCache(ttl=60, cache=cache))
+    kwargs.setdefault('bypass', False)
+
+    return DiscoverOrgSession(
+        'test', 'test', 'test', cache=cache, session=fake, **kwargs)
+
+
+def test_token_shared_through_cache():
+    fake = FakeSession()
+    cache = LocMemCache('test_shared', {})
+
+    assert make_session(fake, cache).token == 'token1'
+    assert make_session(fake, cache).token == 'token1'
+    assert fake.logins == 1
+
+
+def test_proactive_refresh():
+    fake = FakeSession()
+    cache = LocMemCache('test_refresh', {})
+
+    # a lifetime inside the refresh window is renewed on every use
+    session = make_session(fake, cache, lifetime=60, refresh=300)
+    assert session.token == 'token1'
+    assert session.token == 'token2'
+
+
+def test_retry_on_401():
+    fake = FakeSession(valid='token2')
+    cache = LocMemCache('test_retry', {})
+
+    session = make_session(fake, cache)
+    response = session.get('/v1/companies/1/orgchart/7')
+
+    assert response.status_code == 200
+    assert fake.calls == ['token1', 'token2']
+    assert session.token == 'token2'
+
+
+def test_retry_once():
+    fake = FakeSession(valid='never')
+    cache = LocMemCache('test_once', {})
+
+    response = make_session(fake, cache).get('/v1/companies/1/orgchart/7')
+
+    assert response.status_code == 401
+    assert fake.logins == 2
+
+
+def test_response_cache():
+    fake = FakeSession()
+    cache = LocMemCache('test_responses', {})
+
+    session = make_session(fake, cache)
+    data = '{"companyCriteria": {"websiteUrls": ["test.com"]}}'
+
+    first = session.post('/v1/search/persons', data=data, cached=True)
+    second = session.post(
+        '/v1/search/persons',
+        data='{"companyCriteria": {"websiteUrls":  ["test.com"]}}',
+        cached=True)
+    other = session.post(
+        '/v1/search/persons',
+        data='{"companyCriteria": {"websiteUrls": ["other.com"]}}',
+        cached=True)
+
+    assert first.content == second.content == b'1'
+    assert other.content == b'2'
+    assert session.responses.stats == {
+        'hits': 1, 'misses': 2, 'ratio': 1 / 3}
+
+    # uncached requests always go out
+    session.post('/v1/search/persons', data=data)
+    assert len(fake.calls) == 3
+
+
+def test_response_cache_bypass():
+    fake = FakeSession()
+    cache = LocMemCache('test_bypass', {})
+
+    session = make_session(fake, cache)
+    session.get('/v1/companies/1/orgchart/7', cached=True)
+
+    session.bypass = True
+    fresh = session.get('/v1/companies/1/orgchart/7', cached=True)
+    assert fresh.content == b'2'
+
+    session.bypass = False
+    assert session.get(
+        '/v1/companies/1/orgchart/7', cached=True).content == b'2'
+
+
+def test_response_cache_skips_failures():
+    fake = FakeSession(valid='never')
+    cache = LocMemCache('test_failures', {})
+
+    session = make_session(fake, cache)
+    session.get('/v1/companies/1/orgchart/7', cached=True)
+    session.get('/v1/companies/1/orgchart/7', cached=True)
+
+    assert session.responses.hits == 0
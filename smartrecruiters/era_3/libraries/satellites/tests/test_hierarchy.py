@@ -0,0 +1,57 @@
+"""
+tests.test_hierarchy
+~~~~~~~~~~~~~~~~~~~~
+
+This module implements the unit tests for org hierarchy parsing.
+"""
+
+from satellites.hierarchy import build_paths, parse_orgchart
+
+
+def test_parse_flat_orgchart():
+    nodes = parse_orgchart({'nodes': [
+        {'id': 1, 'person': {'fullName': 'Ada', 'title': 'CEO'}},
+        {'id': 2, 'parentId': 1, 'person': {'fullName': 'Bob', 'title': 'VP'}},
+    ]})
+
+    assert nodes == [
+        {'doid': '1', 'parent': None, 'name': 'Ada', 'title': 'CEO'},
+        {'doid': '2', 'parent': '1', 'name': 'Bob', 'title': 'VP'},
+    ]
+
+
+def test_parse_nested_orgchart():
+    nodes = parse_orgchart({'nodes': [
+        {'id': 1, 'fullName': 'Ada', 'children': [
+            {'id': 2, 'fullName': 'Bob', 'children': [
+                {'id': 3, 'fullName': 'Cy'}]}]}]})
+
+    assert [(node['doid'], node['parent']) for node in nodes] == [
+        ('1', None), ('2', '1'), ('3', '2')]
+
+
+def test_parse_empty_orgchart():
+    assert parse_orgchart({'message': 'Unavailable'}) == []
+    assert parse_orgchart(None) == []
+
+
+def test_build_paths():
+    nodes = build_paths([
+        {'doid': '3', 'parent': '2'},
+        {'doid': '2', 'parent': '1'},
+        {'doid': '1', 'parent': None},
+        {'doid': '4', 'parent': 'missing'},
+    ])
+
+    assert [(node['path'], node['depth']) for node in nodes] == [
+        ('/1/2/3/', 2), ('/1/2/', 1), ('/1/', 0), ('/4/', 0)]
+    assert nodes[3]['parent'] is None
+
+
+def test_build_paths_cycle():
+    nodes = build_paths([
+        {'doid': '1', 'parent': '2'},
+        {'doid': '2', 'parent': '1'},
+    ])
+
+    assert [node['path'] for node in nodes] == ['/2/1/', '/2/']
@@ -0,0 +1,126 @@
+"""
+tests.test_metrics
+~~~~~~~~~~~~~~~~~~
+
+This module implements the unit tests for job metrics.
+"""
+
+import time
+import threading
+
+from unittest import mock
+
+import pytest
+
+from django.core.cache.backends.locmem import LocMemCache
+
+from satellites import metrics
+
+
+def test_stage_and_calls():
+    run = metrics.JobMetrics('api.jobs.Test')
+
+    with run.stage('fetch'):
+        run.record_call('salesforce', 0.2)
+        run.record_call('salesforce', 3, failed=True)
+    with pytest.raises(ValueError):
+        with run.call('discoverorg'):
+            raise ValueError('test')
+    run.count('contacts', 5)
+    run.count('contacts')
+
+    summary = run.summary()
+    assert summary['records'] == {'contacts': 6}
+    assert summary['stages']['fetch']['queries'] == 0
+    assert summary['calls']['salesforce']['count'] == 2
+    assert summary['calls']['salesforce']['errors'] == 1
+    assert summary['calls']['salesforce']['buckets'] == [
+        0, 1, 1, 1, 1, 2, 2, 2]
+    assert summary['calls']['discoverorg']['errors'] == 1
+
+
+def test_helpers_without_run():
+    metrics.count('contacts')
+    metrics.record_call('salesforce', 1)
+    with metrics.stage('fetch'):
+        pass
+
+    assert metrics.current() is None
+
+
+def test_merge():
+    first = metrics.JobMetrics('api.jobs.Test', 'batch')
+    first.started, first.duration, first.status = 1000, 10, 'ok'
+    with first.stage('fetch'):
+        first.record_call('salesforce', 0.2)
+    first.count('contacts', 3)
+
+    second = metrics.JobMetrics('api.jobs.Test', 'batch')
+    second.started, second.duration, second.status = 1005, 15, 'error'
+    with second.stage('fetch'):
+        second.record_call('salesforce', 3)
+    with second.stage('store'):
+        pass
+    second.count('contacts', 2)
+    second.count('accounts')
+
+    summary = metrics.merge(first.summary(), second.summary())
+    assert summary['started'] == 1000
+    assert summary['duration'] == 20
+    assert summary['status'] == 'error'
+    assert summary['records'] == {'contacts': 5, 'accounts': 1}
+    assert set(summary['stages']) == {'fetch', 'store'}
+    assert summary['calls']['salesforce']['count'] == 2
+    assert summary['calls']['salesforce']['buckets'] == [
+        0, 1, 1, 1, 1, 2, 2, 2]
+
+
+class SlowCache(LocMemCache):
+    """ A cache slow enough to interleave concurrent read-modify-writes. """
+
+    def get(self, *args, **kwargs):
+        value = super().get(*args, **kwargs)
+        time.sleep(0.01)
+
+        return value
+
+
+def test_publish_concurrently():
+    cache = SlowCache('metrics', {})
+    runs = [metrics.JobMetrics(f'api.jobs.Test{i}') for i in range(20)]
+    for run in runs:
+        run.started, run.duration, run.status = 1000, 1, 'ok'
+
+    with mock.patch.object(metrics, '_cache', return_value=cache):
+        threads = [threading.Thread(target=run.publish) for run in runs]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert cache.get(f'{metrics.CACHE_PREFIX}jobs') == sorted(
+        run.job for run in runs)
+    assert cache.get(f'{metrics.CACHE_PREFIX}lock') is None
+
+
+def test_render():
+    run = metrics.JobMetrics('api.jobs.Test')
+    run.started, run.duration, run.status = 1000, 2.5, 'ok'
+    with run.stage('fetch'):
+        run.record_call('salesforce', 0.2)
+    run.count('contacts', 3)
+
+    text = metrics.render([run.summary()])
+
+    assert '# TYPE satellites_job_api_call_seconds histogram' in text
+    assert 'satellites_job_duration_seconds{job="api.jobs.Test"} 2.5' in text
+    assert 'satellites_job_success{job="api.jobs.Test"} 1' in text
+    assert (
+        'satellites_job_records{job="api.jobs.Test",kind="contacts"} 3'
+        in text)
+    assert (
+        'satellites_job_api_call_seconds_bucket'
+        '{job="api.jobs.Test",provider="salesforce",le="0.25"} 1' in text)
+    assert (
+        'satellites_job_api_call_seconds_count'
+        '{job="api.jobs.Test",provider="salesforce"} 1' in text)
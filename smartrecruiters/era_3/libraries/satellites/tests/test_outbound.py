@@ -0,0 +1,163 @@
+"""
+tests.test_outbound
+~~~~~~~~~~~~~~~~~~~
+
+This module implements the unit tests for the outbound HTTP core.
+"""
+
+from unittest import mock
+
+import pytest
+import requests
+
+from satellites import outbound
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeSession:
+    """ Answers requests with the queued statuses or exceptions. """
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+
+        status, headers = answer if isinstance(answer, tuple) else (answer, {})
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers)
+
+        return response
+
+
+def make_provider(session, **kwargs):
+    clock = Clock()
+    provider = outbound.Provider(
+        'test', session=session, backoff=0.1, sleep=clock.sleep, **kwargs)
+    provider.bucket.clock = clock
+
+    return provider, clock
+
+
+def test_token_bucket():
+    clock = Clock()
+    bucket = outbound.TokenBucket(2, burst=2, clock=clock, sleep=clock.sleep)
+
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0.5
+    assert bucket.acquire() == 0.5
+
+    bucket.pause(10)
+    assert bucket.acquire() == 10
+
+
+def test_circuit_breaker():
+    clock = Clock()
+    breaker = outbound.CircuitBreaker(threshold=2, cooldown=30, clock=clock)
+
+    breaker.failure()
+    assert breaker.allow()
+    breaker.failure()
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+
+    clock.now = 30
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.failure()
+    assert breaker.state == 'open'
+
+    clock.now = 60
+    assert breaker.allow()
+    breaker.success()
+    assert breaker.state == 'closed'
+
+
+def test_retry_after():
+    response = requests.Response()
+    assert outbound.retry_after(response) is None
+
+    response.headers['Retry-After'] = '7'
+    assert outbound.retry_after(response) == 7
+
+    response.headers['Retry-After'] = 'Wed, 21 Oct 2015 07:28:00 GMT'
+    assert outbound.retry_after(response) == 0
+
+
+def test_retries_throttled_requests():
+    session = FakeSession((429, {'Retry-After': '5'}), 200)
+    provider, clock = make_provider(session)
+
+    response = provider.post('https://example.com')
+
+    assert response.status_code == 200
+    assert session.calls == 2
+    assert 5 <= clock.now <= 5.1
+
+
+def test_gives_up_on_long_retry_after():
+    session = FakeSession((429, {'Retry-After': '3600'}))
+    provider, _ = make_provider(session)
+
+    assert provider.get('https://example.com').status_code == 429
+    assert session.calls == 1
+
+
+def test_retries_server_errors_when_idempotent():
+    session = FakeSession(503, requests.ConnectionError(), 200)
+    provider, _ = make_provider(session)
+
+    assert provider.get('https://example.com').status_code == 200
+    assert session.calls == 3
+
+    session = FakeSession(503, 200)
+    provider, _ = make_provider(session)
+
+    assert provider.post('https://example.com').status_code == 503
+    assert session.calls == 1
+
+    session = FakeSession(requests.ConnectionError())
+    provider, _ = make_provider(session)
+
+    with pytest.raises(requests.ConnectionError):
+        provider.post('https://example.com')
+
+
+def test_circuit_opens():
+    session = FakeSession(500, 500, 500)
+    provider, _ = make_provider(session, retries=2, threshold=3)
+
+    assert provider.get('https://example.com').status_code == 500
+    with pytest.raises(outbound.CircuitOpen):
+        provider.get('https://example.com')
+    assert session.calls == 3
+
+
+def test_as_session():
+    session = FakeSession(500, 200)
+    provider, _ = make_provider(session)
+
+    def send(self, method, url, **kwargs):
+        return session.request(method, url, **kwargs)
+
+    with mock.patch.object(requests.Session, 'request', send):
+        response = provider.as_session().get('https://example.com')
+
+    assert response.status_code == 200
+    assert session.calls == 2
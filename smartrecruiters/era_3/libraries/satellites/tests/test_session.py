@@ -0,0 +1,34 @@
+"""
+tests.test_session
+~~~~~~~~~~~~~~~~~~
+
+This module implements the unit tests for the pooled session.
+"""
+
+import threading
+
+from satellites import session
+from satellites.e import Enrichment
+from satellites.s import Security
+
+
+def test_thread_sessions_share_adapter():
+    pool = session.SessionPool(pool_size=4)
+    assert pool.session is pool.session
+
+    sessions = []
+    thread = threading.Thread(target=lambda: sessions.append(pool.session))
+    thread.start()
+    thread.join()
+
+    assert sessions[0] is not pool.session
+    assert sessions[0].get_adapter('https://') is pool.adapter
+    assert pool.session.get_adapter('https://') is pool.adapter
+
+
+def test_clients_use_default_pool():
+    pool = session.configure(pool_size=4)
+
+    assert Enrichment('test').session is pool
+    assert Security().session is pool
+    assert session.get_session() is pool
@@ -0,0 +1,53 @@
+"""
+tests.test_titles
+~~~~~~~~~~~~~~~~~
+
+This module implements the unit tests for the title qualifier.
+"""
+
+from types import SimpleNamespace
+
+from satellites.titles import classify, classify_many, qualify_contacts
+
+
+def test_classify():
+    assert classify('Senior Vice President, Talent') == (1, 1)
+    assert classify('HR Business Partner') == (2, 5)
+    assert classify('Lead Recruiting Analyst') == (3, 2)
+    assert classify('Software Engineer') == (None, None)
+    assert classify(None) == (None, None)
+
+
+def test_classify_many():
+    titles = ['VP Hiring', 'Recruiter', 'VP Hiring']
+
+    assert classify_many(titles) == [(1, 3), (None, 2), (1, 3)]
+
+
+def test_qualify_contacts():
+    contacts = [
+        SimpleNamespace(title='Talent Manager', rating='10', priority='10'),
+        SimpleNamespace(title='Talent Manager', rating='2', priority='1'),
+        SimpleNamespace(title='', rating='10', priority='10'),
+        SimpleNamespace(title='Engineer', rating='10', priority='10'),
+    ]
+
+    changed = qualify_contacts(contacts)
+
+    assert changed == [contacts[0]]
+    assert (contacts[0].rating, contacts[0].priority) == ('2', '1')
+
+
+def test_qualify_contacts_defaults():
+    contacts = [
+        SimpleNamespace(title='Engineer', rating='2', priority='1'),
+        SimpleNamespace(title='Recruiter', rating='2', priority='1'),
+        SimpleNamespace(title='', rating='2', priority='1'),
+    ]
+
+    changed = qualify_contacts(contacts, defaults=(10, 10))
+
+    assert changed == contacts[:2]
+    assert (contacts[0].rating, contacts[0].priority) == ('10', '10')
+    assert (contacts[1].rating, contacts[1].priority) == ('10', '2')
+    assert (contacts[2].rating, contacts[2].priority) == ('2', '1')
@@ -0,0 +1,137 @@
+"""
+tests.test_tokens
+~~~~~~~~~~~~~~~~~
+
+This module implements the unit tests for signed access tokens.
+"""
+
+import base64
+
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from satellites import tokens
+
+KEYS = {
+    'old': {'alg': 'HS256', 'secret': 'old secret'},
+    'new': {'alg': 'HS256', 'secret': 'new secret'}}
+
+
+def test_sign_and_verify():
+    token = tokens.sign('test', ttl=60, keys=KEYS, kid='new', now=1000)
+
+    assert tokens.is_signed(token)
+    assert not tokens.is_signed('opaque-token_value')
+
+    payload = tokens.verify(token, keys=KEYS, now=1030)
+    assert payload == {'sub': 'test', 'iat': 1000, 'exp': 1060}
+
+    with pytest.raises(tokens.TokenError, match='expired'):
+        tokens.verify(token, keys=KEYS, now=1060)
+
+
+def test_rejects_forgeries():
+    token = tokens.sign('test', ttl=60, keys=KEYS, kid='new', now=1000)
+    kid, payload, signature = token.split('.')
+
+    forged = tokens.sign('admin', ttl=60, keys=KEYS, kid='new', now=1000)
+    with pytest.raises(tokens.TokenError, match='signature'):
+        tokens.verify(
+            '.'.join([kid, forged.split('.')[1], signature]),
+            keys=KEYS, now=1000)
+
+    with pytest.raises(tokens.TokenError, match='signature'):
+        tokens.verify(f'old.{payload}.{signature}', keys=KEYS, now=1000)
+    with pytest.raises(tokens.TokenError, match='unknown key'):
+        tokens.verify(f'gone.{payload}.{signature}', keys=KEYS, now=1000)
+    with pytest.raises(tokens.TokenError, match='malformed'):
+        tokens.verify(f'new.bm90IGpzb24.{signature}', keys=KEYS, now=1000)
+
+
+def test_key_rotation():
+    old = tokens.sign('test', ttl=60, keys=KEYS, kid='old', now=1000)
+    new = tokens.sign('test', ttl=60, keys=KEYS, kid='new', now=1000)
+
+    assert tokens.verify(old, keys=KEYS, now=1000)['sub'] == 'test'
+    assert tokens.verify(new, keys=KEYS, now=1000)['sub'] == 'test'
+
+    with pytest.raises(tokens.TokenError, match='unknown key'):
+        tokens.verify(old, keys={'new': KEYS['new']}, now=1000)
+
+
+def test_ed25519():
+    ed25519 = pytest.importorskip(
+        'cryptography.hazmat.primitives.asymmetric.ed25519')
+    serialization = pytest.importorskip(
+        'cryptography.hazmat.primitives.serialization')
+
+    private = ed25519.Ed25519PrivateKey.generate()
+    raw = serialization.Encoding.Raw
+    private_bytes = private.private_bytes(
+        raw, serialization.PrivateFormat.Raw, serialization.NoEncryption())
+    public_bytes = private.public_key().public_bytes(
+        raw, serialization.PublicFormat.Raw)
+
+    signing = {'ed': {
+        'alg': 'Ed25519',
+        'private': base64.urlsafe_b64encode(private_bytes).decode()}}
+    verifying = {'ed': {
+        'alg': 'Ed25519',
+        'public': base64.urlsafe_b64encode(public_bytes).decode()}}
+
+    token = tokens.sign('test', ttl=60, keys=signing, kid='ed', now=1000)
+    assert tokens.verify(token, keys=verifying, now=1000)['sub'] == 'test'
+
+    kid, payload, signature = token.split('.')
+    forged = tokens.sign('admin', ttl=60, keys=KEYS, kid='new', now=1000)
+    with pytest.raises(tokens.TokenError, match='signature'):
+        tokens.verify(
+            '.'.join([kid, forged.split('.')[1], signature]),
+            keys=verifying, now=1000)
+
+
+def test_denylist():
+    fetches = []
+
+    def fetch():
+        fetches.append(1)
+        if len(fetches) > 1:
+            raise ValueError('satellite-s is down')
+
+        return {'test': 1000}
+
+    denylist = tokens.Denylist(fetch, interval=60)
+
+    assert denylist.is_revoked({'sub': 'test', 'iat': 999})
+    assert not denylist.is_revoked({'sub': 'test', 'iat': 1001})
+    assert not denylist.is_revoked({'sub': 'other', 'iat': 999})
+    assert len(fetches) == 1
+
+    # a failed fetch keeps the last list
+    denylist.refresh(force=True)
+    assert denylist.is_revoked({'sub': 'test', 'iat': 999})
+
+
+def test_denylist_fails_closed():
+    def fetch():
+        raise ValueError('satellite-s is down')
+
+    denylist = tokens.Denylist(fetch, interval=60)
+
+    assert denylist.is_revoked({'sub': 'test', 'iat': 1000})
+    assert not denylist.loaded
+
+
+@pytest.mark.parametrize('keys, hook_key, local', [
+    (KEYS, 'test', True),
+    (KEYS, '', False),
+    ({}, 'test', False),
+])
+def test_verifies_locally(keys, hook_key, local):
+    config = SimpleNamespace(
+        SATELLITES_TOKEN_KEYS=keys, SATELLITES_HOOK_KEY=hook_key)
+
+    with mock.patch.object(tokens, 'settings', config):
+        assert tokens.verifies_locally() is local
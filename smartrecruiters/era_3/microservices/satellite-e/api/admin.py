@@ -5,7 +5,7 @@ api.admin
 This module implements the admin terminal configuration for the API.
 """
 
-from api.models import Account, Contact, ErrorLog
+from api.models import Account, Contact, OrgNode, Task, ErrorLog
 
 from django.contrib import admin
 
@@ -21,5 +21,18 @@ class ContactAdmin(admin.ModelAdmin):
     search_fields = ["name", "sfid", "doid", "status"]
 
 
+class OrgNodeAdmin(admin.ModelAdmin):
+    search_fields = ["name", "title", "doid", "account__name"]
+
+
 admin.site.register(Account, AccountAdmin)
 admin.site.register(Contact, ContactAdmin)
+admin.site.register(OrgNode, OrgNodeAdmin)
+
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ["name", "status", "attempts", "run_at", "locked_by"]
+    list_filter = ["status", "name"]
+
+
+admin.site.register(Task, TaskAdmin)
@@ -6,15 +6,26 @@ This module implements the client classes for the API.
 """
 
 import os
-import re
 import sys
 import json
 
+from collections import defaultdict
+
 from api.models import ErrorLog
 
-import requests
 import simple_salesforce
 
+from satellites.domains import DomainMatcher
+from satellites.discoverorg import DiscoverOrgSession
+from satellites.outbound import CircuitOpen, get_provider
+
+# SOQL statements are capped at 100,000 characters; each quoted 18 character
+# ID costs 22, so this keeps an IN clause comfortably below the limit
+SOQL_IN_CHUNK_SIZE = 2000
+
+# records per Bulk API batch, and rows per local bulk write
+BULK_BATCH_SIZE = 2000
+
 
 class SalesforceClient:
     """ Client for the Salesforce API. """
@@ -25,6 +36,7 @@ class SalesforceClient:
             password=os.getenv("SF_PASSWORD"),
             security_token=os.getenv("SF_TOKEN"),
             organizationId=os.getenv("SF_ORG_ID"),
+            session=get_provider("salesforce").as_session(),
         )
 
     def get_accounts(self):
@@ -118,34 +130,81 @@ class SalesforceClient:
         contacts = []
         records = self.api.bulk.Contact.query(sql)
         for record in records:
-            contact = {
-                "account": account,
-                "sfid": record.get("Id", ""),
-                "name": record.get("Name", ""),
-                "title": record.get("Title", ""),
-                "office": account.phone,
-                "direct": record.get("Phone", ""),
-                "mobile": record.get("MobilePhone", ""),
-                "email": record.get("Email", ""),
-                "ctype": "old",
-                "status": "upload",
-                "sf_status": record.get("Contact_Status__c", "New"),
-            }
-
-            contacts.append(contact)
+            contacts.append(self._contact(account, record))
 
         return contacts or []
 
+    def get_accounts_contacts(self, accounts, chunk_size=SOQL_IN_CHUNK_SIZE):
+        """ Collects contacts for many accounts in as few queries as possible.
+
+        Accounts are queried `chunk_size` at a time with `AccountId IN (...)`
+        and the results are grouped back to their accounts.
+
+        :param accounts: a list of Account objects.
+        :param chunk_size: the number of accounts per query.
+        :return contacts: a dictionary of lists of contact data, keyed by
+            account ID.
+        """
+        by_sfid = defaultdict(list)
+        for account in accounts:
+            by_sfid[account.sfid].append(account)
+
+        contacts = {account.id: [] for account in accounts}
+
+        sfids = list(by_sfid)
+        for i in range(0, len(sfids), chunk_size):
+            ids = ", ".join(
+                "'{}'".format(sfid.replace("'", "\\'"))
+                for sfid in sfids[i : i + chunk_size]
+            )
+            sql = f"""
+                SELECT
+                    Id, AccountId, Name, Title,
+                    Phone, MobilePhone, Email,
+                    Contact_Status__c
+                FROM
+                    Contact
+                WHERE
+                    AccountId IN ({ids})
+            """
+
+            records = self.api.bulk.Contact.query(sql)
+            for record in records:
+                for account in by_sfid.get(record.get("AccountId"), []):
+                    contacts[account.id].append(self._contact(account, record))
+
+        return contacts
+
+    def _contact(self, account, record):
+        """ Maps a Salesforce contact record to contact data.
+
+        :param account: an Account object.
+        :param record: a Salesforce contact record.
+        :return contact: a dictionary of contact data.
+        """
+        return {
+            "account": account,
+            "sfid": record.get("Id", ""),
+            "name": record.get("Name", ""),
+            "title": record.get("Title", ""),
+            "office": account.phone,
+            "direct": record.get("Phone", ""),
+            "mobile": record.get("MobilePhone", ""),
+            "email": record.get("Email", ""),
+            "ctype": "old",
+            "status": "upload",
+            "sf_status": record.get("Contact_Status__c", "New"),
+        }
+
     def create_contacts(self, contacts):
         """ Creates new contacts in Salesforce.
 
         :param contacts: a list of Contact objects.
         """
+        contacts = [contact for contact in contacts if contact.ctype == "new"]
+
         load = []
         for contact in contacts:
-            if contact.ctype != "new":
-                return
-
             for f in contact.account._meta.fields:
                 if getattr(contact.account, f.name) is None:
                     setattr(contact.account, f.name, "")
@@ -168,23 +227,16 @@ class SalesforceClient:
             }
             load.append(record)
 
-        try:
-            if load:
-                self.api.bulk.Contact.insert(load)
-        except:
-            ErrorLog.objects.create(traceback=sys.exc_info())
-
-            for contact in contacts:
-                contact.status = "hold"
-                contact.save()
-        else:
-            contacts.delete()
+        self._bulk_load(self.api.bulk.Contact.insert, contacts, load)
 
     def update_contacts(self, contacts):
         """ Updates contacts in Salesforce.
 
         :param contacts: a list of Contact objects.
         """
+        contacts = list(contacts)
+
+        load = []
         for contact in contacts:
             record_initial = {
                 "Id": contact.sfid,
@@ -202,71 +254,84 @@ class SalesforceClient:
                 if v is None or v == "":
                     record_final[k] = ""
 
-            try:
-                if record_final:
-                    self.api.Contact.update(record_final)
-            except:
-                ErrorLog.objects.create(traceback=sys.exc_info())
+            load.append(record_final)
 
-                contact.status = "hold"
-                contact.save()
-            else:
-                contact.delete()
+        self._bulk_load(self.api.bulk.Contact.update, contacts, load)
 
     def complete_accounts(self, accounts):
         """ Marks enrichment as complete on a list of accounts.
 
         :param accounts: a list of Account objects.
         """
-        for account in accounts:
-            record_initial = {"Id": account.sfid, "Enrichment_Complete__c": True}
-            record_final = record_initial.copy()
+        accounts = list(accounts)
 
-            for k, v in record_initial.items():
-                if v is None or v == "":
-                    record_final[k] = ""
+        load = [
+            {"Id": account.sfid, "Enrichment_Complete__c": True}
+            for account in accounts
+        ]
 
-            try:
-                if record_final:
-                    self.api.Account.update(record_final)
-            except:
-                ErrorLog.objects.create(traceback=sys.exc_info())
+        self._bulk_load(self.api.bulk.Account.update, accounts, load)
 
-                account.status = "hold"
-                account.save()
-            else:
-                account.delete()
+    def _bulk_load(self, operation, objects, load):
+        """ Loads records through the Bulk API and settles the local rows.
 
+        Rows whose records were loaded are deleted; rows whose records
+        failed are put on hold, with an ErrorLog for each failure. If the
+        whole job fails, every row is put on hold.
 
-class DiscoverOrgClient:
-    """ Implements a DiscoverOrg API client. """
+        :param operation: a bulk operation, e.g. `self.api.bulk.Contact.update`.
+        :param objects: a list of model objects.
+        :param load: a list of records, in the same order as `objects`.
+        """
+        if not objects:
+            return
 
-    def __init__(self):
-        self.base = "https://papi.discoverydb.com/papi"
+        model = type(objects[0])
+
+        try:
+            results = list(operation(load, batch_size=BULK_BATCH_SIZE))
+        except CircuitOpen:
+            # leave the rows queued for the next run instead of on hold
+            raise
+        except Exception:
+            ErrorLog.objects.create(traceback=sys.exc_info())
+
+            failed, done = objects, []
+        else:
+            failed, done, errors = [], [], []
+            for obj, result in zip(objects, results):
+                if result.get("success"):
+                    done.append(obj)
+                else:
+                    failed.append(obj)
+                    errors.append(
+                        ErrorLog(
+                            traceback=f"{model.__name__} {obj.sfid or obj.pk}: "
+                            f"{result.get('errors')}"
+                        )
+                    )
 
-        self.username = os.getenv("DO_USERNAME")
-        self.password = os.getenv("DO_PASSWORD")
-        self.key = os.getenv("DO_KEY")
+            # records without a result were never processed
+            failed.extend(objects[len(results) :])
 
-        self.session = self._get_session()
+            ErrorLog.objects.bulk_create(errors)
 
-    def _get_session(self):
-        """ Gets a session key.
+        for obj in failed:
+            obj.status = "hold"
+        model.objects.bulk_update(failed, ["status"], batch_size=BULK_BATCH_SIZE)
 
-        :return session: a session key
-        """
-        url = "".join([self.base, "/login"])
-        headers = {"Content-Type": "application/json"}
-        data = {
-            "username": self.username,
-            "password": self.password,
-            "partnerKey": self.key,
-        }
+        model.objects.filter(pk__in=[obj.pk for obj in done]).delete()
 
-        response = requests.post(url, headers=headers, data=json.dumps(data))
-        session = response.headers.get("X-AUTH-TOKEN")
 
-        return session
+class DiscoverOrgClient:
+    """ Implements a DiscoverOrg API client. """
+
+    def __init__(self):
+        self.session = DiscoverOrgSession(
+            username=os.getenv("DO_USERNAME"),
+            password=os.getenv("DO_PASSWORD"),
+            key=os.getenv("DO_KEY"),
+        )
 
     def get_contacts(self, account):
         """ Searches for contacts under an account.
@@ -274,19 +339,17 @@ class DiscoverOrgClient:
         :param account: an Account object
         :return contacts: a list of dictionaries of contact data
         """
-        response = requests.post(
-            url="".join([self.base, "/v1/search/persons"]),
-            headers={
-                "X-PARTNER-KEY": self.key,
-                "X-AUTH-TOKEN": self.session,
-                "Accept": "application/json",
-                "Content-Type": "application/json",
-            },
+        response = self.session.post(
+            "/v1/search/persons",
+            headers={"Accept": "application/json", "Content-Type": "application/json"},
             data=json.dumps({"companyCriteria": {"websiteUrls": [account.domain]}}),
+            cached=True,
         )
 
         data = json.loads(response.text)
 
+        domain = DomainMatcher(account.domain)
+
         contacts = []
         results = data["content"]
         for result in results:
@@ -301,15 +364,7 @@ class DiscoverOrgClient:
                 "status": "enrich",
             }
 
-            if (
-                contact.get("email", "") != ""
-                and type(contact.get("email")) is str
-                and re.findall("@(\w.+)", contact.get("email"))[0]
-                in re.findall(
-                    "^(?:https?:\/\/)?(?:[^@\/\n]+@)?(?:www\.)?([^:\/?\n]+)",
-                    account.domain,
-                )
-            ):
+            if contact["email"] in domain:
                 contacts.append(contact)
 
         return contacts or []
@@ -323,9 +378,8 @@ class DiscoverOrgClient:
         if not account.doid:
             return {"message": "Unavailable"}
 
-        response = requests.get(
-            url="".join([self.base, f"/v1/companies/{account.doid}/orgchart/7"]),
-            headers={"X-PARTNER-KEY": self.key, "X-AUTH-TOKEN": self.session},
+        response = self.session.get(
+            f"/v1/companies/{account.doid}/orgchart/7", cached=True
         )
 
         data = json.loads(response.text)
@@ -3,18 +3,35 @@ api.jobs
 ~~~~~~~~
 
 This module implements all recurring jobs.
+
+On schedule, a job's `do` only queues tasks; the workers started with
+`run_worker` call its `run` with each task's arguments.
 """
 
 # pylint:disable=E1101
 
+import sys
+import time
+
 from datetime import datetime
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from api import utils
-from api.models import Account, Contact
-from api.clients import SalesforceClient, DiscoverOrgClient
+from api import tasks, utils
+from api.models import Account, Contact, OrgNode, ErrorLog
+from api.clients import SOQL_IN_CHUNK_SIZE, SalesforceClient, DiscoverOrgClient
 
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import F, Q
 from django_cron import CronJobBase, Schedule
 
+from satellites import metrics
+from satellites.hierarchy import sync_hierarchy
+from satellites.outbound import CircuitOpen
+from satellites.titles import qualify_contacts
+from satellites.upsert import upsert
+
 from progress.bar import Bar
 
 
@@ -27,26 +44,49 @@ class Upload(CronJobBase):
     code = "api.jobs.Upload"
 
     def do(self):
+        tasks.enqueue(self.code, [{}])
+
+    @metrics.instrumented
+    def run(self):
         sf = SalesforceClient()
 
-        accounts = Account.objects.filter(status="upload")
-        bar = Bar("RECORD UPLOAD", max=accounts.count())
-        for account in accounts:
-            old = Contact.objects.filter(
-                account=account, status="upload", ctype="old", cleaned=True
+        queries = utils.QueryCounter()
+        with connection.execute_wrapper(queries):
+            # one query for every account's contacts, ordered by account so
+            # the bulk batches keep each account's contacts together
+            contacts = (
+                Contact.objects.filter(account__status="upload", status="upload")
+                .filter(Q(ctype="old", cleaned=True) | Q(ctype="new"))
+                .select_related("account")
+                .order_by("account_id")
             )
-            sf.update_contacts(old)
-
-            new = Contact.objects.filter(account=account, status="upload", ctype="new")
-            sf.create_contacts(new)
 
-            bar.next()
-
-        completed = Account.objects.filter(cleaned=True, enriched=True)
-        if completed:
-            sf.complete_accounts(completed)
-
-        bar.finish()
+            old, new = [], []
+            with metrics.stage("load"):
+                for contact in contacts:
+                    (old if contact.ctype == "old" else new).append(contact)
+
+            tasks.check()
+            with metrics.stage("update"):
+                sf.update_contacts(old)
+            tasks.check()
+            with metrics.stage("create"):
+                sf.create_contacts(new)
+
+            tasks.check()
+            with metrics.stage("complete"):
+                completed = list(Account.objects.filter(cleaned=True, enriched=True))
+                sf.complete_accounts(completed)
+
+        accounts = len({contact.account_id for contact in old + new})
+        metrics.count("contacts_updated", len(old))
+        metrics.count("contacts_created", len(new))
+        metrics.count("accounts_completed", len(completed))
+        print(
+            f"RECORD UPLOAD: {accounts} accounts, {len(old)} contacts to update, "
+            f"{len(new)} to create, {len(completed)} accounts to complete, "
+            f"{queries.count} queries"
+        )
 
 
 class SyncAccounts(CronJobBase):
@@ -58,22 +98,29 @@ class SyncAccounts(CronJobBase):
     code = "api.jobs.SyncAccounts"
 
     def do(self):
-        sf = SalesforceClient()
-
-        accounts = sf.get_accounts()
-        bar = Bar("ACCOUNT SYNC", max=len(accounts))
-        for account in accounts:
-            if not account["name"] or not account["domain"]:
-                continue
+        tasks.enqueue(self.code, [{}])
 
-            obj, created = Account.objects.get_or_create(sfid=account["sfid"])
-            account["status"] = "enrich" if created else obj.status
+    @metrics.instrumented
+    def run(self):
+        sf = SalesforceClient()
 
-            Account.objects.filter(pk=obj.pk).update(**account)
+        accounts = [
+            account
+            for account in sf.get_accounts()
+            if account["name"] and account["domain"]
+        ]
 
-            bar.next()
+        # new accounts start out as "enrich", existing ones keep their status
+        for account in accounts:
+            account["status"] = "enrich"
 
-        bar.finish()
+        tasks.check()
+        counts = upsert(Account, accounts, keys=("sfid",), preserve=("status",))
+        metrics.count("accounts", len(accounts))
+        print(
+            f"ACCOUNT SYNC: {counts['created']} created, "
+            f"{counts['updated']} updated, {counts['unchanged']} unchanged"
+        )
 
 
 class GetContacts(CronJobBase):
@@ -85,34 +132,136 @@ class GetContacts(CronJobBase):
     code = "api.jobs.GetContacts"
 
     def do(self):
-        sf = SalesforceClient()
-        do = DiscoverOrgClient()
+        # a task's accounts share one batched Salesforce query, so tasks are
+        # as large as that query rather than TASK_CHUNK_SIZE; the heartbeat
+        # keeps them claimed however long their DiscoverOrg fetches take
+        accounts = Account.objects.exclude(prep=None).values_list("id", flat=True)
+        tasks.enqueue(
+            self.code,
+            [
+                {"account_ids": ids}
+                for ids in tasks.chunks(accounts, SOQL_IN_CHUNK_SIZE)
+            ],
+        )
+
+    @metrics.instrumented
+    def run(self, account_ids):
+        self.sf_client = SalesforceClient()
+        self.do_client = DiscoverOrgClient()
+
+        today = datetime.today().strftime("%Y-%m-%d")
+
+        accounts = list(Account.objects.filter(pk__in=account_ids).exclude(prep=None))
+
+        start = time.monotonic()
+        with metrics.stage("salesforce"):
+            sf_contacts = self.sf_client.get_accounts_contacts(accounts)
+        print(
+            f"Salesforce: {len(accounts)} accounts, "
+            f"{time.monotonic() - start:.2f}s"
+        )
+
+        bar = Bar("CONTACT COLLECTION", max=len(accounts))
+        timings = []
+        with ThreadPoolExecutor(max_workers=settings.FETCH_WORKERS) as pool:
+            futures = {
+                pool.submit(
+                    self.fetch, account, sf_contacts[account.id], today
+                ): account
+                for account in accounts
+            }
+
+            # contacts are written as soon as each account's fetch lands,
+            # so the database work overlaps with the remaining requests
+            for future in as_completed(futures):
+                account = futures[future]
+
+                try:
+                    contacts, timing = future.result()
+                except CircuitOpen:
+                    # DiscoverOrg is down; the task is retried later
+                    raise
+                except Exception:
+                    ErrorLog.objects.create(traceback=sys.exc_info())
+                else:
+                    tasks.check()
+                    start = time.monotonic()
+                    with metrics.stage("store"):
+                        self.store(
+                            account, contacts, today, timing["do"] is not None
+                        )
+                    timing["db"] = time.monotonic() - start
+                    metrics.count("accounts")
+                    metrics.count("contacts", timing["contacts"])
+
+                    timings.append((account, timing))
+
+                bar.next()
 
-        accounts = Account.objects.exclude(prep=None)
-        bar = Bar("CONTACT COLLECTION", max=accounts.count())
-        for account in accounts:
-            sf_contacts = sf.get_contacts(account)
+        bar.finish()
 
-            if str(account.updated) != str(datetime.today().strftime("%Y-%m-%d")):
-                do_contacts = do.get_contacts(account)
-                account.updated = datetime.today().strftime("%Y-%m-%d")
-                account.save()
+        for account, timing in timings:
+            print(
+                f"{account.name}: {timing['contacts']} contacts, "
+                f"discoverorg {timing['do'] or 0:.2f}s, "
+                f"database {timing['db']:.2f}s"
+            )
+
+        stats = self.do_client.session.responses.stats
+        print(
+            f"DiscoverOrg cache: {stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['ratio']:.0%} hit ratio"
+        )
+
+    def fetch(self, account, sf_contacts, today):
+        """ Fetches an account's contacts from DiscoverOrg.
+
+        Runs in a worker thread. The DiscoverOrg session token and response
+        cache live in a DatabaseCache, so the thread opens its own database
+        connection; it's closed before returning, or the long-lived worker
+        process would keep one per thread.
+
+        :param account: an Account object
+        :param sf_contacts: a list of the account's Salesforce contact data
+        :param today: today's date as a string
+        :return contacts, timing: a list of contact dictionaries and a
+            dictionary of durations in seconds
+        """
+        timing = {"do": None}
+
+        try:
+            if str(account.updated) != today:
+                start = time.monotonic()
+                do_contacts = self.do_client.get_contacts(account)
+                timing["do"] = time.monotonic() - start
             else:
                 do_contacts = []
+        finally:
+            connections.close_all()
 
-            contacts = sf_contacts + do_contacts
-            for contact in contacts:
-                obj, created = Contact.objects.get_or_create(
-                    account=account, name=contact["name"]
-                )
-                contact["status"] = contact["status"] if created else obj.status
-                contact["ctype"] = contact["ctype"] if created else obj.ctype
+        contacts = sf_contacts + do_contacts
+        timing["contacts"] = len(contacts)
 
-                Contact.objects.filter(pk=obj.pk).update(**contact)
+        return contacts, timing
 
-            bar.next()
+    def store(self, account, contacts, today, refreshed):
+        """ Writes fetched contacts for an account.
 
-        bar.finish()
+        :param account: an Account object
+        :param contacts: a list of contact dictionaries
+        :param today: today's date as a string
+        :param refreshed: whether DiscoverOrg was queried for the account
+        """
+        if refreshed:
+            account.updated = today
+            account.save()
+
+        for contact in contacts:
+            contact["account"] = account
+
+        upsert(
+            Contact, contacts, keys=("account", "name"), preserve=("status", "ctype")
+        )
 
 
 class QualifyContacts(CronJobBase):
@@ -124,11 +273,104 @@ class QualifyContacts(CronJobBase):
     code = "api.jobs.QualifyContacts"
 
     def do(self):
-        contacts = Contact.objects.all()
-        bar = Bar("CONTACT QUALIFICATION", max=contacts.count())
-        for contact in contacts:
-            utils.qualify_title(contact)
+        tasks.enqueue(self.code, [{}])
+
+    @metrics.instrumented
+    def run(self):
+        # only titles that changed since they were last qualified are
+        # processed; clearing qualified_title forces a requalification
+        contacts = (
+            Contact.objects.exclude(title=None)
+            .exclude(title="")
+            .filter(Q(qualified_title=None) | ~Q(title=F("qualified_title")))
+            .only("id", "title", "rating", "priority", "qualified_title")
+        )
+
+        # a title that doesn't determine a value, or was cleared, leaves
+        # nothing to qualify it by, so the value goes back to its default
+        defaults = {
+            field: Contact._meta.get_field(field).default
+            for field in ("rating", "priority")
+        }
+
+        qualified = changed = 0
+        rows = contacts.iterator(chunk_size=500)
+        while True:
+            batch = list(islice(rows, 500))
+            if not batch:
+                break
+
+            tasks.check()
+            changed += len(
+                qualify_contacts(batch, (defaults["rating"], defaults["priority"]))
+            )
+            for contact in batch:
+                contact.qualified_title = contact.title
 
-            bar.next()
+            Contact.objects.bulk_update(
+                batch, ["rating", "priority", "qualified_title"]
+            )
+            qualified += len(batch)
 
-        bar.finish()
+        cleared = (
+            Contact.objects.filter(Q(title=None) | Q(title=""))
+            .exclude(qualified_title=None)
+            .exclude(qualified_title="")
+            .update(qualified_title="", **defaults)
+        )
+
+        skipped = Contact.objects.count() - qualified - cleared
+        metrics.count("contacts", qualified)
+        metrics.count("contacts_changed", changed)
+        metrics.count("contacts_cleared", cleared)
+        print(
+            f"CONTACT QUALIFICATION: {qualified} qualified, "
+            f"{changed} changed, {cleared} cleared, {skipped} skipped"
+        )
+
+
+class GetHierarchies(CronJobBase):
+    """ Syncs org hierarchies for accounts from DiscoverOrg. """
+
+    RUN_EVERY_MINS = 10
+
+    schedule = Schedule(run_every_mins=RUN_EVERY_MINS)
+    code = "api.jobs.GetHierarchies"
+
+    def do(self):
+        accounts = (
+            Account.objects.exclude(doid=None)
+            .exclude(doid="")
+            .values_list("id", flat=True)
+        )
+        tasks.enqueue(
+            self.code, [{"account_ids": ids} for ids in tasks.chunks(accounts)]
+        )
+
+    @metrics.instrumented
+    def run(self, account_ids):
+        do_client = DiscoverOrgClient()
+
+        totals = {"created": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+        for account in Account.objects.filter(pk__in=account_ids):
+            tasks.check()
+            try:
+                counts = sync_hierarchy(
+                    OrgNode, account, do_client.get_hierarchy(account)
+                )
+            except CircuitOpen:
+                raise
+            except Exception:
+                ErrorLog.objects.create(traceback=sys.exc_info())
+                continue
+
+            for key, count in counts.items():
+                totals[key] += count
+            metrics.count("accounts")
+
+        metrics.count("nodes", totals["created"] + totals["updated"])
+        print(
+            f"HIERARCHY SYNC: {totals['created']} created, "
+            f"{totals['updated']} updated, {totals['unchanged']} unchanged, "
+            f"{totals['deleted']} deleted"
+        )
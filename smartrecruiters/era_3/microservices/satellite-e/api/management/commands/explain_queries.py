@@ -0,0 +1,134 @@
+"""
+api.management.commands.explain_queries
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+This module implements a command that prints query plans for the hot filters.
+
+Seed a scratch database, then run it on the schema before and after an index
+change to compare plans and timings:
+
+    django-admin explain_queries --seed 1000000
+    django-admin explain_queries
+    django-admin explain_queries --clean
+"""
+
+# pylint:disable=E1101
+
+import time
+import uuid
+
+from api.models import Account, Contact
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.core.management.base import BaseCommand
+
+SEED_PREFIX = "seed-"
+CONTACTS_PER_ACCOUNT = 50
+BATCH_SIZE = 10000
+
+
+def queries():
+    """ Gets the queries the jobs run most, by name. """
+    return {
+        "upload contacts": (
+            Contact.objects.filter(account__status="upload", status="upload")
+            .filter(Q(ctype="old", cleaned=True) | Q(ctype="new"))
+            .select_related("account")
+            .order_by("account_id")
+        ),
+        "account contacts": Contact.objects.filter(
+            account=Account.objects.order_by("pk").first(),
+            status="upload",
+            ctype="old",
+            cleaned=True,
+        ),
+        "completed accounts": Account.objects.filter(cleaned=True, enriched=True),
+        "accounts by status": Account.objects.filter(status="upload"),
+        "accounts by sfid": Account.objects.filter(
+            sfid__in=[f"{SEED_PREFIX}{i}" for i in range(0, 2000, 7)]
+        ),
+        "accounts by rep": Account.objects.exclude(prep=None),
+    }
+
+
+class Command(BaseCommand):
+    help = "Prints query plans and timings for the hot satellite-e filters."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="seed this many contacts before explaining",
+        )
+        parser.add_argument(
+            "--clean", action="store_true", help="delete seeded rows and exit"
+        )
+
+    def handle(self, *args, **options):
+        if options["clean"]:
+            Account.objects.filter(sfid__startswith=SEED_PREFIX).delete()
+            return
+
+        if options["seed"]:
+            self.seed(options["seed"])
+
+        analyze = {"analyze": True} if connection.vendor == "postgresql" else {}
+        for name, queryset in queries().items():
+            start = time.monotonic()
+            plan = queryset.explain(**analyze)
+            elapsed = time.monotonic() - start
+
+            self.stdout.write(f"== {name} ({elapsed * 1000:.1f}ms)")
+            self.stdout.write(plan)
+            self.stdout.write("")
+
+    def seed(self, count):
+        """ Seeds accounts and contacts shaped like production data.
+
+        :param count: the number of contacts to create
+        """
+        statuses = ["enrich", "enrich", "enrich", "review", "upload", "hold"]
+        accounts = count // CONTACTS_PER_ACCOUNT + 1
+
+        with transaction.atomic():
+            for start in range(0, accounts, BATCH_SIZE):
+                Account.objects.bulk_create(
+                    Account(
+                        sfid=f"{SEED_PREFIX}{i}",
+                        prep=None if i % 4 else f"rep{i % 40}",
+                        status=statuses[i % len(statuses)],
+                        cleaned=i % 10 == 0,
+                        enriched=i % 20 == 0,
+                        name=f"Account {i}",
+                        domain=f"https://account{i}.com",
+                    )
+                    for i in range(start, min(start + BATCH_SIZE, accounts))
+                )
+
+            ids = list(
+                Account.objects.filter(sfid__startswith=SEED_PREFIX).values_list(
+                    "id", flat=True
+                )
+            )
+            for start in range(0, count, BATCH_SIZE):
+                Contact.objects.bulk_create(
+                    Contact(
+                        id=uuid.uuid4(),
+                        account_id=ids[i // CONTACTS_PER_ACCOUNT],
+                        sfid=f"{SEED_PREFIX}{i}" if i % 3 else None,
+                        ctype="old" if i % 3 else "new",
+                        status=statuses[i % len(statuses)],
+                        cleaned=i % 2 == 0,
+                        name=f"Contact {i}",
+                        title="Recruiter",
+                    )
+                    for i in range(start, min(start + BATCH_SIZE, count))
+                )
+
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+
+        self.stdout.write(f"Seeded {accounts} accounts and {count} contacts.")
@@ -0,0 +1,55 @@
+"""
+api.management.commands.run_worker
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+This module implements a command that runs task queue workers.
+
+Start it on as many nodes as needed; the workers share the queue safely.
+"""
+
+import os
+import socket
+import multiprocessing
+
+from api import tasks
+
+from django.db import connections
+from django.core.management.base import BaseCommand
+
+
+def work(worker, once):
+    # every process needs its own database connection
+    connections.close_all()
+
+    tasks.work(worker, once=once)
+
+
+class Command(BaseCommand):
+    help = "Runs task queue workers."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes", type=int, default=1, help="the number of workers"
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="exit once nothing is due"
+        )
+
+    def handle(self, *args, **options):
+        name = f"{socket.gethostname()}:{os.getpid()}"
+
+        if options["processes"] < 2:
+            tasks.work(name, once=options["once"])
+            return
+
+        connections.close_all()
+
+        context = multiprocessing.get_context("fork")
+        processes = [
+            context.Process(target=work, args=(f"{name}/{i}", options["once"]))
+            for i in range(options["processes"])
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
@@ -8,6 +8,7 @@ This module implements the database models for the API.
 import uuid
 
 from django.db import models
+from django.utils import timezone
 
 
 class Account(models.Model):
@@ -34,6 +35,25 @@ class Account(models.Model):
         "Enrichment Summary", max_length=256, null=True, blank=True
     )
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["sfid"], name="account_sfid_unique")
+        ]
+        indexes = [
+            models.Index(fields=["status"], name="account_status_idx"),
+            models.Index(
+                fields=["prep"],
+                name="account_prep_idx",
+                condition=models.Q(prep__isnull=False),
+            ),
+            # Upload marks these complete; they're few among many
+            models.Index(
+                fields=["cleaned", "enriched"],
+                name="account_completed_idx",
+                condition=models.Q(cleaned=True, enriched=True),
+            ),
+        ]
+
     def __id__(self):
         return self.id
 
@@ -79,6 +99,9 @@ class Contact(models.Model):
 
     name = models.CharField("Name", max_length=256)
     title = models.CharField("Title", max_length=256, null=True, blank=True, default="")
+    qualified_title = models.CharField(
+        "Qualified Title", max_length=256, null=True, blank=True
+    )
 
     email = models.EmailField("Email", null=True, blank=True)
     office = models.CharField(
@@ -91,6 +114,25 @@ class Contact(models.Model):
         "Mobile Phone", max_length=64, null=True, blank=True, default=""
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["account", "status", "ctype", "cleaned"],
+                name="contact_account_status_idx",
+            ),
+            # only the upload queue is read by status alone
+            models.Index(
+                fields=["status", "ctype"],
+                name="contact_upload_idx",
+                condition=models.Q(status="upload"),
+            ),
+            models.Index(
+                fields=["sfid"],
+                name="contact_sfid_idx",
+                condition=models.Q(sfid__isnull=False),
+            ),
+        ]
+
     def __id__(self):
         return self.id
 
@@ -98,6 +140,57 @@ class Contact(models.Model):
         return self.name
 
 
+class OrgNode(models.Model):
+    account = models.ForeignKey(
+        Account, on_delete=models.CASCADE, related_name="org_nodes"
+    )
+
+    id = models.UUIDField("ID", primary_key=True, default=uuid.uuid4)
+    doid = models.CharField("DiscoverOrg ID", max_length=256)
+    parent = models.CharField("Reports To", max_length=256, null=True, blank=True)
+
+    path = models.CharField("Path", max_length=2048, db_index=True)
+    depth = models.PositiveSmallIntegerField("Depth", default=0)
+
+    name = models.CharField("Name", max_length=256, blank=True, default="")
+    title = models.CharField("Title", max_length=256, blank=True, default="")
+
+    class Meta:
+        unique_together = [("account", "doid")]
+
+    def __str__(self):
+        return self.name
+
+
+class Task(models.Model):
+    id = models.UUIDField("ID", primary_key=True, default=uuid.uuid4)
+    name = models.CharField("Job", max_length=256)
+    args = models.TextField("Arguments", default="{}")
+    batch = models.UUIDField("Batch", null=True, blank=True)
+
+    STATUSES = [("queued", "Queued"), ("running", "Running"), ("failed", "Failed")]
+    status = models.CharField(
+        "Status", max_length=16, choices=STATUSES, default="queued"
+    )
+    attempts = models.PositiveSmallIntegerField("Attempts", default=0)
+
+    run_at = models.DateTimeField("Run At", default=timezone.now)
+    locked_by = models.CharField("Locked By", max_length=256, null=True, blank=True)
+    locked_until = models.DateTimeField("Locked Until", null=True, blank=True)
+
+    error = models.TextField("Last Error", null=True, blank=True)
+    created = models.DateTimeField("Created", auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_at"], name="task_status_idx"),
+            models.Index(fields=["name", "status"], name="task_name_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+
 class ErrorLog(models.Model):
     timestamp = models.DateTimeField(auto_now_add=True)
 
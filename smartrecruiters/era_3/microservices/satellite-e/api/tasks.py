@@ -0,0 +1,276 @@
+"""
+api.tasks
+~~~~~~~~~
+
+This module implements the database-backed task queue run by the workers.
+
+A task names a job class by its dotted path and holds the keyword arguments
+for its `run` method. Workers claim tasks with `SELECT ... FOR UPDATE SKIP
+LOCKED`, so any number of them, on any number of nodes, can share the queue
+without claiming the same task twice. A claim lasts for the visibility
+timeout, and a heartbeat extends it while the task runs; a task whose
+worker died is claimed again once it runs out. Jobs call `check` before
+writes that must not happen twice, so a worker that lost its claim stops.
+"""
+
+# pylint:disable=E1101
+
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import threading
+
+from datetime import timedelta
+
+from api.models import ErrorLog, Task
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+PENDING = ("queued", "running")
+
+_heartbeat = None
+
+
+class LostClaim(Exception):
+    """ Raised in a job whose task was claimed by another worker. """
+
+
+class Heartbeat(threading.Thread):
+    """ Extends a running task's claim until the task ends.
+
+    :param task: a claimed Task
+    """
+
+    def __init__(self, task):
+        super().__init__(daemon=True)
+        self.task = task
+        self.stopped = threading.Event()
+        self.lost = threading.Event()
+
+    def run(self):
+        interval = settings.TASK_VISIBILITY_TIMEOUT / 3
+        try:
+            while not self.stopped.wait(interval) and self.beat():
+                pass
+        finally:
+            connections.close_all()
+
+    def beat(self):
+        """ Extends the claim once.
+
+        :return claimed: False once another worker has claimed the task
+        """
+        try:
+            if extend(self.task):
+                return True
+        except Exception:
+            # the database is unreachable; try again on the next beat
+            return True
+
+        self.lost.set()
+
+        return False
+
+
+def chunks(ids, size=None):
+    """ Splits IDs into task-sized lists.
+
+    :param ids: an iterable of IDs
+    :param size: the number of IDs per list, or None for TASK_CHUNK_SIZE
+    :return chunks: a list of lists of IDs as strings
+    """
+    size = size or settings.TASK_CHUNK_SIZE
+    ids = [str(id) for id in ids]
+
+    return [ids[i : i + size] for i in range(0, len(ids), size)]
+
+
+def enqueue(name, args_list):
+    """ Queues tasks for a job, unless its earlier tasks are still pending.
+
+    Skipping while a job's tasks are pending keeps a slow run from piling
+    up behind itself. The tasks share a batch ID, under which their run
+    metrics are merged.
+
+    :param name: the job's dotted path
+    :param args_list: a list of dictionaries of `run` arguments
+    :return count: the number of tasks queued
+    """
+    if Task.objects.filter(name=name, status__in=PENDING).exists():
+        return 0
+
+    batch = uuid.uuid4()
+    Task.objects.bulk_create(
+        Task(name=name, args=json.dumps(args), batch=batch) for args in args_list
+    )
+
+    return len(args_list)
+
+
+def claim(worker):
+    """ Claims the next due task.
+
+    :param worker: the claiming worker's name
+    :return task: a Task, or None when nothing is due
+    """
+    now = timezone.now()
+
+    with transaction.atomic():
+        while True:
+            task = (
+                Task.objects.select_for_update(skip_locked=True)
+                .filter(
+                    Q(status="queued", run_at__lte=now)
+                    | Q(status="running", locked_until__lte=now)
+                )
+                .order_by("run_at")
+                .first()
+            )
+            if task is None:
+                return None
+
+            # a task that keeps killing its worker is never run again
+            if task.status != "running" or task.attempts < settings.TASK_MAX_ATTEMPTS:
+                break
+
+            abandon(task)
+
+        task.status = "running"
+        task.attempts += 1
+        task.locked_by = worker
+        task.locked_until = now + timedelta(seconds=settings.TASK_VISIBILITY_TIMEOUT)
+        task.save(update_fields=["status", "attempts", "locked_by", "locked_until"])
+
+    return task
+
+
+def abandon(task):
+    """ Fails a task whose workers died on every attempt.
+
+    :param task: an expired running Task
+    """
+    error = (
+        f"{task.name} was abandoned after {task.attempts} attempts; "
+        f"its last worker, {task.locked_by}, never finished it."
+    )
+    ErrorLog.objects.create(traceback=error)
+
+    task.status = "failed"
+    task.locked_by = None
+    task.locked_until = None
+    task.error = error
+    task.save(update_fields=["status", "locked_by", "locked_until", "error"])
+
+
+def extend(task):
+    """ Extends a claim for another visibility timeout.
+
+    :param task: a claimed Task
+    :return extended: False when another worker has claimed the task since
+    """
+    until = timezone.now() + timedelta(seconds=settings.TASK_VISIBILITY_TIMEOUT)
+
+    return bool(
+        Task.objects.filter(
+            pk=task.pk,
+            status="running",
+            locked_by=task.locked_by,
+            attempts=task.attempts,
+        ).update(locked_until=until)
+    )
+
+
+def check():
+    """ Stops the running job if its task was claimed by another worker.
+
+    Jobs call it before writes that must not happen twice; outside a task,
+    it does nothing.
+    """
+    if _heartbeat is not None and _heartbeat.lost.is_set():
+        raise LostClaim(f"{_heartbeat.task.name} was claimed by another worker")
+
+
+def run(task):
+    """ Runs a claimed task, then deletes it or schedules its retry.
+
+    :param task: a claimed Task
+    :return succeeded: True or False
+    """
+    global _heartbeat
+
+    heartbeat = Heartbeat(task)
+    heartbeat.start()
+    _heartbeat = heartbeat
+
+    try:
+        job = import_string(task.name)()
+        job.batch = str(task.batch) if task.batch else None
+        job.run(**json.loads(task.args))
+    except LostClaim:
+        # the task, and its retries, belong to whoever claimed it next
+        return False
+    except Exception:
+        fail(task, sys.exc_info())
+
+        return False
+    finally:
+        _heartbeat = None
+        heartbeat.stopped.set()
+        heartbeat.join()
+
+    # a task that outlived its claim belongs to whoever claimed it next
+    Task.objects.filter(pk=task.pk, locked_by=task.locked_by).delete()
+
+    return True
+
+
+def fail(task, exc_info):
+    """ Logs a task's failure and retries it with exponential backoff.
+
+    :param task: a claimed Task
+    :param exc_info: the failure's exception info
+    """
+    ErrorLog.objects.create(traceback=exc_info)
+
+    if task.attempts >= settings.TASK_MAX_ATTEMPTS:
+        update = {"status": "failed"}
+    else:
+        delay = settings.TASK_RETRY_BACKOFF * 2 ** (task.attempts - 1)
+        update = {
+            "status": "queued",
+            "run_at": timezone.now() + timedelta(seconds=delay),
+        }
+
+    Task.objects.filter(pk=task.pk, locked_by=task.locked_by).update(
+        locked_by=None, locked_until=None, error=str(exc_info[1]), **update
+    )
+
+
+def work(worker=None, once=False):
+    """ Claims and runs tasks until stopped.
+
+    :param worker: the worker's name, or None for host and process ID
+    :param once: whether to return once nothing is due
+    :return count: the number of tasks run
+    """
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+
+    count = 0
+    while True:
+        task = claim(worker)
+        if task is None:
+            if once:
+                return count
+
+            time.sleep(settings.TASK_POLL_INTERVAL)
+            continue
+
+        run(task)
+        count += 1
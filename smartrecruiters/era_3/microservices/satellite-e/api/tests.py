@@ -7,14 +7,31 @@ This module implements the unit tests for the API.
 
 # pylint:disable=E1101
 
+import io
 import os
+import json
+import contextlib
 
-from django.test import TestCase
+from datetime import datetime
+
+from unittest import mock
+
+from django.test import TestCase, override_settings
 from django.test.client import RequestFactory
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+from api import jobs, tasks, views
+from api.models import Account, Contact, OrgNode, Task, ErrorLog
+from api.clients import SalesforceClient
 
-from api import views
-from api.models import Account, Contact
+from satellites import metrics
+from satellites.hierarchy import sync_hierarchy
+from satellites.upsert import upsert
+
+LOCAL_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
 
 
 TEST_TOKEN = os.getenv("SATELLITE_TOKEN")
@@ -45,8 +62,9 @@ class AccountTestCase(TestCase):
 
         response = views.get_accounts(request)
         self.assertEquals(response.status_code, 200)
-        self.assertContains(response, "test0")
-        self.assertContains(response, "test1")
+        content = b"".join(response.streaming_content)
+        self.assertIn(b"test0", content)
+        self.assertIn(b"test1", content)
 
         request = factory.get(
             "accounts", data={"name": "test0"}, HTTP_AUTHORIZATION=TEST_TOKEN
@@ -54,8 +72,48 @@ class AccountTestCase(TestCase):
 
         response = views.get_accounts(request)
         self.assertEquals(response.status_code, 200)
-        self.assertContains(response, "test0")
-        self.assertFalse(b"test1" in response.content)
+        content = b"".join(response.streaming_content)
+        self.assertIn(b"test0", content)
+        self.assertFalse(b"test1" in content)
+
+    def test_get_accounts_paginated(self):
+        factory = RequestFactory()
+        request = factory.get(
+            "accounts",
+            data={"limit": 1, "fields": "name", "format": "ndjson"},
+            HTTP_AUTHORIZATION=TEST_TOKEN,
+        )
+
+        response = views.get_accounts(request)
+        self.assertEquals(response.status_code, 200)
+        content = b"".join(response.streaming_content)
+
+        records = [json.loads(line) for line in content.splitlines()]
+        self.assertEquals(len(records), 1)
+        self.assertEquals(list(records[0]["fields"]), ["name"])
+
+        request = factory.get(
+            "accounts",
+            data={"limit": 1, "cursor": response["X-Next-Cursor"]},
+            HTTP_AUTHORIZATION=TEST_TOKEN,
+        )
+
+        response = views.get_accounts(request)
+        self.assertEquals(response.status_code, 200)
+        content = b"".join(response.streaming_content)
+        self.assertFalse(response.has_header("X-Next-Cursor"))
+
+        records += json.loads(content)
+        self.assertEquals(
+            {record["fields"]["name"] for record in records}, {"test0", "test1"}
+        )
+
+        request = factory.get(
+            "accounts", data={"fields": "nope"}, HTTP_AUTHORIZATION=TEST_TOKEN
+        )
+
+        response = views.get_accounts(request)
+        self.assertEquals(response.status_code, 400)
 
     def test_create_account(self):
         factory = RequestFactory()
@@ -76,6 +134,10 @@ class AccountTestCase(TestCase):
         response = views.create_account(request)
         self.assertEquals(response.status_code, 200)
 
+        response = views.create_account(request)
+        self.assertEquals(response.status_code, 409)
+        self.assertEquals(Account.objects.filter(sfid="test2").count(), 1)
+
     def test_update_account(self):
         factory = RequestFactory()
         request = factory.post(
@@ -132,8 +194,9 @@ class ContactTestCase(TestCase):
 
         response = views.get_contacts(request)
         self.assertEquals(response.status_code, 200)
-        self.assertContains(response, "test0")
-        self.assertContains(response, "test1")
+        content = b"".join(response.streaming_content)
+        self.assertIn(b"test0", content)
+        self.assertIn(b"test1", content)
 
         request = factory.get(
             "contacts", data={"name": "test0"}, HTTP_AUTHORIZATION=TEST_TOKEN
@@ -141,8 +204,9 @@ class ContactTestCase(TestCase):
 
         response = views.get_contacts(request)
         self.assertEquals(response.status_code, 200)
-        self.assertContains(response, "test0")
-        self.assertFalse(b"test1" in response.content)
+        content = b"".join(response.streaming_content)
+        self.assertIn(b"test0", content)
+        self.assertFalse(b"test1" in content)
 
     def test_create_contact(self):
         factory = RequestFactory()
@@ -178,3 +242,665 @@ class ContactTestCase(TestCase):
         response = views.update_contact(request, self.contact0.id)
         self.assertEquals(response.status_code, 200)
         self.assertContains(response, "test0_new")
+
+    def test_bulk_contacts(self):
+        factory = RequestFactory()
+        request = factory.post(
+            "contacts/bulk/create",
+            data=[
+                {"name": "test2", "pid": str(self.account.id)},
+                {"pid": str(self.account.id)},
+            ],
+            content_type="application/json",
+            HTTP_AUTHORIZATION=TEST_TOKEN,
+        )
+
+        response = views.bulk_create_contacts(request)
+        self.assertEquals(response.status_code, 200)
+        self.assertContains(response, "test2")
+        self.assertContains(response, "New Contact")
+        self.assertEquals(Contact.objects.count(), 4)
+
+        request = factory.post(
+            "contacts/bulk/update",
+            data=[
+                {"id": str(self.contact0.id), "title": "test0_new"},
+                {"id": str(self.contact1.id), "title": "test1_new"},
+            ],
+            content_type="application/json",
+            HTTP_AUTHORIZATION=TEST_TOKEN,
+        )
+
+        response = views.bulk_update_contacts(request)
+        self.assertEquals(response.status_code, 200)
+        self.assertContains(response, "test0_new")
+        self.assertContains(response, "test1_new")
+
+        request = factory.delete(
+            "contacts/bulk/delete",
+            data=[str(self.contact0.id), str(self.contact1.id)],
+            content_type="application/json",
+            HTTP_AUTHORIZATION=TEST_TOKEN,
+        )
+
+        response = views.bulk_delete_contacts(request)
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(Contact.objects.count(), 2)
+
+
+class BulkContactsValidationTestCase(TestCase):
+    def setUp(self):
+        # every token is authorized, so no satellite-s is needed
+        patcher = mock.patch("satellites.decorators.Security")
+        patcher.start().return_value.authorize.return_value = mock.Mock(
+            ok=True, status_code=200
+        )
+        self.addCleanup(patcher.stop)
+
+        self.account = Account.objects.create(
+            sfid="test", prep="test", name="test", domain="test.com"
+        )
+        self.contact = Contact.objects.create(
+            account=self.account, name="test0", title="test0"
+        )
+        self.factory = RequestFactory()
+
+    def request(self, view, data):
+        request = self.factory.post(
+            "contacts/bulk",
+            data=data,
+            content_type="application/json",
+            HTTP_AUTHORIZATION="Basic validation",
+        )
+
+        return view(request)
+
+    def test_create(self):
+        pid = str(self.account.id)
+        for data, error in [
+            ([{"pid": pid}, {"name": "test1"}], b"Item 1: missing pid."),
+            ([{"pid": "test"}], b"Item 0: invalid pid."),
+            ([{"pid": pid}, {"pid": pid, "test": 1}], b"Item 1: unknown field test."),
+            ([{"pid": pid, "account": pid}], b"Item 0: unknown field account."),
+            (["test"], b"Item 0: not an object."),
+        ]:
+            response = self.request(views.bulk_create_contacts, data)
+            self.assertEquals(response.status_code, 400)
+            self.assertEquals(response.content, error)
+
+        self.assertEquals(Contact.objects.count(), 1)
+
+    def test_update(self):
+        id = str(self.contact.id)
+        for data, error in [
+            ([{"id": id, "title": "new"}, {"title": "new"}], b"Item 1: missing id."),
+            ([{"id": id, "title": "new"}, {"id": "test"}], b"Item 1: invalid id."),
+            ([{"id": id, "test": "new"}], b"Item 0: unknown field test."),
+        ]:
+            response = self.request(views.bulk_update_contacts, data)
+            self.assertEquals(response.status_code, 400)
+            self.assertEquals(response.content, error)
+
+        self.assertEquals(Contact.objects.get().title, "test0")
+
+    def test_delete(self):
+        for data, error in [
+            ([str(self.contact.id), "test"], b"Item 1: invalid id."),
+            ([None], b"Item 0: missing id."),
+        ]:
+            response = self.request(views.bulk_delete_contacts, data)
+            self.assertEquals(response.status_code, 400)
+            self.assertEquals(response.content, error)
+
+        self.assertEquals(Contact.objects.count(), 1)
+
+
+class UpsertTestCase(TestCase):
+    def setUp(self):
+        self.account = Account.objects.create(
+            sfid="test4",
+            prep="test4",
+            status="upload",
+            name="test4",
+            domain="test4.com",
+            phone="test4",
+        )
+        self.contact = Contact.objects.create(
+            account=self.account, name="test0", title="test0", status="hold"
+        )
+
+    def test_upsert_contacts(self):
+        counts = upsert(
+            Contact,
+            [
+                {
+                    "account": self.account,
+                    "name": "test0",
+                    "title": "test0_new",
+                    "status": "upload",
+                    "ctype": "old",
+                },
+                {
+                    "account": self.account,
+                    "name": "test1",
+                    "title": "test1",
+                    "status": "upload",
+                    "ctype": "old",
+                },
+            ],
+            keys=("account", "name"),
+            preserve=("status", "ctype"),
+        )
+        self.assertEquals(counts, {"created": 1, "updated": 1, "unchanged": 0})
+
+        self.contact.refresh_from_db()
+        self.assertEquals(self.contact.title, "test0_new")
+        self.assertEquals(self.contact.status, "hold")
+        self.assertEquals(self.contact.ctype, "new")
+        self.assertEquals(
+            Contact.objects.get(account=self.account, name="test1").status, "upload"
+        )
+
+    def test_upsert_accounts(self):
+        counts = upsert(
+            Account,
+            [
+                {
+                    "sfid": "test4",
+                    "name": "test4_new",
+                    "domain": "test4.com",
+                    "status": "enrich",
+                },
+                {
+                    "sfid": "test5",
+                    "name": "test5",
+                    "domain": "test5.com",
+                    "status": "enrich",
+                },
+            ],
+            keys=("sfid",),
+            preserve=("status",),
+        )
+        self.assertEquals(counts, {"created": 1, "updated": 1, "unchanged": 0})
+
+        self.account.refresh_from_db()
+        self.assertEquals(self.account.name, "test4_new")
+        self.assertEquals(self.account.status, "upload")
+        self.assertEquals(Account.objects.get(sfid="test5").status, "enrich")
+
+
+class SalesforceUpdateTestCase(TestCase):
+    def setUp(self):
+        self.account = Account.objects.create(
+            sfid="test6",
+            prep="test6",
+            status="upload",
+            name="test6",
+            domain="test6.com",
+            phone="test6",
+        )
+        self.contacts = [
+            Contact.objects.create(
+                account=self.account, sfid=f"sf{i}", name=f"test{i}", ctype="old"
+            )
+            for i in range(3)
+        ]
+
+        self.sf = SalesforceClient.__new__(SalesforceClient)
+        self.sf.api = mock.MagicMock()
+
+    def test_update_contacts(self):
+        self.sf.api.bulk.Contact.update.return_value = [
+            {"success": True, "id": "sf0", "errors": []},
+            {"success": False, "id": None, "errors": [{"message": "test"}]},
+            {"success": True, "id": "sf2", "errors": []},
+        ]
+
+        self.sf.update_contacts(Contact.objects.order_by("name"))
+
+        self.assertEquals(self.sf.api.bulk.Contact.update.call_count, 1)
+        load = self.sf.api.bulk.Contact.update.call_args[0][0]
+        self.assertEquals([record["Id"] for record in load], ["sf0", "sf1", "sf2"])
+        self.assertEquals(
+            list(Contact.objects.values_list("sfid", flat=True)), ["sf1"]
+        )
+        self.assertEquals(Contact.objects.get().status, "hold")
+        self.assertEquals(ErrorLog.objects.count(), 1)
+
+    def test_update_contacts_failed_job(self):
+        self.sf.api.bulk.Contact.update.side_effect = Exception("test")
+
+        self.sf.update_contacts(Contact.objects.all())
+
+        self.assertEquals(Contact.objects.filter(status="hold").count(), 3)
+        self.assertEquals(ErrorLog.objects.count(), 1)
+
+    def test_complete_accounts(self):
+        self.sf.api.bulk.Account.update.return_value = [
+            {"success": True, "id": "test6", "errors": []}
+        ]
+
+        self.sf.complete_accounts(Account.objects.all())
+
+        self.assertEquals(Account.objects.count(), 0)
+        self.assertEquals(Contact.objects.count(), 0)
+
+    def test_upload(self):
+        for i in range(3):
+            account = Account.objects.create(
+                sfid=f"test{7 + i}",
+                prep=f"test{7 + i}",
+                status="upload",
+                name=f"test{7 + i}",
+                domain=f"test{7 + i}.com",
+            )
+            Contact.objects.create(
+                account=account, name="old", ctype="old", status="upload", cleaned=True
+            )
+            Contact.objects.create(
+                account=account, name="new", ctype="new", status="upload"
+            )
+
+        def load(records, **kwargs):
+            return [{"success": True, "errors": []} for record in records]
+
+        self.sf.api.bulk.Contact.update.side_effect = load
+        self.sf.api.bulk.Contact.insert.side_effect = load
+
+        # the run's metrics go to a local cache, so only the upload is counted
+        with mock.patch.object(jobs, "SalesforceClient", return_value=self.sf):
+            with override_settings(CACHES=LOCAL_CACHES):
+                with self.assertNumQueries(4):
+                    jobs.Upload().run()
+
+        self.assertEquals(self.sf.api.bulk.Contact.update.call_count, 1)
+        self.assertEquals(len(self.sf.api.bulk.Contact.update.call_args[0][0]), 3)
+        self.assertEquals(len(self.sf.api.bulk.Contact.insert.call_args[0][0]), 3)
+        self.assertEquals(Contact.objects.filter(status="upload").count(), 0)
+
+
+class HierarchyTestCase(TestCase):
+    def setUp(self):
+        self.account = Account.objects.create(
+            sfid="test10", doid="10", name="test10", domain="test10.com"
+        )
+        self.chart = {
+            "nodes": [
+                {"id": 1, "person": {"fullName": "test1", "title": "CEO"}},
+                {"id": 2, "parentId": 1, "person": {"fullName": "test2"}},
+                {"id": 3, "parentId": 2, "person": {"fullName": "test3"}},
+                {"id": 4, "parentId": 1, "person": {"fullName": "test4"}},
+            ]
+        }
+
+    def test_sync_hierarchy(self):
+        counts = sync_hierarchy(OrgNode, self.account, self.chart)
+        self.assertEquals(counts["created"], 4)
+        self.assertEquals(OrgNode.objects.get(doid="3").path, "/1/2/3/")
+
+        # node 3 moves under node 4, node 2 leaves
+        self.chart["nodes"] = [self.chart["nodes"][0]] + [
+            {"id": 3, "parentId": 4, "person": {"fullName": "test3"}},
+            {"id": 4, "parentId": 1, "person": {"fullName": "test4"}},
+        ]
+        counts = sync_hierarchy(OrgNode, self.account, self.chart)
+        self.assertEquals(
+            counts, {"created": 0, "updated": 1, "unchanged": 2, "deleted": 1}
+        )
+        self.assertEquals(OrgNode.objects.get(doid="3").path, "/1/4/3/")
+
+        # an empty answer leaves the hierarchy alone
+        sync_hierarchy(OrgNode, self.account, {"message": "Unavailable"})
+        self.assertEquals(OrgNode.objects.count(), 3)
+
+    def test_get_hierarchy(self):
+        sync_hierarchy(OrgNode, self.account, self.chart)
+
+        def names(**data):
+            request = RequestFactory().get(
+                "hierarchy", data=data, HTTP_AUTHORIZATION=TEST_TOKEN
+            )
+            response = views.get_hierarchy(request, str(self.account.id))
+            content = b"".join(response.streaming_content)
+
+            return [record["fields"]["name"] for record in json.loads(content)]
+
+        self.assertEquals(names(), ["test1", "test2", "test3", "test4"])
+        self.assertEquals(names(node="2"), ["test2", "test3"])
+        self.assertEquals(names(node="3", direction="reports-to"), ["test2", "test1"])
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class GetContactsTestCase(TestCase):
+    def setUp(self):
+        self.accounts = [
+            Account.objects.create(
+                sfid=f"sf{i}", prep="test", name=f"test{i}", domain=f"test{i}.com"
+            )
+            for i in range(3)
+        ]
+
+    def test_get_accounts_contacts(self):
+        sf = SalesforceClient.__new__(SalesforceClient)
+        sf.api = mock.MagicMock()
+
+        def query(sql):
+            return [
+                {"Id": f"c{sfid}", "AccountId": sfid, "Name": f"contact {sfid}"}
+                for sfid in ("sf0", "sf1", "sf2", "other")
+                if f"'{sfid}'" in sql
+            ]
+
+        sf.api.bulk.Contact.query.side_effect = query
+
+        contacts = sf.get_accounts_contacts(self.accounts, chunk_size=2)
+
+        queries = [call.args[0] for call in sf.api.bulk.Contact.query.call_args_list]
+        self.assertEquals(len(queries), 2)
+        self.assertIn("AccountId IN ('sf0', 'sf1')", queries[0])
+        self.assertIn("AccountId IN ('sf2')", queries[1])
+
+        self.assertEquals(
+            {
+                account_id: [contact["sfid"] for contact in account_contacts]
+                for account_id, account_contacts in contacts.items()
+            },
+            {account.id: [f"c{account.sfid}"] for account in self.accounts},
+        )
+        self.assertIs(contacts[self.accounts[2].id][0]["account"], self.accounts[2])
+
+    @mock.patch("api.jobs.DiscoverOrgClient")
+    @mock.patch("api.jobs.SalesforceClient")
+    def test_run(self, sf_client, do_client):
+        first, failing, last = self.accounts
+
+        sf_client.return_value.get_accounts_contacts.return_value = {
+            account.id: [{"name": f"sf {account.name}", "sfid": account.sfid}]
+            for account in self.accounts
+        }
+
+        def get_contacts(account):
+            if account.pk == failing.pk:
+                raise ValueError("test")
+
+            return [{"name": f"do {account.name}"}]
+
+        do_client.return_value.get_contacts.side_effect = get_contacts
+        do_client.return_value.session.responses.stats = {
+            "hits": 0,
+            "misses": 3,
+            "ratio": 0,
+        }
+
+        jobs.GetContacts().run([account.id for account in self.accounts])
+
+        self.assertEquals(
+            sorted(Contact.objects.values_list("name", flat=True)),
+            ["do test0", "do test2", "sf test0", "sf test2"],
+        )
+        self.assertEquals(ErrorLog.objects.count(), 1)
+
+        today = datetime.today().date()
+        first.refresh_from_db()
+        failing.refresh_from_db()
+        self.assertEquals((first.updated, failing.updated), (today, None))
+
+    def test_fetch_closes_connections(self):
+        job = jobs.GetContacts()
+        job.do_client = mock.Mock()
+        job.do_client.get_contacts.side_effect = ValueError("test")
+        account = Account(name="test", updated=None)
+
+        with mock.patch("api.jobs.connections") as connections:
+            with self.assertRaises(ValueError):
+                job.fetch(account, [], "2019-01-01")
+        connections.close_all.assert_called_once_with()
+
+        job.do_client.get_contacts.side_effect = None
+        job.do_client.get_contacts.return_value = [{"name": "do"}]
+        with mock.patch("api.jobs.connections") as connections:
+            contacts, timing = job.fetch(account, [{"name": "sf"}], "2019-01-01")
+        connections.close_all.assert_called_once_with()
+        self.assertEquals(contacts, [{"name": "sf"}, {"name": "do"}])
+        self.assertEquals(timing["contacts"], 2)
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class QualifyContactsTestCase(TestCase):
+    def setUp(self):
+        account = Account.objects.create(sfid="a", name="Acme", domain="acme.com")
+        for name, title in [
+            ("a", "HR MANAGER"),
+            ("b", "VP TALENT"),
+            ("c", "ANALYST"),
+            ("d", ""),
+        ]:
+            Contact.objects.create(account=account, name=name, title=title)
+
+    def run_job(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            jobs.QualifyContacts().run()
+
+        return output.getvalue()
+
+    def test_incremental(self):
+        self.assertIn("3 qualified, 3 changed, 0 cleared, 1 skipped", self.run_job())
+        self.assertEquals(Contact.objects.get(name="a").qualified_title, "HR MANAGER")
+
+        # nothing changed, so nothing is processed
+        with self.assertNumQueries(3):
+            output = self.run_job()
+        self.assertIn("0 qualified, 0 changed, 0 cleared, 4 skipped", output)
+
+        Contact.objects.filter(name="c").update(title="TALENT DIRECTOR")
+        self.assertIn("1 qualified, 1 changed, 0 cleared, 3 skipped", self.run_job())
+
+        contact = Contact.objects.get(name="c")
+        self.assertEquals((contact.rating, contact.priority), ("1", "1"))
+        self.assertEquals(contact.qualified_title, "TALENT DIRECTOR")
+
+    def test_cleared_title(self):
+        self.run_job()
+
+        Contact.objects.filter(name="b").update(title=None)
+        self.assertIn("0 qualified, 0 changed, 1 cleared, 3 skipped", self.run_job())
+
+        contact = Contact.objects.get(name="b")
+        self.assertEquals((contact.rating, contact.priority), ("10", "10"))
+        self.assertEquals(contact.qualified_title, "")
+
+        self.assertIn("0 qualified, 0 changed, 0 cleared, 4 skipped", self.run_job())
+
+    def test_unmatched_title(self):
+        self.run_job()
+
+        # like a cleared title, one that matches nothing resets to defaults
+        Contact.objects.filter(name="b").update(title="ENGINEER")
+        self.assertIn("1 qualified, 1 changed, 0 cleared, 3 skipped", self.run_job())
+
+        contact = Contact.objects.get(name="b")
+        self.assertEquals((contact.rating, contact.priority), ("10", "10"))
+        self.assertEquals(contact.qualified_title, "ENGINEER")
+
+
+class FlakyJob:
+    runs = []
+
+    def run(self, n, fail=False):
+        FlakyJob.runs.append(n)
+        if fail:
+            raise ValueError("test")
+
+
+class ChunkedJob:
+    code = "api.tests.ChunkedJob"
+
+    @metrics.instrumented
+    def run(self, ids):
+        metrics.count("accounts", len(ids))
+
+
+class ReclaimedJob:
+    writes = []
+
+    def run(self):
+        # the claim runs out mid-run and another worker takes the task
+        Task.objects.update(locked_until=timezone.now())
+        tasks.claim("other")
+
+        tasks._heartbeat.beat()
+        tasks.check()
+        ReclaimedJob.writes.append(1)
+
+
+@override_settings(TASK_MAX_ATTEMPTS=2, TASK_RETRY_BACKOFF=60)
+class TaskQueueTestCase(TestCase):
+    def setUp(self):
+        FlakyJob.runs = []
+
+    def test_enqueue_skips_pending(self):
+        name = "api.tests.FlakyJob"
+        self.assertEquals(tasks.enqueue(name, [{"n": 0}, {"n": 1}]), 2)
+        self.assertEquals(tasks.enqueue(name, [{"n": 2}]), 0)
+
+        self.assertEquals(tasks.work("test", once=True), 2)
+        self.assertEquals(sorted(FlakyJob.runs), [0, 1])
+        self.assertEquals(Task.objects.count(), 0)
+
+    def test_retry_and_fail(self):
+        tasks.enqueue("api.tests.FlakyJob", [{"n": 0, "fail": True}])
+
+        self.assertFalse(tasks.run(tasks.claim("test")))
+        task = Task.objects.get()
+        self.assertEquals(task.status, "queued")
+        self.assertEquals(task.attempts, 1)
+        self.assertEquals(task.error, "test")
+        self.assertGreater(task.run_at, timezone.now())
+        self.assertIsNone(tasks.claim("test"))
+
+        Task.objects.update(run_at=timezone.now())
+        tasks.run(tasks.claim("test"))
+        self.assertEquals(Task.objects.get().status, "failed")
+        self.assertEquals(ErrorLog.objects.count(), 2)
+
+    def test_visibility_timeout(self):
+        tasks.enqueue("api.tests.FlakyJob", [{"n": 0}])
+
+        task = tasks.claim("dead")
+        self.assertIsNone(tasks.claim("test"))
+
+        Task.objects.update(locked_until=timezone.now())
+        task = tasks.claim("test")
+        self.assertEquals((task.locked_by, task.attempts), ("test", 2))
+
+    def test_heartbeat_extends_claim(self):
+        tasks.enqueue("api.tests.FlakyJob", [{"n": 0}])
+        task = tasks.claim("test")
+
+        Task.objects.update(locked_until=timezone.now())
+        self.assertTrue(tasks.extend(task))
+        self.assertIsNone(tasks.claim("other"))
+        self.assertGreater(Task.objects.get().locked_until, timezone.now())
+
+    def test_reclaimed_task_stops(self):
+        ReclaimedJob.writes = []
+        tasks.enqueue("api.tests.ReclaimedJob", [{}])
+
+        self.assertFalse(tasks.run(tasks.claim("test")))
+        self.assertEquals(ReclaimedJob.writes, [])
+
+        # the task is left to the worker that claimed it
+        task = Task.objects.get()
+        self.assertEquals((task.status, task.locked_by), ("running", "other"))
+        self.assertIsNone(task.error)
+        self.assertEquals(ErrorLog.objects.count(), 0)
+        self.assertIsNone(tasks._heartbeat)
+
+    @override_settings(TASK_MAX_ATTEMPTS=2)
+    def test_abandons_tasks_that_kill_workers(self):
+        name = "api.tests.FlakyJob"
+        tasks.enqueue(name, [{"n": 0}])
+
+        for worker in ("dead", "dead again"):
+            tasks.claim(worker)
+            Task.objects.update(locked_until=timezone.now())
+
+        self.assertIsNone(tasks.claim("test"))
+        self.assertEquals(FlakyJob.runs, [])
+
+        task = Task.objects.get()
+        self.assertEquals((task.status, task.attempts), ("failed", 2))
+        self.assertIn("dead again", task.error)
+        self.assertEquals(ErrorLog.objects.count(), 1)
+
+        # the job can be queued again
+        self.assertEquals(tasks.enqueue(name, [{"n": 1}]), 1)
+
+    @override_settings(TASK_CHUNK_SIZE=2)
+    def test_jobs_enqueue_chunks(self):
+        for i in range(3):
+            Account.objects.create(
+                sfid=f"test{11 + i}",
+                prep="test",
+                doid=f"{i}",
+                name="test",
+                domain="test.com",
+            )
+
+        # GetContacts keeps its accounts to one Salesforce query per task
+        sizes = {jobs.GetContacts: [3], jobs.GetHierarchies: [1, 2]}
+
+        for job in (jobs.GetContacts, jobs.GetHierarchies):
+            job().do()
+            chunks = [
+                json.loads(task.args)["account_ids"]
+                for task in Task.objects.filter(name=job.code)
+            ]
+            self.assertEquals(sorted(len(ids) for ids in chunks), sizes[job])
+
+        jobs.Upload().do()
+        jobs.Upload().do()
+        self.assertEquals(Task.objects.filter(name="api.jobs.Upload").count(), 1)
+
+
+@override_settings(CACHES=LOCAL_CACHES, SATELLITES_METRICS_KEY="secret")
+class MetricsTestCase(TestCase):
+    def test_job_metrics(self):
+        account = Account.objects.create(sfid="a", name="Acme", domain="acme.com")
+        Contact.objects.create(account=account, name="Jane Doe", title="CEO")
+
+        jobs.QualifyContacts().run()
+
+        response = self.client.get("/metrics")
+        self.assertEquals(response.status_code, 403)
+
+        # without a key, the endpoint is closed rather than public
+        with self.settings(SATELLITES_METRICS_KEY=""):
+            response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer ")
+        self.assertEquals(response.status_code, 403)
+
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEquals(response.status_code, 200)
+
+        text = response.content.decode()
+        self.assertIn('satellites_job_success{job="api.jobs.QualifyContacts"} 1', text)
+        self.assertIn(
+            'satellites_job_records{job="api.jobs.QualifyContacts",kind="contacts"} 1',
+            text,
+        )
+
+    def test_merges_batch_metrics(self):
+        name = "api.tests.ChunkedJob"
+        tasks.enqueue(name, [{"ids": [1, 2]}, {"ids": [3]}])
+        tasks.work("test", once=True)
+
+        # a later batch replaces the earlier one instead of adding to it
+        tasks.enqueue(name, [{"ids": [4]}, {"ids": [5]}])
+        tasks.work("test", once=True)
+
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertIn(
+            'satellites_job_records{job="api.tests.ChunkedJob",kind="accounts"} 2',
+            response.content.decode(),
+        )
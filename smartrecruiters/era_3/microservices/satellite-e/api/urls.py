@@ -14,8 +14,24 @@ urlpatterns = [
     path("accounts/create", views.create_account, name="create-account"),
     path("accounts/<str:id>/update", views.update_account, name="update-account"),
     path("accounts/<str:id>/delete", views.delete_account, name="delete-account"),
+    path("accounts/<str:id>/hierarchy", views.get_hierarchy, name="get-hierarchy"),
     path("contacts", views.get_contacts, name="get-contacts"),
     path("contacts/create", views.create_contact, name="create-contact"),
+    path(
+        "contacts/bulk/create",
+        views.bulk_create_contacts,
+        name="bulk-create-contacts",
+    ),
+    path(
+        "contacts/bulk/update",
+        views.bulk_update_contacts,
+        name="bulk-update-contacts",
+    ),
+    path(
+        "contacts/bulk/delete",
+        views.bulk_delete_contacts,
+        name="bulk-delete-contacts",
+    ),
     path("contacts/<str:id>/update", views.update_contact, name="update-contact"),
     path("contacts/<str:id>/delete", views.delete_contact, name="delete-contact"),
 ]
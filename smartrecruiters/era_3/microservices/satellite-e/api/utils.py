@@ -9,6 +9,8 @@ This module implements utility methods for the API.
 
 import requests
 
+from satellites.titles import qualify_contacts
+
 
 def authorize(auth):
     """ .Checks an access token through satellite-s """
@@ -23,50 +25,43 @@ def authorize(auth):
         return False
 
 
+class QueryCounter:
+    """ Counts the queries run on a connection.
+
+    Install it with `connection.execute_wrapper(counter)`.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+
+        return execute(sql, params, many, context)
+
+
 def qualify_title(contact):
     """ Qualifies the contact's title. """
-    if not contact.title:
-        return
-
-    ratings = [1, 2, 3]
-    titles = [
-        [
-            "SENIOR VICE PRESIDENT",
-            "SVP",
-            "VICE PRESIDENT",
-            "VP",
-            "PRESIDENT",
-            "CHIEF",
-            "DIRECTOR",
-            "HEAD",
-            "LEAD",
-        ],
-        ["SENIOR MANAGER", "MANAGER", "COORDINATOR", "BUSINESS PARTNER"],
-        ["ANALYST", "GENERALIST", "ASSISTANT", "SPECIALIST"],
-    ]
-    priorities = [1, 2, 3, 4, 5]
-    functions = ["TALENT", "RECRUIT", "HIRING", "HUMAN RESOURCES", "HR"]
-
-    # title qualifier algorithm
-    for group in titles:
-        for title in group:
-            if title in contact.title.upper():
-                contact.rating = ratings[titles.index(group)]
-                break
-
-    # function qualifier algorithm
-    for function in functions:
-        if function in contact.title.upper():
-            contact.priority = priorities[functions.index(function)]
-            break
-
-    contact.save()
+    if qualify_contacts([contact]):
+        contact.save()
 
 
-def update_object(obj, data):
-    """ Iterates through object attributes and updates values. """
+def apply_object(obj, data):
+    """ Iterates through object attributes and sets values without saving.
+
+    :return fields: a list of the names of the fields that were set
+    """
+    fields = []
     for field in obj._meta.fields:
         if field.name in data and data[field.name]:
             setattr(obj, field.name, data[field.name])
+            fields.append(field.name)
+
+    return fields
+
+
+def update_object(obj, data):
+    """ Iterates through object attributes and updates values. """
+    apply_object(obj, data)
 
     obj.save()
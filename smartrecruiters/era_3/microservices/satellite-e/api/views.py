@@ -9,15 +9,18 @@ This module implements the endpoint methods for the API.
 
 import json
 
-from api.models import Account, Contact
-from api.utils import update_object
+from api.models import Account, Contact, OrgNode
+from api.utils import apply_object, update_object
 
 from django import http
+from django.db import IntegrityError, transaction
 from django.core.serializers import serialize
-from django.core.exceptions import ObjectDoesNotExist
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.views.decorators.csrf import csrf_exempt
 
 from satellites.decorators import auth_required, cors_enabled
+from satellites.hierarchy import reports_to, subtree
+from satellites.streaming import stream_queryset
 
 
 @csrf_exempt
@@ -26,19 +29,7 @@ from satellites.decorators import auth_required, cors_enabled
 def get_accounts(request):
     params = request.GET.dict()
 
-    if params:
-        items = Account.objects.filter(**params)
-    else:
-        items = Account.objects.all()
-    data = serialize("json", items)
-
-    response = http.HttpResponse()
-    response.content = data
-    response.content_type = "application/json"
-    response.status_code = 200
-    response["Access-Control-Allow-Origin"] = "*"
-
-    return response
+    return stream_queryset(Account.objects.all(), params)
 
 
 @csrf_exempt
@@ -47,11 +38,15 @@ def get_accounts(request):
 def create_account(request):
     body = json.loads(request.body)
 
-    if body:
-        Account.objects.create(**body)
-    else:
+    if not body:
         return http.HttpResponseBadRequest()
 
+    try:
+        with transaction.atomic():
+            Account.objects.create(**body)
+    except IntegrityError:
+        return http.HttpResponse(b"Account already exists.", status=409)
+
     response = http.HttpResponse()
     response.content = b"Object created successfully."
     response.status_code = 200
@@ -101,22 +96,40 @@ def delete_account(request, id):
 @csrf_exempt
 @cors_enabled
 @auth_required
-def get_contacts(request):
+def get_hierarchy(request, id):
+    """ Streams an account's org hierarchy, ordered by path.
+
+    With `node`, a DiscoverOrg ID, only that node's subtree is returned, or
+    with `direction=reports-to` the chain of nodes it reports to.
+    """
     params = request.GET.dict()
+    doid = params.pop("node", None)
+    direction = params.pop("direction", "subtree")
 
-    if params:
-        items = Contact.objects.filter(**params)
-    else:
-        items = Contact.objects.all()
-    data = serialize("json", items)
+    if direction not in ("subtree", "reports-to"):
+        return http.HttpResponseBadRequest()
 
-    response = http.HttpResponse()
-    response.content = data
-    response.content_type = "application/json"
-    response.status_code = 200
-    response["Access-Control-Allow-Origin"] = "*"
+    try:
+        nodes = OrgNode.objects.filter(account_id=id).order_by("path")
+        if doid:
+            node = nodes.get(doid=doid)
+            if direction == "subtree":
+                nodes = subtree(node)
+            else:
+                nodes = reports_to(node)
+    except (ObjectDoesNotExist, ValidationError):
+        return http.HttpResponseNotFound()
 
-    return response
+    return stream_queryset(nodes, params)
+
+
+@csrf_exempt
+@cors_enabled
+@auth_required
+def get_contacts(request):
+    params = request.GET.dict()
+
+    return stream_queryset(Contact.objects.all(), params)
 
 
 @csrf_exempt
@@ -181,3 +194,152 @@ def delete_contact(request, id):
     response["Access-Control-Allow-Origin"] = "*"
 
     return response
+
+
+def _invalid_item(index, reason):
+    return http.HttpResponseBadRequest(f"Item {index}: {reason}".encode())
+
+
+def _validate_contacts(body, key, pk):
+    """ Checks every item of a bulk contact request before anything is written.
+
+    :param body: the request's list of contact dictionaries
+    :param key: the key each item is identified by, `pid` or `id`
+    :param pk: the primary key field the key holds
+    :return response: a 400 response naming the first invalid item, or None
+    """
+    fields = {
+        field.name: field
+        for field in Contact._meta.concrete_fields
+        if not field.is_relation
+    }
+    fields[key] = pk
+
+    for index, item in enumerate(body):
+        if not isinstance(item, dict):
+            return _invalid_item(index, "not an object.")
+        if item.get(key) is None:
+            return _invalid_item(index, f"missing {key}.")
+
+        for name, value in item.items():
+            if name not in fields:
+                return _invalid_item(index, f"unknown field {name}.")
+
+            try:
+                fields[name].to_python(value)
+            except ValidationError:
+                return _invalid_item(index, f"invalid {name}.")
+
+    return None
+
+
+@csrf_exempt
+@cors_enabled
+@auth_required
+def bulk_create_contacts(request):
+    body = json.loads(request.body)
+
+    if not body or not isinstance(body, list):
+        return http.HttpResponseBadRequest()
+
+    invalid = _validate_contacts(body, "pid", Account._meta.pk)
+    if invalid:
+        return invalid
+
+    pids = {Account._meta.pk.to_python(item["pid"]) for item in body}
+    accounts = Account.objects.in_bulk(pids)
+    if len(accounts) != len(pids):
+        return http.HttpResponseNotFound()
+
+    contacts = []
+    for item in body:
+        item = item.copy()
+        account = accounts[Account._meta.pk.to_python(item.pop("pid"))]
+
+        if "name" not in item:
+            item["name"] = "New Contact"
+
+        contacts.append(Contact(account=account, **item))
+
+    with transaction.atomic():
+        Contact.objects.bulk_create(contacts)
+
+    items = Contact.objects.filter(id__in=[contact.id for contact in contacts])
+    data = serialize("json", items)
+
+    response = http.HttpResponse()
+    response.content = data
+    response.content_type = "application/json"
+    response.status_code = 200
+    response["Access-Control-Allow-Origin"] = "*"
+
+    return response
+
+
+@csrf_exempt
+@cors_enabled
+@auth_required
+def bulk_update_contacts(request):
+    body = json.loads(request.body)
+
+    if not body or not isinstance(body, list):
+        return http.HttpResponseBadRequest()
+
+    invalid = _validate_contacts(body, "id", Contact._meta.pk)
+    if invalid:
+        return invalid
+
+    ids = {Contact._meta.pk.to_python(item["id"]) for item in body}
+    contacts = Contact.objects.in_bulk(ids)
+    if len(contacts) != len(ids):
+        return http.HttpResponseNotFound()
+
+    fields = set()
+    for item in body:
+        contact = contacts[Contact._meta.pk.to_python(item["id"])]
+        fields.update(apply_object(contact, item))
+    fields.discard(Contact._meta.pk.name)
+
+    if fields:
+        with transaction.atomic():
+            Contact.objects.bulk_update(contacts.values(), fields, batch_size=500)
+
+    items = Contact.objects.filter(id__in=ids)
+    data = serialize("json", items)
+
+    response = http.HttpResponse()
+    response.content = data
+    response.content_type = "application/json"
+    response.status_code = 200
+    response["Access-Control-Allow-Origin"] = "*"
+
+    return response
+
+
+@csrf_exempt
+@cors_enabled
+@auth_required
+def bulk_delete_contacts(request):
+    body = json.loads(request.body)
+
+    if not body or not isinstance(body, list):
+        return http.HttpResponseBadRequest()
+
+    for index, id in enumerate(body):
+        if id is None:
+            return _invalid_item(index, "missing id.")
+
+        try:
+            Contact._meta.pk.to_python(id)
+        except ValidationError:
+            return _invalid_item(index, "invalid id.")
+
+    with transaction.atomic():
+        Contact.objects.filter(id__in=body).delete()
+
+    response = http.HttpResponse()
+    response.content = b"Objects deleted successfully."
+    response.status_code = 200
+    response["Access-Control-Allow-Origin"] = "*"
+
+    return response
@@ -6,6 +6,7 @@ This module implements the Django settings for this project.
 """
 
 import os
+import json
 import dj_database_url
 
 APP_NAME = "satellite_e"
@@ -74,6 +75,21 @@ DATABASES = {
 db_from_env = dj_database_url.config(conn_max_age=500)
 DATABASES["default"].update(db_from_env)
 
+# shared by every process, so cron runs reuse the DiscoverOrg session token;
+# the table is created with `manage.py createcachetable`
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "cache",
+    },
+    # DiscoverOrg responses, culled once MAX_ENTRIES is reached
+    "discoverorg": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "discoverorg_cache",
+        "OPTIONS": {"MAX_ENTRIES": int(os.getenv("DO_CACHE_MAX_ENTRIES", 10000))},
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"
@@ -106,4 +122,64 @@ CRON_CLASSES = [
     "api.jobs.SyncAccounts",
     "api.jobs.GetContacts",
     "api.jobs.QualifyContacts",
+    "api.jobs.GetHierarchies",
 ]
+
+# task queue; the cron jobs enqueue, `run_worker` processes run the tasks
+TASK_CHUNK_SIZE = int(os.getenv("TASK_CHUNK_SIZE", 25))
+TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", 5))
+TASK_RETRY_BACKOFF = int(os.getenv("TASK_RETRY_BACKOFF", 30))
+TASK_VISIBILITY_TIMEOUT = int(os.getenv("TASK_VISIBILITY_TIMEOUT", 900))
+TASK_POLL_INTERVAL = float(os.getenv("TASK_POLL_INTERVAL", 5))
+
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", 8))
+
+# outbound limits per provider, on top of satellites.outbound.DEFAULTS
+SATELLITES_PROVIDERS = {
+    "discoverorg": {"rate": float(os.getenv("DO_RATE_LIMIT", 2))},
+    "salesforce": {"rate": float(os.getenv("SF_RATE_LIMIT", 20))},
+}
+
+SATELLITES_DISCOVERORG_TOKEN_TTL = int(
+    os.getenv("SATELLITES_DISCOVERORG_TOKEN_TTL", 3600)
+)
+SATELLITES_DISCOVERORG_TOKEN_REFRESH = int(
+    os.getenv("SATELLITES_DISCOVERORG_TOKEN_REFRESH", 300)
+)
+SATELLITES_DISCOVERORG_RESPONSE_CACHE = "discoverorg"
+SATELLITES_DISCOVERORG_RESPONSE_TTL = int(
+    os.getenv("SATELLITES_DISCOVERORG_RESPONSE_TTL", 604800)
+)
+SATELLITES_DISCOVERORG_CACHE_BYPASS = (
+    os.getenv("SATELLITES_DISCOVERORG_CACHE_BYPASS", "") == "1"
+)
+
+SATELLITES_TOKEN_CACHE_SIZE = int(os.getenv("SATELLITES_TOKEN_CACHE_SIZE", 1024))
+SATELLITES_TOKEN_CACHE_TTL = int(os.getenv("SATELLITES_TOKEN_CACHE_TTL", 300))
+SATELLITES_TOKEN_CACHE_NEGATIVE_TTL = int(
+    os.getenv("SATELLITES_TOKEN_CACHE_NEGATIVE_TTL", 30)
+)
+SATELLITES_HOOK_KEY = os.getenv("SATELLITES_HOOK_KEY", "")
+
+# signed tokens are verified here against these keys (public halves only for
+# Ed25519), and checked against the revocations polled from satellite-s
+SATELLITES_TOKEN_KEYS = json.loads(os.getenv("SATELLITES_TOKEN_KEYS", "{}"))
+SATELLITES_TOKEN_DENYLIST_INTERVAL = int(
+    os.getenv("SATELLITES_TOKEN_DENYLIST_INTERVAL", 30)
+)
+
+SATELLITES_METRICS_KEY = os.getenv("SATELLITES_METRICS_KEY", "")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {"raw": {"format": "%(message)s"}},
+    "handlers": {"metrics": {"class": "logging.StreamHandler", "formatter": "raw"}},
+    "loggers": {
+        "satellites.metrics": {
+            "handlers": ["metrics"],
+            "level": "INFO",
+            "propagate": False,
+        }
+    },
+}
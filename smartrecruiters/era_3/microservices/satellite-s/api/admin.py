@@ -5,9 +5,11 @@ api.admin
 This module implements the admin terminal configuration for the API.
 """
 
-from api.models import Profile
+from api.models import Email, Profile, Revocation
 
 from django.contrib import admin
 
 
 admin.site.register(Profile)
+admin.site.register(Revocation)
+admin.site.register(Email)
@@ -0,0 +1,24 @@
+"""
+api.hashers
+~~~~~~~~~~~
+
+This module implements the password hashers for the API.
+"""
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """ Django's PBKDF2 hasher, with its work factor set in the settings.
+
+    It keeps the `pbkdf2_sha256` algorithm name, so existing hashes still
+    verify; a hash made with other iterations is redone on the next login.
+    """
+
+    @property
+    def iterations(self):
+        return (
+            settings.SATELLITES_PASSWORD_ITERATIONS
+            or hashers.PBKDF2PasswordHasher.iterations
+        )
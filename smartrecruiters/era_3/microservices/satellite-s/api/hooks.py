@@ -0,0 +1,33 @@
+"""
+api.hooks
+~~~~~~~~~
+
+This module implements pushes to the hooks exposed by other satellites.
+"""
+
+import json
+
+from django.conf import settings
+
+import requests
+
+
+def invalidate_tokens(tokens):
+    """ Tells every satellite to drop tokens from its local cache.
+
+    :param tokens: a list of access tokens
+    """
+    if not settings.SATELLITES_HOOK_KEY:
+        return
+
+    headers = {
+        "Content-Type": "application/json",
+        "X-Hook-Key": settings.SATELLITES_HOOK_KEY,
+    }
+    data = json.dumps({"tokens": tokens})
+
+    for url in settings.SATELLITES_TOKEN_HOOKS:
+        try:
+            requests.post(url, headers=headers, data=data, timeout=2)
+        except requests.RequestException as e:
+            print(f"Token invalidation failed for {url}: {e}")
@@ -0,0 +1,24 @@
+"""
+api.management.commands.send_email
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+This module implements a command that sends the emails in the outbox.
+"""
+
+from api import outbox
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Sends the emails in the outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="exit once nothing is due"
+        )
+
+    def handle(self, *args, **options):
+        count = outbox.drain(once=options["once"])
+
+        self.stdout.write(f"Sent {count} emails.")
@@ -5,8 +5,18 @@ api.models
 This module implements the database models for the API.
 """
 
+import time
+
+from api import hooks
+
+from django.conf import settings
 from django.db import models
+from django.db.models.signals import pre_save, post_delete
+from django.dispatch import receiver
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+from satellites.cache import get_token_cache
 
 
 class Profile(models.Model):
@@ -16,7 +26,7 @@ class Profile(models.Model):
     status = models.CharField("User Status", max_length=9, default="pending")
 
     sfid = models.CharField("Salesforce ID", max_length=18)
-    token = models.CharField("Access Token", max_length=43)
+    token = models.CharField("Access Token", max_length=43, unique=True)
 
     alignment = models.ForeignKey(
         User,
@@ -32,3 +42,97 @@ class Profile(models.Model):
 
     def __str__(self):
         return str(self.user)
+
+
+class Revocation(models.Model):
+    """ Signed tokens issued to a subject up to `revoked_at` are rejected. """
+
+    subject = models.CharField("Subject", max_length=150, unique=True)
+    revoked_at = models.FloatField("Revoked At", db_index=True)
+
+    def __str__(self):
+        return self.subject
+
+    @classmethod
+    def revoke(cls, subject):
+        """ Revokes every signed token issued to a subject so far.
+
+        Entries older than SATELLITES_TOKEN_TTL only cover expired tokens,
+        so they're dropped to keep the denylist compact.
+
+        :param subject: a username
+        """
+        now = time.time()
+
+        cls.objects.update_or_create(subject=subject, defaults={"revoked_at": now})
+        cls.objects.filter(revoked_at__lt=now - settings.SATELLITES_TOKEN_TTL).delete()
+
+    @classmethod
+    def active(cls):
+        """ Gets the revocations that still cover unexpired tokens.
+
+        :return revocations: a dictionary of revocation times by subject
+        """
+        since = time.time() - settings.SATELLITES_TOKEN_TTL
+
+        return dict(
+            cls.objects.filter(revoked_at__gte=since).values_list(
+                "subject", "revoked_at"
+            )
+        )
+
+
+class Email(models.Model):
+    """ An email waiting in the outbox for the background sender. """
+
+    subject = models.CharField("Subject", max_length=256)
+    from_email = models.CharField("From", max_length=254)
+    to = models.CharField("To", max_length=254)
+    text = models.TextField("Text")
+    html = models.TextField("HTML", blank=True, default="")
+
+    STATUSES = [("queued", "Queued"), ("sending", "Sending"), ("failed", "Failed")]
+    status = models.CharField(
+        "Status", max_length=16, choices=STATUSES, default="queued"
+    )
+    attempts = models.PositiveSmallIntegerField("Attempts", default=0)
+
+    send_at = models.DateTimeField("Send At", default=timezone.now)
+    locked_until = models.DateTimeField("Locked Until", null=True, blank=True)
+
+    error = models.TextField("Last Error", null=True, blank=True)
+    created = models.DateTimeField("Created", auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "send_at"], name="email_status_idx")]
+
+    def __str__(self):
+        return f"{self.subject} to {self.to} ({self.status})"
+
+
+@receiver(pre_save, sender=Profile)
+def invalidate_changed_token(sender, instance, **kwargs):
+    """ Pushes the old token out of satellite caches when it is replaced. """
+    # the new token may be cached as rejected
+    get_token_cache().invalidate([instance.token])
+
+    if instance.pk is None:
+        return
+
+    old = Profile.objects.filter(pk=instance.pk).values_list("token", flat=True)
+    old = old.first()
+    if old and old != instance.token:
+        get_token_cache().invalidate([old])
+        hooks.invalidate_tokens([old])
+
+        # replacing the token also recalls the signed tokens issued for it
+        Revocation.revoke(instance.user.username)
+
+
+@receiver(post_delete, sender=Profile)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """ Pushes a deleted profile's token out of satellite caches. """
+    get_token_cache().invalidate([instance.token])
+    hooks.invalidate_tokens([instance.token])
+
+    Revocation.revoke(instance.user.username)
@@ -0,0 +1,196 @@
+"""
+api.outbox
+~~~~~~~~~~
+
+This module implements the email outbox drained by the background sender.
+
+Views queue emails instead of sending them, so a request never waits on
+SMTP. The `send_email` command claims due emails in batches with `SELECT
+... FOR UPDATE SKIP LOCKED`, sends each batch over one SMTP connection, and
+retries failures with exponential backoff.
+"""
+
+# pylint:disable=E1101
+
+import os
+import time
+import functools
+
+from datetime import timedelta
+
+from api.models import Email
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+TEMPLATES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+
+@functools.lru_cache(maxsize=None)
+def get_template(name):
+    """ Gets an email template, read from disk once per process.
+
+    :param name: the template's file name, e.g. `email.txt`
+    :return template: the template's text
+    """
+    with open(os.path.join(TEMPLATES, name), "r") as f:
+        return f.read()
+
+
+def render(template, **context):
+    """ Fills in an email template.
+
+    :param template: the template's file name
+    :return text: the filled-in template
+    """
+    return get_template(template).format(**context)
+
+
+def queue(subject, to, text, html="", from_email=None):
+    """ Puts an email in the outbox.
+
+    :param subject: the subject line
+    :param to: the recipient's address
+    :param text: the plain text body
+    :param html: the HTML body, if any
+    :param from_email: the sender's address, or None for DEFAULT_FROM_EMAIL
+    :return email: the queued Email
+    """
+    return Email.objects.create(
+        subject=subject,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=to,
+        text=text,
+        html=html,
+    )
+
+
+def claim(size=None):
+    """ Claims a batch of due emails.
+
+    :param size: the most emails to claim, or None for OUTBOX_BATCH_SIZE
+    :return emails: a list of Emails
+    """
+    now = timezone.now()
+
+    with transaction.atomic():
+        emails = list(
+            Email.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status="queued", send_at__lte=now)
+                | Q(status="sending", locked_until__lte=now)
+            )
+            .order_by("send_at")[: size or settings.OUTBOX_BATCH_SIZE]
+        )
+
+        # an email whose sender died on every attempt is never sent again
+        abandoned = [
+            email
+            for email in emails
+            if email.status == "sending"
+            and email.attempts >= settings.OUTBOX_MAX_ATTEMPTS
+        ]
+        for email in abandoned:
+            email.status = "failed"
+            email.locked_until = None
+            email.error = f"Abandoned after {email.attempts} attempts."
+        Email.objects.bulk_update(abandoned, ["status", "locked_until", "error"])
+
+        emails = [email for email in emails if email.status != "failed"]
+
+        until = now + timedelta(seconds=settings.OUTBOX_VISIBILITY_TIMEOUT)
+        for email in emails:
+            email.status = "sending"
+            email.attempts += 1
+            email.locked_until = until
+
+        Email.objects.bulk_update(emails, ["status", "attempts", "locked_until"])
+
+    return emails
+
+
+def send(emails):
+    """ Sends claimed emails over one connection.
+
+    Sent emails are deleted, and failed ones are retried later.
+
+    :param emails: a list of claimed Emails
+    :return sent: the number of emails sent
+    """
+    sent = []
+
+    try:
+        connection = get_connection()
+        connection.open()
+    except Exception as e:
+        for email in emails:
+            fail(email, e)
+
+        return 0
+
+    try:
+        for email in emails:
+            message = EmailMultiAlternatives(
+                email.subject,
+                email.text,
+                email.from_email,
+                [email.to],
+                connection=connection,
+            )
+            if email.html:
+                message.attach_alternative(email.html, "text/html")
+
+            try:
+                message.send()
+            except Exception as e:
+                fail(email, e)
+            else:
+                sent.append(email.pk)
+    finally:
+        connection.close()
+
+    Email.objects.filter(pk__in=sent).delete()
+
+    return len(sent)
+
+
+def fail(email, error):
+    """ Retries a claimed email with exponential backoff, or gives up on it.
+
+    :param email: a claimed Email
+    :param error: the exception it failed with
+    """
+    if email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        update = {"status": "failed"}
+    else:
+        delay = settings.OUTBOX_RETRY_BACKOFF * 2 ** (email.attempts - 1)
+        update = {
+            "status": "queued",
+            "send_at": timezone.now() + timedelta(seconds=delay),
+        }
+
+    Email.objects.filter(pk=email.pk).update(
+        locked_until=None, error=str(error), **update
+    )
+
+
+def drain(once=False):
+    """ Sends due emails until stopped.
+
+    :param once: whether to return once nothing is due
+    :return count: the number of emails sent
+    """
+    count = 0
+    while True:
+        emails = claim()
+        if not emails:
+            if once:
+                return count
+
+            time.sleep(settings.OUTBOX_POLL_INTERVAL)
+            continue
+
+        count += send(emails)
@@ -7,12 +7,23 @@ This module implements the unit tests for the API.
 
 # pylint:disable=E1101
 
-from django.test import TestCase
+import json
+
+from unittest import mock
+
+from django.core import mail
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase, TestCase, override_settings
 from django.test.client import RequestFactory
 from django.contrib.auth.models import User
+from django.utils import timezone
 
-from api import views
-from api.models import Profile
+from api import outbox, utils, views
+from api.models import Email, Profile, Revocation
+from api.throttle import SlidingWindow
+
+from satellites.cache import get_token_cache
 
 
 class AuthTestCase(TestCase):
@@ -27,6 +38,8 @@ class AuthTestCase(TestCase):
         Profile.objects.create(
             user=user, cid="test", status="pending", sfid="test", token="test"
         )
+        get_token_cache().invalidate()
+        caches["default"].clear()
 
     def test_authentication(self):
         factory = RequestFactory()
@@ -38,6 +51,61 @@ class AuthTestCase(TestCase):
         self.assertEquals(response.status_code, 200)
         self.assertEquals(response["X-Token"], "test")
 
+        request = factory.get(
+            "authenticate", HTTP_X_USERNAME="nobody", HTTP_X_PASSWORD="test"
+        )
+        response = views.authenticate(request)
+        self.assertEquals(response.status_code, 403)
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_authentication_queries(self):
+        request = RequestFactory().get(
+            "authenticate", HTTP_X_USERNAME="test", HTTP_X_PASSWORD="test"
+        )
+
+        with self.assertNumQueries(1):
+            response = views.authenticate(request)
+        self.assertEquals(response.status_code, 200)
+
+    def test_password_rehash(self):
+        request = RequestFactory().get(
+            "authenticate", HTTP_X_USERNAME="test", HTTP_X_PASSWORD="test"
+        )
+
+        with self.settings(SATELLITES_PASSWORD_ITERATIONS=1000):
+            response = views.authenticate(request)
+            self.assertEquals(response.status_code, 200)
+
+            password = User.objects.get(username="test").password
+            self.assertTrue(password.startswith("pbkdf2_sha256$1000$"))
+
+            response = views.authenticate(request)
+            self.assertEquals(response.status_code, 200)
+
+    @override_settings(SATELLITES_LOGIN_LIMIT_USERNAME=2)
+    def test_login_throttle(self):
+        factory = RequestFactory()
+        wrong = factory.get(
+            "authenticate", HTTP_X_USERNAME="test", HTTP_X_PASSWORD="wrong"
+        )
+        right = factory.get(
+            "authenticate", HTTP_X_USERNAME="test", HTTP_X_PASSWORD="test"
+        )
+
+        self.assertEquals(views.authenticate(wrong).status_code, 403)
+        self.assertEquals(views.authenticate(wrong).status_code, 403)
+
+        response = views.authenticate(right)
+        self.assertEquals(response.status_code, 429)
+        self.assertGreater(int(response["Retry-After"]), 0)
+
+        other = factory.get(
+            "authenticate", HTTP_X_USERNAME="other", HTTP_X_PASSWORD="test"
+        )
+        self.assertEquals(views.authenticate(other).status_code, 403)
+
     def test_authorization(self):
         factory = RequestFactory()
         request = factory.get("authorize", HTTP_AUTHORIZATION="Basic test")
@@ -45,6 +113,129 @@ class AuthTestCase(TestCase):
         response = views.authorize(request)
         self.assertEquals(response.status_code, 200)
 
+    def test_authorization_cache(self):
+        factory = RequestFactory()
+        request = factory.get("authorize", HTTP_AUTHORIZATION="Basic test")
+
+        with self.assertNumQueries(1):
+            views.authorize(request)
+        with self.assertNumQueries(0):
+            response = views.authorize(request)
+        self.assertEquals(response.status_code, 200)
+
+        profile = Profile.objects.get(token="test")
+        profile.token = "changed"
+        profile.save()
+
+        response = views.authorize(request)
+        self.assertEquals(response.status_code, 403)
+
+        request = factory.get("authorize", HTTP_AUTHORIZATION="Basic changed")
+        response = views.authorize(request)
+        self.assertEquals(response.status_code, 200)
+
+        request = factory.get("authorize")
+        response = views.authorize(request)
+        self.assertEquals(response.status_code, 403)
+
+    def test_batch_authorization(self):
+        User.objects.create_user("other", password="test")
+        Profile.objects.create(
+            user=User.objects.get(username="other"), cid="t", sfid="t", token="other"
+        )
+
+        factory = RequestFactory()
+        request = factory.post(
+            "authorize/batch",
+            data={"tokens": ["test", "other", "wrong", "test"]},
+            content_type="application/json",
+            HTTP_AUTHORIZATION="Basic test",
+        )
+
+        with self.assertNumQueries(2):
+            response = views.authorize_batch(request)
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(
+            json.loads(response.content)["authorized"],
+            {"test": True, "other": True, "wrong": False},
+        )
+
+        # the caller's token and the batch are cached now
+        with self.assertNumQueries(0):
+            views.authorize_batch(request)
+
+        request = factory.post(
+            "authorize/batch",
+            data={"tokens": ["test"]},
+            content_type="application/json",
+            HTTP_AUTHORIZATION="Basic wrong",
+        )
+        self.assertEquals(views.authorize_batch(request).status_code, 403)
+
+        request = factory.post(
+            "authorize/batch",
+            data={"tokens": "test"},
+            content_type="application/json",
+            HTTP_AUTHORIZATION="Basic test",
+        )
+        self.assertEquals(views.authorize_batch(request).status_code, 400)
+
+
+@override_settings(
+    SATELLITES_TOKEN_KEYS={"test": {"alg": "HS256", "secret": "test"}},
+    SATELLITES_TOKEN_SIGNING_KEY="test",
+    SATELLITES_HOOK_KEY="test",
+    SATELLITES_TOKEN_HOOKS=[],
+)
+class SignedTokenTestCase(TestCase):
+    def setUp(self):
+        user = User.objects.create_user("test", password="test")
+        Profile.objects.create(user=user, cid="test", sfid="test", token="test")
+        get_token_cache().invalidate()
+
+    def authorize(self, token):
+        request = RequestFactory().get(
+            "authorize", HTTP_AUTHORIZATION=f"Basic {token}"
+        )
+
+        return views.authorize(request).status_code
+
+    def test_signed_authorization(self):
+        request = RequestFactory().get(
+            "authenticate", HTTP_X_USERNAME="test", HTTP_X_PASSWORD="test"
+        )
+        token = views.authenticate(request)["X-Token"]
+
+        self.assertNotEqual(token, "test")
+        self.assertEqual(self.authorize(token), 200)
+
+        request = RequestFactory().get(
+            "get", HTTP_X_USERNAME="test", HTTP_AUTHORIZATION=f"Basic {token}"
+        )
+        self.assertEqual(views.get_users(request).status_code, 200)
+        self.assertEqual(utils.authorize_many([token]), {token: True})
+        self.assertEqual(self.authorize(token[:-2]), 403)
+
+        profile = Profile.objects.get(token="test")
+        profile.token = "changed"
+        profile.save()
+
+        self.assertEqual(self.authorize(token), 403)
+        self.assertIn("test", Revocation.active())
+        self.assertEqual(utils.authorize_many([token]), {token: False})
+
+    def test_revocations(self):
+        Revocation.revoke("test")
+
+        response = views.revocations(RequestFactory().get("revocations"))
+        self.assertEqual(response.status_code, 403)
+
+        response = views.revocations(
+            RequestFactory().get("revocations", HTTP_X_HOOK_KEY="test")
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(json.loads(response.content)["revocations"]), ["test"])
+
 
 class UserTestCase(TestCase):
     def setUp(self):
@@ -52,6 +243,7 @@ class UserTestCase(TestCase):
             "tester", email="tester@test.test", password="test"
         )
         Profile.objects.create(user=user, cid="test", sfid="test", token="test")
+        get_token_cache().invalidate()
 
     def test_user_flow(self):
         factory = RequestFactory()
@@ -69,6 +261,12 @@ class UserTestCase(TestCase):
 
         response = views.create_user(request)
         self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+
+        self.assertEqual(outbox.drain(once=True), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("test@smartrecruiters.com", mail.outbox[0].body)
+        self.assertFalse(Email.objects.exists())
 
         user = User.objects.get_by_natural_key("test@smartrecruiters.com")
         profile = Profile.objects.get(user=user)
@@ -100,3 +298,95 @@ class UserTestCase(TestCase):
         response = views.get_users(request)
         self.assertEquals(response.status_code, 200)
         self.assertIn(b"test", response.content)
+
+        request = factory.post("get", HTTP_AUTHORIZATION="Basic wrong")
+
+        response = views.get_users(request)
+        self.assertEquals(response.status_code, 403)
+
+
+class OutboxTestCase(TestCase):
+    def test_batches(self):
+        for i in range(3):
+            outbox.queue("test", f"{i}@test.test", "test")
+
+        with override_settings(OUTBOX_BATCH_SIZE=2):
+            self.assertEqual(len(outbox.claim()), 2)
+            self.assertEqual(len(outbox.claim()), 1)
+            self.assertEqual(len(outbox.claim()), 0)
+
+    def test_retries(self):
+        outbox.queue("test", "test@test.test", "test", html="<p>test</p>")
+
+        with mock.patch.object(
+            outbox.EmailMultiAlternatives, "send", side_effect=OSError("down")
+        ):
+            self.assertEqual(outbox.drain(once=True), 0)
+
+        email = Email.objects.get()
+        self.assertEqual(email.status, "queued")
+        self.assertEqual(email.attempts, 1)
+        self.assertEqual(email.error, "down")
+        self.assertGreater(email.send_at, timezone.now())
+
+        # not due until its backoff runs out
+        self.assertEqual(outbox.drain(once=True), 0)
+
+        Email.objects.update(send_at=timezone.now())
+        self.assertEqual(outbox.drain(once=True), 1)
+        self.assertEqual(mail.outbox[0].alternatives, [("<p>test</p>", "text/html")])
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=2)
+    def test_abandons_stuck_emails(self):
+        outbox.queue("test", "test@test.test", "test")
+
+        for _ in range(2):
+            self.assertEqual(len(outbox.claim()), 1)
+            Email.objects.update(locked_until=timezone.now())
+
+        self.assertEqual(outbox.claim(), [])
+
+        email = Email.objects.get()
+        self.assertEqual((email.status, email.attempts), ("failed", 2))
+        self.assertEqual(outbox.drain(once=True), 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=1)
+    def test_failure(self):
+        outbox.queue("test", "test@test.test", "test")
+
+        with mock.patch.object(
+            outbox.EmailMultiAlternatives, "send", side_effect=OSError("down")
+        ):
+            outbox.drain(once=True)
+
+        self.assertEqual(Email.objects.get().status, "failed")
+
+
+class SlidingWindowTestCase(SimpleTestCase):
+    def test_sliding_window(self):
+        now = [0]
+        window = SlidingWindow(
+            2,
+            60,
+            prefix="test",
+            cache=LocMemCache("test", {}),
+            clock=lambda: now[0],
+        )
+
+        self.assertEquals(window.wait("key"), 0)
+        window.hit("key")
+        window.hit("key")
+        self.assertEquals(window.wait("key"), 60)
+
+        # three quarters of the last window still count, as 1.5 attempts
+        now[0] = 75
+        self.assertEquals(window.wait("key"), 0)
+        window.hit("key")
+        self.assertEquals(window.wait("key"), 15)
+
+        now[0] = 91
+        self.assertEquals(window.wait("key"), 0)
+
+        window.reset("key")
+        self.assertEquals(window.wait("key"), 0)
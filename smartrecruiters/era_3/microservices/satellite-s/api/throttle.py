@@ -0,0 +1,129 @@
+"""
+api.throttle
+~~~~~~~~~~~~
+
+This module implements the login throttle for the API.
+"""
+
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class SlidingWindow:
+    """ Limits attempts per key over a sliding window.
+
+    Attempts are counted in fixed windows kept in a Django cache, shared by
+    every process. The count over the sliding window is the current window's
+    count plus the previous one's, weighted by how much of it still overlaps.
+
+    :param limit: the attempts allowed per window
+    :param window: the window length, in seconds
+    :param prefix: a prefix for the cache keys
+    :param cache: a Django cache, or None for the default one
+    """
+
+    def __init__(self, limit, window, prefix="throttle", cache=None, clock=time.time):
+        self.limit = limit
+        self.window = window
+        self.prefix = prefix
+        self.clock = clock
+
+        self._cache = cache
+
+    @property
+    def cache(self):
+        """ Gets the cache counts are kept in. """
+        if self._cache is None:
+            self._cache = caches["default"]
+
+        return self._cache
+
+    def _key(self, key, index):
+        return f"{self.prefix}:{key}:{index}"
+
+    def wait(self, key):
+        """ Gets how long a key must wait before its next attempt.
+
+        :param key: what attempts are counted by, e.g. a username
+        :return seconds: a number of seconds, 0 if it may try now
+        """
+        now = self.clock()
+        index = int(now // self.window)
+        offset = now - index * self.window
+        overlap = 1 - offset / self.window
+
+        counts = self.cache.get_many(
+            [self._key(key, index - 1), self._key(key, index)]
+        )
+        previous = counts.get(self._key(key, index - 1), 0)
+        current = counts.get(self._key(key, index), 0)
+
+        if previous * overlap + current < self.limit:
+            return 0
+
+        # the previous window's weight shrinks as it slides out
+        if current >= self.limit or not previous:
+            return math.ceil(self.window - offset)
+
+        needed = 1 - (self.limit - current) / previous
+        return max(math.ceil((needed - offset / self.window) * self.window), 1)
+
+    def hit(self, key):
+        """ Counts an attempt.
+
+        :param key: what attempts are counted by, e.g. a username
+        """
+        index = int(self.clock() // self.window)
+        name = self._key(key, index)
+
+        # kept long enough to be the previous window of the next one
+        if not self.cache.add(name, 1, timeout=self.window * 2):
+            try:
+                self.cache.incr(name)
+            except ValueError:
+                self.cache.set(name, 1, timeout=self.window * 2)
+
+    def reset(self, key):
+        """ Forgets a key's attempts, e.g. after it logs in.
+
+        :param key: what attempts are counted by, e.g. a username
+        """
+        index = int(self.clock() // self.window)
+        self.cache.delete_many([self._key(key, index - 1), self._key(key, index)])
+
+
+def get_client_ip(request):
+    """ Gets the client's IP address.
+
+    Behind SATELLITES_PROXIES proxies, it's the address the first of them
+    appended to `X-Forwarded-For`; entries before it are set by the client.
+
+    :param request: an HttpRequest
+    :return ip: an IP address
+    """
+    proxies = settings.SATELLITES_PROXIES
+    forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "")
+    addresses = [address.strip() for address in forwarded.split(",") if address]
+
+    if proxies and len(addresses) >= proxies:
+        return addresses[-proxies]
+
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def get_login_throttles():
+    """ Gets the login throttles, by username and by IP address.
+
+    :return throttles: a (username, ip) tuple of SlidingWindows
+    """
+    window = settings.SATELLITES_LOGIN_WINDOW
+
+    return (
+        SlidingWindow(
+            settings.SATELLITES_LOGIN_LIMIT_USERNAME, window, prefix="login:username"
+        ),
+        SlidingWindow(settings.SATELLITES_LOGIN_LIMIT_IP, window, prefix="login:ip"),
+    )
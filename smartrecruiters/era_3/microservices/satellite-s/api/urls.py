@@ -14,4 +14,6 @@ urlpatterns = [
     path("get", views.get_users, name="get-user"),
     path("authenticate", views.authenticate, name="authenticate"),
     path("authorize", views.authorize, name="authorize"),
+    path("authorize/batch", views.authorize_batch, name="authorize-batch"),
+    path("revocations", views.revocations, name="revocations"),
 ]
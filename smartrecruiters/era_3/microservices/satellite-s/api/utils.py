@@ -0,0 +1,144 @@
+"""
+api.utils
+~~~~~~~~~
+
+This module implements utility methods for the API.
+"""
+
+# pylint:disable=E1101
+
+from api.models import Profile, Revocation
+
+from django.conf import settings
+
+from satellites import tokens
+from satellites.cache import get_token_cache
+
+
+def get_token(request):
+    """ Gets the access token from the Authorization header.
+
+    :param request: an HttpRequest
+    :return token: an access token, or None
+    """
+    parts = request.headers.get("Authorization", "").split()
+
+    return parts[1] if len(parts) == 2 else None
+
+
+def is_authorized(token):
+    """ Checks whether an access token belongs to a profile.
+
+    Results are kept in the token cache, which the Profile signals clear
+    when a token is replaced or deleted, so most checks skip the database.
+
+    :param token: an access token
+    :return authorized: True or False
+    """
+    if not token:
+        return False
+
+    if tokens.is_signed(token) and settings.SATELLITES_TOKEN_KEYS:
+        return is_authorized_signed(token)
+
+    cache = get_token_cache()
+
+    authorized = cache.get(token)
+    if authorized is None:
+        authorized = Profile.objects.filter(token=token).exists()
+        cache.set(token, authorized)
+
+    return authorized
+
+
+def authorize_many(batch):
+    """ Checks many access tokens at once.
+
+    Cached tokens are answered from the token cache, and the rest are looked
+    up together on the unique token index, so a batch costs one query at
+    most, plus one for the revocations of any signed tokens.
+
+    :param batch: a list of access tokens
+    :return results: a dictionary of True or False by token
+    """
+    signed = bool(settings.SATELLITES_TOKEN_KEYS)
+    cache = get_token_cache()
+
+    results = {}
+    misses = []
+    payloads = {}
+    for token in set(batch):
+        if not token:
+            results[token] = False
+        elif signed and tokens.is_signed(token):
+            try:
+                payloads[token] = tokens.verify(token)
+            except tokens.TokenError:
+                results[token] = False
+        else:
+            authorized = cache.get(token)
+            if authorized is None:
+                misses.append(token)
+            else:
+                results[token] = authorized
+
+    if misses:
+        found = set(
+            Profile.objects.filter(token__in=misses).values_list("token", flat=True)
+        )
+        for token in misses:
+            results[token] = token in found
+            cache.set(token, results[token])
+
+    if payloads:
+        revoked = dict(
+            Revocation.objects.filter(
+                subject__in={payload["sub"] for payload in payloads.values()}
+            ).values_list("subject", "revoked_at")
+        )
+        for token, payload in payloads.items():
+            results[token] = payload["iat"] > revoked.get(payload["sub"], -1)
+
+    return results
+
+
+def is_authorized_signed(token):
+    """ Checks a signed token's signature, expiry and revocation.
+
+    :param token: a signed token
+    :return authorized: True or False
+    """
+    return get_signed_subject(token) is not None
+
+
+def get_signed_subject(token):
+    """ Gets the username a valid, unrevoked signed token was issued to.
+
+    :param token: a signed token
+    :return username: a username, or None
+    """
+    try:
+        payload = tokens.verify(token)
+    except tokens.TokenError:
+        return None
+
+    revoked = Revocation.objects.filter(
+        subject=payload["sub"], revoked_at__gte=payload["iat"]
+    ).exists()
+
+    return None if revoked else payload["sub"]
+
+
+def issue_token(profile):
+    """ Gets the access token to hand out for a profile.
+
+    With SATELLITES_TOKEN_SIGNING_KEY set, it's a signed token that
+    satellites verify themselves; otherwise it's the profile's own token.
+
+    :param profile: a Profile
+    :return token: an access token
+    """
+    if settings.SATELLITES_TOKEN_SIGNING_KEY:
+        return tokens.sign(profile.user.username)
+
+    return profile.token
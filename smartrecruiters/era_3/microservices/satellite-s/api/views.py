@@ -7,23 +7,33 @@ This module implements the endpoint methods for the API.
 
 # pylint:disable=E1101
 
+import hmac
 import json
 import secrets
 import uuid
 
-from api.models import Profile
+from api import outbox
+from api.models import Profile, Revocation
 from api.decorators import cors_enabled
+from api.throttle import get_client_ip, get_login_throttles
+from api.utils import (
+    authorize_many,
+    get_signed_subject,
+    get_token,
+    is_authorized,
+    issue_token,
+)
 
 from django import http
 from django.shortcuts import redirect
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth.models import User
-from django.contrib.auth.hashers import check_password
 from django.core import serializers
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives
 from django.core.exceptions import ObjectDoesNotExist, MultipleObjectsReturned
 
+from satellites import tokens
+
 
 @csrf_exempt
 @cors_enabled
@@ -47,25 +57,13 @@ def create_user(request):
         token=secrets.token_urlsafe(),
     )
 
-    text = (
-        open("api/templates/email.txt", "r")
-        .read()
-        .format(name=user.username, username=user.username, cid=profile.cid)
-    )
-    html = (
-        open("api/templates/email.html", "r")
-        .read()
-        .format(name=user.username, username=user.username, cid=profile.cid)
-    )
-
-    subject, from_email, to = (
+    context = {"name": user.username, "username": user.username, "cid": profile.cid}
+    outbox.queue(
         "Confirm your Smartian Space account",
-        settings.DEFAULT_FROM_EMAIL,
         user.email,
+        outbox.render("email.txt", **context),
+        html=outbox.render("email.html", **context),
     )
-    msg = EmailMultiAlternatives(subject, text, from_email, [to])
-    msg.attach_alternative(html, "text/html")
-    msg.send()
 
     response = http.HttpResponse()
     response.content = b"User created successfully."
@@ -95,15 +93,18 @@ def get_users(request):
         user = User.objects.get_by_natural_key(request.headers["X-Username"])
         profiles = Profile.objects.filter(user=user)
 
-        if profiles[0].token not in request.headers["Authorization"]:
+        token = get_token(request)
+        if tokens.is_signed(token) and settings.SATELLITES_TOKEN_KEYS:
+            if get_signed_subject(token) != user.username:
+                return http.HttpResponseForbidden()
+        elif profiles[0].token not in request.headers["Authorization"]:
             return http.HttpResponseForbidden()
     else:
-        profiles = Profile.objects.all()
-        tokens = Profile.objects.values_list("token", flat=True)
-
-        if request.headers["Authorization"].split()[1] not in tokens:
+        if not is_authorized(get_token(request)):
             return http.HttpResponseForbidden()
 
+        profiles = Profile.objects.all()
+
     data = serializers.serialize("json", profiles)
 
     response = http.HttpResponse()
@@ -115,29 +116,80 @@ def get_users(request):
 
 
 def authenticate(request):
-    user = User.objects.get_by_natural_key(request.headers["X-Username"])
-    profile = Profile.objects.get(user=user)
+    username = request.headers.get("X-Username", "")
+    password = request.headers.get("X-Password", "")
+    ip = get_client_ip(request)
+
+    # throttled attempts are turned away before the expensive hash
+    by_username, by_ip = get_login_throttles()
+    wait = max(by_username.wait(username), by_ip.wait(ip))
+    if wait:
+        response = http.HttpResponse(status=429)
+        response["Retry-After"] = str(wait)
+
+        return response
+
+    by_username.hit(username)
+    by_ip.hit(ip)
+
+    try:
+        profile = Profile.objects.select_related("user").get(user__username=username)
+    except Profile.DoesNotExist:
+        # hash anyway, so unknown usernames take as long as wrong passwords
+        User().set_password(password)
+
+        return http.HttpResponseForbidden()
 
-    if not check_password(request.headers["X-Password"], user.password):
+    # rehashes the password if the hasher settings have changed
+    if not profile.user.check_password(password):
 
         return http.HttpResponseForbidden()
 
+    by_username.reset(username)
+
     response = http.HttpResponse()
     response.status_code = 200
-    response["X-Token"] = f"{profile.token}"
+    response["X-Token"] = issue_token(profile)
 
     return response
 
 
 def authorize(request):
-    headers = request.headers
-    token = headers["Authorization"].split()[1]
-
-    profile = Profile.objects.filter(token=token).count()
-    if not profile:
+    if not is_authorized(get_token(request)):
         return http.HttpResponseForbidden()
 
     response = http.HttpResponse()
     response.status_code = 200
 
     return response
+
+
+@csrf_exempt
+def authorize_batch(request):
+    if not is_authorized(get_token(request)):
+        return http.HttpResponseForbidden()
+
+    if request.method != "POST":
+        return http.HttpResponseNotAllowed(["POST"])
+
+    try:
+        batch = json.loads(request.body)["tokens"]
+    except (ValueError, KeyError, TypeError):
+        return http.HttpResponseBadRequest()
+
+    if not isinstance(batch, list) or not all(isinstance(t, str) for t in batch):
+        return http.HttpResponseBadRequest()
+    if len(batch) > settings.SATELLITES_AUTHORIZE_BATCH_SIZE:
+        return http.HttpResponseBadRequest(
+            f"At most {settings.SATELLITES_AUTHORIZE_BATCH_SIZE} tokens per batch."
+        )
+
+    return http.JsonResponse({"authorized": authorize_many(batch)})
+
+
+def revocations(request):
+    key = settings.SATELLITES_HOOK_KEY
+    if not key or not hmac.compare_digest(request.headers.get("X-Hook-Key", ""), key):
+        return http.HttpResponseForbidden()
+
+    return http.JsonResponse({"revocations": Revocation.active()})
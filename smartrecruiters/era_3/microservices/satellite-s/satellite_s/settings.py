@@ -6,6 +6,7 @@ This module implements the Django settings for this project.
 """
 
 import os
+import json
 import dj_database_url
 
 APP_NAME = "satellite_s"
@@ -72,6 +73,26 @@ DATABASES = {
 db_from_env = dj_database_url.config(conn_max_age=500)
 DATABASES["default"].update(db_from_env)
 
+# login throttle counts are kept here, shared by every process; the table is
+# created with `manage.py createcachetable`
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "cache",
+    }
+}
+
+# the PBKDF2 work factor; 0 keeps Django's default, and passwords hashed with
+# another one are rehashed on their next login
+SATELLITES_PASSWORD_ITERATIONS = int(os.getenv("SATELLITES_PASSWORD_ITERATIONS", 0))
+
+PASSWORD_HASHERS = [
+    "api.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"
@@ -99,3 +120,44 @@ EMAIL_HOST_USER = os.getenv("DJ_EMAIL_USER", "")
 EMAIL_HOST_PASSWORD = os.getenv("DJ_EMAIL_PASSWORD", "")
 DEFAULT_FROM_EMAIL = "e.maguire@smartrecruiters.com"
 DEFAULT_TO_EMAIL = "e.maguire@smartrecruiters.com"
+
+# emails wait in the outbox until `manage.py send_email` sends them
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 50))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 5))
+OUTBOX_RETRY_BACKOFF = int(os.getenv("OUTBOX_RETRY_BACKOFF", 60))
+OUTBOX_VISIBILITY_TIMEOUT = int(os.getenv("OUTBOX_VISIBILITY_TIMEOUT", 300))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", 5))
+
+SATELLITES_HOOK_KEY = os.getenv("SATELLITES_HOOK_KEY", "")
+SATELLITES_TOKEN_HOOKS = [
+    "https://e.satellites.smartian.space/hooks/tokens",
+    "https://spy.satellites.smartian.space/hooks/tokens",
+]
+
+# accepted tokens are cached per process; a replaced or deleted token is
+# dropped from the process that changed it at once, and from the others
+# once its entry expires
+SATELLITES_TOKEN_CACHE_SIZE = int(os.getenv("SATELLITES_TOKEN_CACHE_SIZE", 4096))
+SATELLITES_TOKEN_CACHE_TTL = int(os.getenv("SATELLITES_TOKEN_CACHE_TTL", 60))
+SATELLITES_TOKEN_CACHE_NEGATIVE_TTL = int(
+    os.getenv("SATELLITES_TOKEN_CACHE_NEGATIVE_TTL", 30)
+)
+SATELLITES_AUTHORIZE_BATCH_SIZE = int(
+    os.getenv("SATELLITES_AUTHORIZE_BATCH_SIZE", 1000)
+)
+
+# login attempts allowed per username and per client IP over a sliding window
+SATELLITES_LOGIN_WINDOW = int(os.getenv("SATELLITES_LOGIN_WINDOW", 300))
+SATELLITES_LOGIN_LIMIT_USERNAME = int(os.getenv("SATELLITES_LOGIN_LIMIT_USERNAME", 10))
+SATELLITES_LOGIN_LIMIT_IP = int(os.getenv("SATELLITES_LOGIN_LIMIT_IP", 50))
+
+# proxies in front of the app, each appending to X-Forwarded-For
+SATELLITES_PROXIES = int(os.getenv("SATELLITES_PROXIES", 1))
+
+# signed tokens, verified by satellites without calling back; keys are a JSON
+# object of key IDs to {"alg": "HS256", "secret": ...} or {"alg": "Ed25519",
+# "private": ..., "public": ...}, and opaque tokens are issued while no
+# signing key is set
+SATELLITES_TOKEN_KEYS = json.loads(os.getenv("SATELLITES_TOKEN_KEYS", "{}"))
+SATELLITES_TOKEN_SIGNING_KEY = os.getenv("SATELLITES_TOKEN_SIGNING_KEY", "")
+SATELLITES_TOKEN_TTL = int(os.getenv("SATELLITES_TOKEN_TTL", 3600))
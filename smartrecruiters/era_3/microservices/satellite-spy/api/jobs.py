@@ -12,6 +12,8 @@ from api.models import Page
 
 from django_cron import CronJobBase, Schedule
 
+from satellites import metrics
+
 
 class UpdatePages(CronJobBase):
     run_at_times = ["00:00"]
@@ -19,9 +21,11 @@ class UpdatePages(CronJobBase):
     schedule = Schedule(run_at_times=run_at_times)
     code = "api.jobs.UpdatePages"
 
+    @metrics.instrumented
     def do(self):
         print("api.jobs: PAGE UPDATE STARTED")
 
         pages = Page.objects.all()
         for page in pages:
             page.update()
+            metrics.count("pages")
@@ -14,6 +14,8 @@ import requests
 from bs4 import BeautifulSoup
 from simple_history.models import HistoricalRecords
 
+from satellites import metrics
+
 
 class Competitor(models.Model):
     """ Models a given competitor. """
@@ -188,7 +190,8 @@ class Page(models.Model):
         return f"{self.competitor} - {self.url} - {self.datestamp}"
 
     def update(self):
-        r = requests.get(self.url)
+        with metrics.call("web"):
+            r = requests.get(self.url)
 
         soup = BeautifulSoup(r.content, features="html.parser")
         content = soup.get_text().strip()
@@ -37,8 +37,9 @@ class CompetitorTestCase(TestCase):
 
         response = views.get(request, "Competitor")
         self.assertEquals(response.status_code, 200)
-        self.assertContains(response, "test0")
-        self.assertContains(response, "test1")
+        content = b"".join(response.streaming_content)
+        self.assertIn(b"test0", content)
+        self.assertIn(b"test1", content)
 
         request = factory.get(
             "Competitor",
@@ -48,8 +49,9 @@ class CompetitorTestCase(TestCase):
 
         response = views.get(request, "Competitor")
         self.assertEquals(response.status_code, 200)
-        self.assertContains(response, "test0")
-        self.assertFalse(b"test1" in response.content)
+        content = b"".join(response.streaming_content)
+        self.assertIn(b"test0", content)
+        self.assertFalse(b"test1" in content)
 
     def test_update_competitor(self):
         factory = RequestFactory()
@@ -89,8 +91,9 @@ class AdvantageTestCase(TestCase):
 
         response = views.get(request, "Advantage")
         self.assertEquals(response.status_code, 200)
-        self.assertContains(response, "test0")
-        self.assertContains(response, "test1")
+        content = b"".join(response.streaming_content)
+        self.assertIn(b"test0", content)
+        self.assertIn(b"test1", content)
 
     def test_create_advantage(self):
         factory = RequestFactory()
@@ -158,8 +161,9 @@ class ObjectionTestCase(TestCase):
 
         response = views.get(request, "Objection")
         self.assertEquals(response.status_code, 200)
-        self.assertContains(response, "test0")
-        self.assertContains(response, "test1")
+        content = b"".join(response.streaming_content)
+        self.assertIn(b"test0", content)
+        self.assertIn(b"test1", content)
 
     def test_create_objection(self):
         factory = RequestFactory()
@@ -235,8 +239,9 @@ class ResourceTestCase(TestCase):
 
         response = views.get(request, "Resource")
         self.assertEquals(response.status_code, 200)
-        self.assertContains(response, "test0")
-        self.assertContains(response, "test1")
+        content = b"".join(response.streaming_content)
+        self.assertIn(b"test0", content)
+        self.assertIn(b"test1", content)
 
     def test_create_resource(self):
         factory = RequestFactory()
@@ -313,8 +318,9 @@ class InsightTestCase(TestCase):
 
         response = views.get(request, "Insight")
         self.assertEquals(response.status_code, 200)
-        self.assertContains(response, "test0")
-        self.assertContains(response, "test1")
+        content = b"".join(response.streaming_content)
+        self.assertIn(b"test0", content)
+        self.assertIn(b"test1", content)
 
         request = factory.get(
             "Insight",
@@ -324,8 +330,9 @@ class InsightTestCase(TestCase):
 
         response = views.get(request, "Insight")
         self.assertEquals(response.status_code, 200)
-        self.assertContains(response, "test0")
-        self.assertFalse(b"test1" in response.content)
+        content = b"".join(response.streaming_content)
+        self.assertIn(b"test0", content)
+        self.assertFalse(b"test1" in content)
 
     def test_create_insight(self):
         factory = RequestFactory()
@@ -397,8 +404,9 @@ class CommentTestCase(TestCase):
 
         response = views.get(request, "Comment")
         self.assertEquals(response.status_code, 200)
-        self.assertContains(response, self.test0uuid)
-        self.assertContains(response, self.test1uuid)
+        content = b"".join(response.streaming_content)
+        self.assertIn(str(self.test0uuid).encode(), content)
+        self.assertIn(str(self.test1uuid).encode(), content)
 
         request = factory.get(
             "Comment",
@@ -408,9 +416,10 @@ class CommentTestCase(TestCase):
 
         response = views.get(request, "Comment")
         self.assertEquals(response.status_code, 200)
-        self.assertContains(response, self.test0uuid)
+        content = b"".join(response.streaming_content)
+        self.assertIn(str(self.test0uuid).encode(), content)
         self.assertFalse(bytes(str(self.test1uuid), "utf-8")
-                         in response.content)
+                         in content)
 
     def test_create_comment(self):
         factory = RequestFactory()
@@ -17,6 +17,7 @@ from django.core.exceptions import ObjectDoesNotExist
 from django.views.decorators.csrf import csrf_exempt
 
 from satellites.decorators import auth_required, cors_enabled
+from satellites.streaming import stream_queryset
 
 
 @csrf_exempt
@@ -28,19 +29,7 @@ def get(request, model_name):
 
     params = request.GET.dict()
 
-    if params:
-        items = model.objects.filter(**params)
-    else:
-        items = model.objects.all()
-    data = serialize("json", items)
-
-    response = http.HttpResponse()
-    response.content = data
-    response.content_type = "application/json"
-    response.status_code = 200
-    response["Access-Control-Allow-Origin"] = "*"
-
-    return response
+    return stream_queryset(model.objects.all(), params)
 
 
 @csrf_exempt
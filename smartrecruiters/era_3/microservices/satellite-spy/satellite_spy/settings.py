@@ -6,6 +6,7 @@ This module implements the Django settings for this project.
 """
 
 import os
+import json
 import dj_database_url
 
 APP_NAME = "satellite_spy"
@@ -75,6 +76,14 @@ DATABASES = {
 db_from_env = dj_database_url.config(conn_max_age=500)
 DATABASES["default"].update(db_from_env)
 
+# shared by the cron and web processes, so the metrics endpoint sees job runs
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "cache",
+    }
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"
@@ -103,3 +112,33 @@ EMAIL_HOST_PASSWORD = os.getenv("DJ_EMAIL_PASSWORD", "")
 
 DJANGO_CRON_DELETE_LOGS_OLDER_THAN = 1
 CRON_CLASSES = ["api.jobs.UpdatePages"]
+
+SATELLITES_TOKEN_CACHE_SIZE = int(os.getenv("SATELLITES_TOKEN_CACHE_SIZE", 1024))
+SATELLITES_TOKEN_CACHE_TTL = int(os.getenv("SATELLITES_TOKEN_CACHE_TTL", 300))
+SATELLITES_TOKEN_CACHE_NEGATIVE_TTL = int(
+    os.getenv("SATELLITES_TOKEN_CACHE_NEGATIVE_TTL", 30)
+)
+SATELLITES_HOOK_KEY = os.getenv("SATELLITES_HOOK_KEY", "")
+
+# signed tokens are verified here against these keys (public halves only for
+# Ed25519), and checked against the revocations polled from satellite-s
+SATELLITES_TOKEN_KEYS = json.loads(os.getenv("SATELLITES_TOKEN_KEYS", "{}"))
+SATELLITES_TOKEN_DENYLIST_INTERVAL = int(
+    os.getenv("SATELLITES_TOKEN_DENYLIST_INTERVAL", 30)
+)
+
+SATELLITES_METRICS_KEY = os.getenv("SATELLITES_METRICS_KEY", "")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {"raw": {"format": "%(message)s"}},
+    "handlers": {"metrics": {"class": "logging.StreamHandler", "formatter": "raw"}},
+    "loggers": {
+        "satellites.metrics": {
+            "handlers": ["metrics"],
+            "level": "INFO",
+            "propagate": False,
+        }
+    },
+}
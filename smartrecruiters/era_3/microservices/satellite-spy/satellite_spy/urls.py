@@ -8,4 +8,12 @@ This mopdule implements high-level URL configurations.
 from django.contrib import admin
 from django.urls import path, include
 
-urlpatterns = [path("admin/", admin.site.urls), path("api/", include("api.urls"))]
+from satellites.hooks import invalidate_tokens
+from satellites.metrics import metrics
+
+urlpatterns = [
+    path("admin/", admin.site.urls),
+    path("hooks/tokens", invalidate_tokens, name="invalidate-tokens"),
+    path("metrics", metrics, name="metrics"),
+    path("api/", include("api.urls")),
+]